@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""Benchmark the page extraction engines on a corpus of saved pages.
+
+Pages are read from --corpus-dir (default: benchmarks/pages, *.html) and,
+with --fixture-dir, from recorded replay fixtures (page/*.json). Each engine
+runs in a fresh process, so the reported peak memory is its own:
+
+    python benchmarks/extraction_benchmark.py --repeat 20
+    python benchmarks/extraction_benchmark.py --fixture-dir ~/.cache/strands-deepsearch-agent/replay_fixtures --engines lxml,bs4
+    python benchmarks/extraction_benchmark.py --pool-workers 0,1,2,4 --concurrency 16
+
+Peak memory is reported twice: Python allocations (tracemalloc) and the
+growth of the process's peak RSS, which also covers libxml2's C heap.
+--pool-workers instead measures throughput of the extraction process pool
+under concurrent callers for each worker count (0 = threads only).
+"""
+
+import argparse
+import asyncio
+import json
+import multiprocessing
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+# Add src to path
+sys.path.append(str(Path(__file__).resolve().parent.parent / 'src'))
+
+DEFAULT_CORPUS = Path(__file__).resolve().parent / 'pages'
+
+
+def load_corpus(corpus_dir: str, fixture_dir: str) -> List[Tuple[bytes, str]]:
+    """Load (body, charset) pairs from saved pages and replay fixtures."""
+    pages: List[Tuple[bytes, str]] = []
+    if corpus_dir:
+        for path in sorted(Path(corpus_dir).glob('*.htm*')):
+            pages.append((path.read_bytes(), ''))
+    if fixture_dir:
+        from agent.tools.replay import ReplayStore
+        store = ReplayStore(Path(fixture_dir).expanduser())
+        for path in sorted((Path(fixture_dir).expanduser() / 'page').glob('*.json')):
+            fixture = json.loads(path.read_text(encoding='utf-8'))
+            if fixture.get('outcome') != 'ok':
+                continue
+            payload = fixture['payload']
+            content_type = {name.lower(): value for name, value in payload['headers'].items()}.get('content-type', '')
+            charset = content_type.split('charset=', 1)[1].split(';')[0].strip() if 'charset=' in content_type else ''
+            pages.append((store.response_body(payload), charset))
+    return pages
+
+
+def peak_rss_kb() -> int:
+    """Return the peak resident set size of this process in KB (0 if unknown)."""
+    if resource is None:
+        return 0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # macOS reports bytes, Linux kilobytes
+    return peak // 1024 if sys.platform == 'darwin' else peak
+
+
+def run_engine(engine: str, corpus_dir: str, fixture_dir: str, repeat: int, markdown: bool, main_content: bool) -> Dict[str, Any]:
+    """Extract every page repeat times with one engine (runs in a child process)."""
+    from agent.tools.page_extract import ENGINES, extract_page
+
+    if not ENGINES[engine].available():
+        return {'engine': engine, 'available': False}
+
+    pages = load_corpus(corpus_dir, fixture_dir)
+    total_bytes = sum(len(content) for content, _ in pages)
+    # Warm up imports and parser setup outside the measurement
+    extract_page(pages[0][0], pages[0][1] or None, markdown, engine, main_content=main_content)
+
+    rss_before = peak_rss_kb()
+    tracemalloc.start()
+    output_chars = 0
+    fallbacks = 0
+    main_pages = 0
+    started = time.perf_counter()
+    for _ in range(repeat):
+        for content, charset in pages:
+            page = extract_page(content, charset or None, markdown, engine, main_content=main_content)
+            output_chars += len(page.text)
+            main_pages += page.main_content
+            fallbacks += page.engine != engine
+    elapsed = time.perf_counter() - started
+    _, traced_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    count = len(pages) * repeat
+    return {
+        'engine': engine,
+        'available': True,
+        'pages': count,
+        'pages_per_sec': count / elapsed if elapsed else 0.0,
+        'mb_per_sec': total_bytes * repeat / elapsed / 1e6 if elapsed else 0.0,
+        'avg_output_chars': output_chars / count if count else 0,
+        'fallbacks': fallbacks,
+        'main_content_share': main_pages / count if count else 0.0,
+        'traced_peak_kb': traced_peak // 1024,
+        'rss_growth_kb': peak_rss_kb() - rss_before,
+    }
+
+
+def run_pool(workers: int, pages: List[Tuple[bytes, str]], repeat: int, concurrency: int) -> Dict[str, Any]:
+    """Extract every page repeat times through an ExtractionPool with concurrent callers."""
+    from agent.tools.extraction_pool import ExtractionPool
+
+    # Every body goes to the pool, whatever its size
+    pool = ExtractionPool(workers, max_pending=max(1, workers) * 2, min_bytes=0, queue_timeout=600)
+    jobs = [page for _ in range(repeat) for page in pages]
+
+    async def drive() -> float:
+        # Warm up the workers outside the measurement
+        await asyncio.gather(*[pool.extract(*pages[0]) for _ in range(max(1, workers))])
+        queue = list(jobs)
+
+        async def caller() -> None:
+            while queue:
+                content, charset = queue.pop()
+                await pool.extract(content, charset or None)
+
+        started = time.perf_counter()
+        await asyncio.gather(*[caller() for _ in range(concurrency)])
+        return time.perf_counter() - started
+
+    elapsed = asyncio.run(drive())
+    pool.shutdown()
+    return {'workers': workers, 'pages_per_sec': len(jobs) / elapsed if elapsed else 0.0, 'peak_waiting': pool.stats['peak_waiting']}
+
+
+def main() -> None:
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--corpus-dir', default=str(DEFAULT_CORPUS), help='Directory of saved *.html pages')
+    parser.add_argument('--fixture-dir', default='', help='Replay fixture directory to take recorded pages from')
+    parser.add_argument('--engines', default='lxml,bs4,regex', help='Comma-separated engines to compare')
+    parser.add_argument('--repeat', type=int, default=10, help='How many times each page is extracted')
+    parser.add_argument('--text', action='store_true', help='Extract plain text instead of markdown')
+    parser.add_argument('--whole-page', action='store_true', help='Render whole pages instead of the main content')
+    parser.add_argument('--pool-workers', default='', help='Comma-separated worker counts to measure the extraction pool with')
+    parser.add_argument('--concurrency', type=int, default=8, help='Concurrent callers in --pool-workers mode')
+    args = parser.parse_args()
+
+    pages = load_corpus(args.corpus_dir, args.fixture_dir)
+    if not pages:
+        parser.error('the corpus is empty; check --corpus-dir / --fixture-dir')
+    print(f"Corpus: {len(pages)} pages, {sum(len(content) for content, _ in pages) / 1024:.0f} KB, repeat {args.repeat}\n")
+
+    if args.pool_workers:
+        baseline = None
+        for workers in [int(value) for value in args.pool_workers.split(',') if value.strip()]:
+            report = run_pool(workers, pages, args.repeat, args.concurrency)
+            baseline = baseline or report
+            print(
+                f"workers={report['workers']:<3} {report['pages_per_sec']:8.1f} pages/s "
+                f"x{report['pages_per_sec'] / baseline['pages_per_sec']:.2f} vs {baseline['workers']} workers  "
+                f"peak waiting={report['peak_waiting']}"
+            )
+        return
+
+    context = multiprocessing.get_context('spawn')
+    reports = []
+    for engine in [name.strip() for name in args.engines.split(',') if name.strip()]:
+        with context.Pool(1) as pool:
+            report = pool.apply(run_engine, (engine, args.corpus_dir, args.fixture_dir, args.repeat, not args.text, not args.whole_page))
+        if not report['available']:
+            print(f"{engine:<6} not installed")
+            continue
+        reports.append(report)
+
+    # Speedups are relative to the former BeautifulSoup + markdownify path
+    baseline = next((report for report in reports if report['engine'] == 'bs4'), reports[0] if reports else None)
+    for report in reports:
+        print(
+            f"{report['engine']:<6} {report['pages_per_sec']:8.1f} pages/s {report['mb_per_sec']:6.2f} MB/s "
+            f"x{report['pages_per_sec'] / baseline['pages_per_sec']:.1f} vs {baseline['engine']}  "
+            f"peak py={report['traced_peak_kb']} KB rss+={report['rss_growth_kb']} KB  "
+            f"avg output={report['avg_output_chars']:.0f} chars main content={report['main_content_share']:.0%} "
+            f"fallbacks={report['fallbacks']}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""Micro-benchmark the text sanitizer against the closures it replaced.
+
+The legacy functions are copied verbatim from the former
+clean_text_for_deepseek / clean_content_for_deepseek helpers, including the
+second pass over the fully formatted output:
+
+    python benchmarks/sanitizer_benchmark.py --size-kb 200 --repeat 20
+"""
+
+import argparse
+import random
+import re
+import sys
+import time
+from pathlib import Path
+from typing import Callable, List
+
+# Add src to path
+sys.path.append(str(Path(__file__).resolve().parent.parent / 'src'))
+
+from agent.utils.text_sanitizer import SANITIZERS  # noqa: E402
+
+
+def legacy_clean(text: str) -> str:
+    """Clean text like the former per-call closure, with its in-function import."""
+    if not text:
+        return ""
+    text = str(text)
+    text = text.replace('\x00', '')
+    import re
+    text = re.sub(r'[\x00-\x08\x0B\x0C\x0E-\x1F\x7F-\x9F]', ' ', text)
+    text = re.sub(r'[^\x20-\x7E\u4e00-\u9fff\u3400-\u4dbf\u3000-\u303f\uff00-\uffef]', ' ', text)
+    text = re.sub(r'\s+', ' ', text)
+    return text.strip()
+
+
+def legacy_page(markdown: str) -> str:
+    """Run the former get_page_content cleanup: newline squeeze, clean, format, clean again."""
+    markdown = re.sub(r'\n{3,}', '\n\n', markdown).strip()
+    content = legacy_clean(markdown)
+    return legacy_clean(f"## Web Content: Title\n**Source**: https://example.com\n\n{content}\n")
+
+
+def new_page(markdown: str, policy: str) -> str:
+    """Run the current get_page_content cleanup: one pass that keeps paragraph breaks."""
+    content = SANITIZERS[policy].clean(markdown, keep_newlines=True)
+    return f"## Web Content: Title\n**Source**: https://example.com\n\n{content}\n"
+
+
+def make_corpus(size_kb: int, seed: int) -> str:
+    """Build a markdown-like page mixing ASCII, CJK, accents, emoji and control characters."""
+    rng = random.Random(seed)
+    words = ["quantum", "computing", "research", "café", "naïve", "量子计算", "研究进展", "😀", "—", "data\x00", "tab\there", "nbsp\xa0x"]
+    lines: List[str] = []
+    size = 0
+    while size < size_kb * 1024:
+        if rng.random() < 0.1:
+            line = f"## Heading {len(lines)}"
+        else:
+            line = " ".join(rng.choice(words) for _ in range(rng.randint(5, 25)))
+        lines.append(line)
+        lines.extend([""] * rng.randint(0, 3))
+        size += len(line) + 1
+    return "\n".join(lines)
+
+
+def measure(name: str, func: Callable[[], str], repeat: int, size: int) -> float:
+    """Time func and print per-call latency and throughput."""
+    func()  # warm up regex caches
+    started = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    per_call = (time.perf_counter() - started) / repeat
+    print(f"{name:<34} {per_call * 1000:8.2f} ms/call {size / per_call / 1e6:8.1f} MB/s")
+    return per_call
+
+
+def main() -> None:
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--size-kb', type=int, default=150, help='Size of the synthetic page body')
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--seed', type=int, default=7)
+    args = parser.parse_args()
+
+    page = make_corpus(args.size_kb, args.seed)
+    fields = [line for line in page.splitlines() if line][:2000]
+    field_bytes = sum(len(field) for field in fields)
+    print(f"Page body: {len(page) / 1024:.0f} KB, search fields: {len(fields)}\n")
+
+    legacy = measure("page, legacy closures (2 passes)", lambda: legacy_page(page), args.repeat, len(page))
+    for policy in SANITIZERS:
+        current = measure(f"page, {policy} single pass", lambda: new_page(page, policy), args.repeat, len(page))
+        print(f"{'':<34} speedup x{legacy / current:.1f}")
+
+    legacy = measure("fields, legacy closure", lambda: [legacy_clean(field) for field in fields], args.repeat, field_bytes)
+    for policy, sanitizer in SANITIZERS.items():
+        current = measure(f"fields, {policy}", lambda: [sanitizer.clean(field) for field in fields], args.repeat, field_bytes)
+        print(f"{'':<34} speedup x{legacy / current:.1f}")
+
+    # The flat DeepSeek policy keeps the legacy character set
+    mismatches = sum(1 for field in fields if legacy_clean(field) != SANITIZERS['deepseek'].clean(field))
+    print(f"\nDeepSeek policy differs from legacy output on {mismatches}/{len(fields)} fields")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""Benchmark the search and page fetch layers against recorded fixtures.
+
+Record fixtures once with network access, then replay them with synthetic
+latency and error injection on any machine:
+
+    python benchmarks/search_benchmark.py --mode record --queries-file queries.txt --urls-file urls.txt
+    python benchmarks/search_benchmark.py --mode replay --queries-file queries.txt --concurrency 8 --repeat 5
+
+Every run uses a fresh temporary data directory (search cache, quota ledger)
+unless --data-dir is given, so results are reproducible.
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Dict, List
+
+# Add src to path
+sys.path.append(str(Path(__file__).resolve().parent.parent / 'src'))
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    """Return the given percentile of a list of values."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+
+def run_load(name: str, items: List[str], call: Callable[[str], bool], concurrency: int) -> Dict[str, float]:
+    """Run call over items with the given concurrency and collect latencies."""
+    latencies: List[float] = []
+    failures = 0
+
+    def timed(item: str) -> bool:
+        started = time.perf_counter()
+        try:
+            ok = call(item)
+        except Exception:
+            ok = False
+        latencies.append(time.perf_counter() - started)
+        return ok
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        failures = sum(1 for ok in executor.map(timed, items) if not ok)
+    wall_time = time.perf_counter() - started
+
+    return {
+        'name': name,
+        'calls': len(items),
+        'failures': failures,
+        'wall_time': wall_time,
+        'throughput': len(items) / wall_time if wall_time else 0.0,
+        'p50': percentile(latencies, 0.50),
+        'p95': percentile(latencies, 0.95),
+        'p99': percentile(latencies, 0.99),
+        'max': max(latencies, default=0.0),
+    }
+
+
+def print_report(report: Dict[str, float]) -> None:
+    """Print one load report."""
+    print(
+        f"{report['name']:<8} calls={report['calls']:<5} failures={report['failures']:<4} "
+        f"wall={report['wall_time']:.2f}s throughput={report['throughput']:.1f}/s "
+        f"p50={report['p50'] * 1000:.0f}ms p95={report['p95'] * 1000:.0f}ms "
+        f"p99={report['p99'] * 1000:.0f}ms max={report['max'] * 1000:.0f}ms"
+    )
+
+
+def read_lines(path: str) -> List[str]:
+    """Read non-empty lines from a text file."""
+    if not path:
+        return []
+    return [line.strip() for line in Path(path).read_text(encoding='utf-8').splitlines() if line.strip()]
+
+
+def main() -> None:
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--mode', choices=['record', 'replay', 'off'], default='replay')
+    parser.add_argument('--fixture-dir', default=None, help='Fixture directory (default: <data dir>/replay_fixtures)')
+    parser.add_argument('--data-dir', default=None, help='Data directory for caches (default: fresh temp dir)')
+    parser.add_argument('--queries-file', default='', help='One search query per line')
+    parser.add_argument('--urls-file', default='', help='One page URL per line')
+    parser.add_argument('--num-results', type=int, default=5)
+    parser.add_argument('--max-chars', type=int, default=4000, help='Text budget per page fetch (0 = read whole pages)')
+    parser.add_argument('--concurrency', type=int, default=4)
+    parser.add_argument('--repeat', type=int, default=1, help='How many times each query/URL is issued')
+    parser.add_argument('--latency', type=float, default=None, help='Fixed synthetic latency in seconds')
+    parser.add_argument('--latency-scale', type=float, default=1.0, help='Multiplier for recorded latencies')
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--error-rates', default='', help='Per provider rates, e.g. _try_tavily_search=1.0,page=0.2')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--no-cache', action='store_true', help='Disable the search cache')
+    args = parser.parse_args()
+
+    os.environ['AGENT_DATA_DIR'] = args.data_dir or tempfile.mkdtemp(prefix='search-benchmark-')
+    if args.no_cache:
+        os.environ['SEARCH_CACHE_ENABLED'] = 'false'
+
+    from agent.tools import enhanced_search
+    from agent.tools.http_client import run_sync
+    from agent.tools.page_fetch import fetch_page, fetch_stats, page_flights
+    from agent.tools.replay import ReplaySettings, configure_replay
+    from agent.tools.search_cache import get_search_cache
+
+    error_rates = {}
+    for item in args.error_rates.split(','):
+        if '=' in item:
+            name, rate = item.split('=', 1)
+            error_rates[name.strip()] = float(rate)
+
+    layer = configure_replay(ReplaySettings(
+        mode=args.mode,
+        fixture_dir=args.fixture_dir,
+        latency=args.latency,
+        latency_scale=args.latency_scale,
+        error_rate=args.error_rate,
+        error_rates=error_rates,
+        seed=args.seed
+    ))
+
+    queries = read_lines(args.queries_file) * args.repeat
+    urls = read_lines(args.urls_file) * args.repeat
+    if not queries and not urls:
+        parser.error('provide --queries-file and/or --urls-file')
+
+    print(f"Mode: {args.mode}, fixtures: {layer.store.fixture_dir}, data dir: {os.environ['AGENT_DATA_DIR']}")
+
+    if queries:
+        print_report(run_load(
+            'search', queries,
+            lambda query: bool(enhanced_search._run_search_methods(query, args.num_results)[0]),
+            args.concurrency
+        ))
+    if urls:
+        print_report(run_load(
+            'pages', urls,
+            lambda url: run_sync(fetch_page(url, args.max_chars)).status_code < 400,
+            args.concurrency
+        ))
+
+    cache = get_search_cache()
+    print(f"Cache: {cache.stats() if cache else 'disabled'}")
+    print(f"Search single-flight: {enhanced_search.search_flights.stats()}")
+    print(f"Page single-flight: {page_flights.stats()}")
+    print(f"Page fetches: {fetch_stats}")
+    print(f"Replay: {layer.stats}")
+    print("Providers:")
+    for health in enhanced_search._get_registry().snapshot():
+        print(f"  {health['provider']:<28} {health['state']:<9} calls={health['calls']:<4} "
+              f"failures={health['failures']:<4} ewma={health['ewma_latency']:.3f}s")
+
+
+if __name__ == "__main__":
+    main()
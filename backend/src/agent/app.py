@@ -2,7 +2,7 @@
 
 import pathlib
 import asyncio
-from typing import Dict, Any, List, AsyncGenerator
+from typing import Dict, Any, List, AsyncGenerator, Callable
 from datetime import datetime
 from fastapi import FastAPI, HTTPException, Request, Response
 from fastapi.staticfiles import StaticFiles
@@ -13,6 +13,12 @@ import json
 import fastapi.exceptions
 from .research_agent import ResearchAgentSystem
 from .configuration import Configuration
+from .tools.provider_quota import get_quota_manager
+from .tools.extraction_pool import get_extraction_pool
+from .tools.page_cache import get_page_cache
+from .tools.fetch_scheduler import get_fetch_scheduler
+from .tools.artifact_store import get_artifact_store
+from .tools.http_client import run_on_client_loop
 # from .simple_research_agent import ResearchAgentSystem
 
 # Define the FastAPI app
@@ -187,6 +193,75 @@ async def health_check():
     return {"status": "healthy", "timestamp": datetime.now().isoformat()}
 
 
+async def _read_on_client_loop(read: Callable[[], Any]) -> Any:
+    """Call a function on the HTTP client loop, for state only that loop may touch."""
+    async def call() -> Any:
+        return read()
+    return await run_on_client_loop(call())
+
+
+@app.get("/admin/search/quota")
+async def search_quota():
+    """Report search provider usage against rate limits and quotas."""
+    return await asyncio.to_thread(lambda: get_quota_manager().snapshot())
+
+
+@app.get("/admin/pages/extraction")
+async def page_extraction():
+    """Report the page extraction pool's workers, queue and counters."""
+    return await _read_on_client_loop(get_extraction_pool().snapshot)
+
+
+@app.get("/admin/pages/cache")
+async def page_cache():
+    """Report page cache hits, revalidations and size."""
+    cache = get_page_cache()
+    return await asyncio.to_thread(cache.stats) if cache is not None else {'enabled': False}
+
+
+@app.get("/admin/pages/domains")
+async def page_domains():
+    """Report per-domain fetch queues, throttling and waits."""
+    return await _read_on_client_loop(get_fetch_scheduler().snapshot)
+
+
+@app.get("/admin/artifacts")
+async def artifacts():
+    """Report the artifact store's size, compression and counters."""
+    store = get_artifact_store()
+    return await asyncio.to_thread(store.stats) if store is not None else {'enabled': False}
+
+
+@app.get("/admin/artifacts/sessions")
+async def artifact_sessions(limit: int = 50):
+    """List the most recent research sessions kept in the artifact store."""
+    store = get_artifact_store()
+    if store is None:
+        raise HTTPException(status_code=404, detail="Artifact store is disabled")
+    return await asyncio.to_thread(store.refs, 'session', limit)
+
+
+@app.get("/admin/artifacts/sessions/{session_id}")
+async def artifact_session(session_id: str):
+    """Return the manifest of a research session."""
+    store = get_artifact_store()
+    digest = await asyncio.to_thread(store.resolve, 'session', session_id) if store is not None else None
+    manifest = await asyncio.to_thread(store.get_text, digest) if digest else None
+    if manifest is None:
+        raise HTTPException(status_code=404, detail=f"No stored session {session_id}")
+    return json.loads(manifest)
+
+
+@app.get("/admin/artifacts/blobs/{digest}")
+async def artifact_blob(digest: str):
+    """Return a stored blob (page body, extracted text or stage output) by digest."""
+    store = get_artifact_store()
+    blob = await asyncio.to_thread(store.get, digest) if store is not None else None
+    if blob is None:
+        raise HTTPException(status_code=404, detail=f"No stored blob {digest}")
+    return Response(blob, media_type="application/octet-stream")
+
+
 def create_frontend_router(build_dir="../frontend/dist"):
     """Creates a router to serve the React frontend."""
     build_path = pathlib.Path(__file__).parent.parent.parent / build_dir
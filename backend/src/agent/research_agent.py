@@ -10,6 +10,8 @@ from dotenv import load_dotenv
 
 # Import our tool classes
 from .tools import ModelTools, LanguageTools, AgentCreationTools, ResearchTools, ReportTools
+from .tools.search_session import SearchSession, activate_session, deactivate_session
+from .tools.search_prefetch import start_search_prefetch
 from .configuration import Configuration
 
 # Configure logging
@@ -103,6 +105,13 @@ class ResearchAgentSystem:
         # Use config value if not specified
         if max_research_loops is None:
             max_research_loops = self.config.max_research_loops
+
+        # Search state (seen URLs, ...) shared by the search tools during this run
+        search_session = SearchSession(query)
+        session_token = activate_session(search_session)
+        # Warm the search cache with the researcher's predictable first searches
+        # while language detection and the first LLM turn are still running
+        search_prefetch = start_search_prefetch(query, self.config.number_of_initial_queries)
         try:
             # Language Detection (if auto-detection is enabled)
             detected_language = self.language_tools.detect_and_set_language(query)
@@ -134,6 +143,7 @@ class ResearchAgentSystem:
             initialization_info = self.language_tools.generate_initialization_info(
                 query, detected_language, max_research_loops, models_info
             )
+            search_session.save_stage('initialization', initialization_info)
 
             yield {
                 'type': 'status',
@@ -147,6 +157,7 @@ class ResearchAgentSystem:
                     'detected_language': detected_language,
                     'language_display': self.language_tools.get_current_language(),
                     'max_loops': max_research_loops,
+                    'prefetched_queries': search_prefetch.queries,
                     'timestamp': datetime.now().isoformat()
                 }
             }
@@ -176,8 +187,9 @@ class ResearchAgentSystem:
             async for research_event in ResearchTools.conduct_research_step_stream(self.researcher_agent, query):
                 if research_event['type'] == 'research_complete':
                     research_findings = research_event['final_result']
-                    # Generate mock search summaries for compatibility
-                    search_summaries = ResearchTools.generate_mock_search_summaries(query, research_findings)
+                    search_session.save_stage('research', str(research_findings))
+                    # Summaries of the searches the researcher made, recorded by the search tools
+                    search_summaries = search_session.search_summaries()
 
                     # Show completion progress
                     yield {
@@ -202,7 +214,9 @@ class ResearchAgentSystem:
                     return
 
             # Generate search results summary for frontend
-            search_summary_output = ResearchTools.generate_search_summary_output(search_summaries, query)
+            search_summary_output = ResearchTools.generate_search_summary_output(
+                search_summaries, query, len(search_session.avoided_searches), search_session.duplicate_pages()
+            )
 
             yield {
                 'type': 'progress',
@@ -213,6 +227,8 @@ class ResearchAgentSystem:
                 'data': {
                     'findings_preview': str(research_findings)[:200] + '...',
                     'search_summaries': search_summaries,
+                    'avoided_searches': len(search_session.avoided_searches),
+                    'duplicate_pages': search_session.duplicate_pages(),
                     'stage_output': search_summary_output
                 }
             }
@@ -237,6 +253,7 @@ class ResearchAgentSystem:
             async for analysis_event in ResearchTools.analyze_findings_stream(self.analyst_agent, query, research_findings):
                 if analysis_event['type'] == 'analysis_complete':
                     analysis_result = analysis_event['final_result']
+                    search_session.save_stage('analysis', str(analysis_result))
 
                     # Show completion progress
                     yield {
@@ -302,6 +319,8 @@ class ResearchAgentSystem:
                     )
                     research_findings = combined_findings
                     research_loop_count += 1
+                    search_session.save_stage(f'additional_research_{research_loop_count - 1}', str(additional_research))
+                    search_session.save_stage(f'analysis_{research_loop_count - 1}', str(analysis_result))
 
                     yield {
                         'type': 'progress',
@@ -310,7 +329,8 @@ class ResearchAgentSystem:
                         'step': f'additional_research_{research_loop_count-1}_complete',
                         'stage': 'research',
                         'data': {
-                            'stage_output': f"## Round {research_loop_count-1} Additional Research Results\n\n{str(additional_research)[:500]}...\n\n**Research Depth**: Deep analysis\n**New Information**: Supplementary materials obtained\n**Completion Time**: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"
+                            'stage_output': f"## Round {research_loop_count-1} Additional Research Results\n\n{str(additional_research)[:500]}...\n\n**Research Depth**: Deep analysis\n**New Information**: Supplementary materials obtained\n**Searches Avoided (near-duplicates)**: {len(search_session.avoided_searches)}\n**Completion Time**: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}",
+                            'avoided_searches': len(search_session.avoided_searches)
                         }
                     }
 
@@ -357,6 +377,7 @@ class ResearchAgentSystem:
                 await asyncio.sleep(0.01)  # Small delay for smooth streaming
 
             final_report = ''.join(final_report_chunks)
+            search_session.save_stage('report', final_report)
 
             yield {
                 'type': 'progress',
@@ -368,6 +389,9 @@ class ResearchAgentSystem:
 
             await asyncio.sleep(0.1)
 
+            # Keep the run on disk (stage outputs, fetched pages) for later analysis
+            search_session.save_manifest('complete')
+
             # Final result with all stage outputs preserved
             yield {
                 'type': 'complete',
@@ -377,10 +401,14 @@ class ResearchAgentSystem:
                 'stage': 'complete',
                 'data': {
                     'query': query,
+                    'session_id': search_session.session_id,
                     'final_report': final_report,
                     'research_findings': str(research_findings),
                     'analysis': str(analysis_result),
                     'research_loops': research_loop_count,
+                    'sources': search_session.sources(),
+                    'corroborated_sources': search_session.corroborated_sources(),
+                    'avoided_searches': len(search_session.avoided_searches),
                     'timestamp': datetime.now().isoformat(),
                     # Preserve all stage outputs for frontend switching
                     'stage_outputs': {
@@ -407,3 +435,8 @@ class ResearchAgentSystem:
                 'step': 'error',
                 'stage': 'error'
             }
+        finally:
+            search_prefetch.cancel()
+            # Runs that failed or were abandoned by the client are kept too
+            search_session.save_manifest('incomplete')
+            deactivate_session(session_token)
@@ -340,7 +340,7 @@ Current date: {datetime.now().strftime("%B %d, %Y")}
 Your responsibilities:
 1. Generate optimized search queries for the given research topic
 2. Conduct thorough web searches using multiple relevant queries
-3. **CRITICALLY IMPORTANT**: After getting search results, you MUST use get_page_content to extract detailed information from the most relevant and authoritative sources
+3. **CRITICALLY IMPORTANT**: After getting search results, you MUST use get_page_contents to extract detailed information from the most relevant and authoritative sources
 4. Gather comprehensive information details from reliable and diverse sources
 5. Extract key facts, statistics, and insights from full page content
 6. Provide source URLs for all information gathered
@@ -349,14 +349,14 @@ Your responsibilities:
 
 **MANDATORY WORKFLOW**:
 1. First, use generate_search_queries to create multiple targeted search queries
-2. Then, use enhanced_web_search to find relevant sources
-3. **ALWAYS follow up by using get_page_content on the most promising URLs from search results**
-4. Extract detailed information from at least 1 key sources using get_page_content
+2. Then, pass ALL generated queries to enhanced_multi_search in a single call to find relevant sources (use enhanced_web_search only for individual follow-up queries)
+3. **ALWAYS follow up by passing the 3-5 most promising URLs from search results to get_page_contents in a single call** (use get_page_content only for one additional page)
+4. Extract detailed information from at least 1 key sources using get_page_contents
 5. Synthesize information from both search summaries and detailed page content
 
 Guidelines:
 - Use multiple search queries to get comprehensive coverage
-- **ALWAYS extract detailed content from key sources using get_page_content**
+- **ALWAYS extract detailed content from key sources using get_page_contents**
 - Focus on recent and authoritative sources
 - Include source URLs in your findings
 - Keep findings organized and under 3000 words
@@ -365,18 +365,25 @@ Guidelines:
 
 Tools available:
 - generate_search_queries: Create optimized search queries
+- enhanced_multi_search: Run several search queries concurrently and get one merged, deduplicated result list
 - enhanced_web_search: Search the web for information (with multiple fallback options)
-- http_request: Extract detailed content from specific pages (USE THIS AFTER SEARCH)
+- get_page_contents: Fetch several pages concurrently and get their content within one budget (USE THIS AFTER SEARCH; pass the current sub-question as focus to get the most relevant passages)
+- get_page_content: Extract detailed content from a single page
 """
         
         try:
             # Check if tools should be enabled
             if AgentCreationTools._should_enable_tools(model):
                 # Import tools here to avoid circular imports
-                from ..tools.enhanced_search import enhanced_web_search, get_page_content
+                from ..tools.enhanced_search import (
+                    enhanced_multi_search,
+                    enhanced_web_search,
+                    get_page_content,
+                    get_page_contents,
+                )
                 from ..tools.web_search import generate_search_queries
 
-                tools = [generate_search_queries, enhanced_web_search, get_page_content]
+                tools = [generate_search_queries, enhanced_multi_search, enhanced_web_search, get_page_contents, get_page_content]
                 logger.info("Creating researcher agent with tools enabled")
             else:
                 tools = []
@@ -0,0 +1,510 @@
+"""Compressed, content-addressed store for fetched pages and research outputs."""
+
+import hashlib
+import json
+import logging
+import mmap
+import os
+import sqlite3
+import struct
+import threading
+import time
+import zlib
+from pathlib import Path
+from typing import Any, BinaryIO, Dict, Iterator, List, Tuple, Union
+
+from ..utils.storage import get_data_dir
+
+# Conditional import for zstd compression (zlib is used without it)
+try:
+    import zstandard
+    ZSTD_AVAILABLE = True
+except ImportError:
+    zstandard = None
+    ZSTD_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+# Codecs of stored blobs; each blob records its own, so stores written with
+# and without zstd stay readable by both
+CODEC_RAW = 0
+CODEC_ZLIB = 1
+CODEC_ZSTD = 2
+
+# Index file: header (magic, version, capacity, count, raw bytes, stored bytes)
+# followed by capacity slots of (digest, pack, offset, stored size, size, codec)
+_INDEX_MAGIC = b'AIDX'
+_INDEX_VERSION = 1
+_HEADER = struct.Struct('<4sIQQQQ')
+_HEADER_SIZE = 64
+_SLOT = struct.Struct('<32sIQIIB3x')
+_EMPTY_DIGEST = bytes(32)
+_MIN_CAPACITY = 4096
+_MAX_LOAD = 0.7
+
+# Pack record header (magic, digest, codec, size, stored size); lets the
+# index be rebuilt from the packs alone
+_RECORD_MAGIC = b'ABLB'
+_RECORD = struct.Struct('<4s32sBII')
+
+# Blobs smaller than this are not worth compressing
+_MIN_COMPRESS_BYTES = 256
+
+
+def artifact_digest(data: Union[bytes, str]) -> str:
+    """Return the digest a blob is stored under: the SHA-256 of its bytes (UTF-8 for text)."""
+    if isinstance(data, str):
+        data = data.encode('utf-8')
+    return hashlib.sha256(data).hexdigest()
+
+
+def _compress(data: bytes, level: int) -> Tuple[int, bytes]:
+    """Compress a blob with the best available codec, or keep it raw if that does not help."""
+    if len(data) < _MIN_COMPRESS_BYTES:
+        return CODEC_RAW, data
+    if ZSTD_AVAILABLE:
+        codec, stored = CODEC_ZSTD, zstandard.ZstdCompressor(level=level, write_checksum=True).compress(data)
+    else:
+        codec, stored = CODEC_ZLIB, zlib.compress(data, min(level, 9))
+    return (codec, stored) if len(stored) < len(data) else (CODEC_RAW, data)
+
+
+def _decompress(codec: int, stored: bytes, size: int) -> bytes:
+    """Restore a blob stored with the given codec."""
+    if codec == CODEC_RAW:
+        return stored
+    if codec == CODEC_ZLIB:
+        return zlib.decompress(stored)
+    if codec == CODEC_ZSTD:
+        if not ZSTD_AVAILABLE:
+            raise RuntimeError("Blob is zstd-compressed but the zstandard package is not installed")
+        return zstandard.ZstdDecompressor().decompress(stored, max_output_size=size)
+    raise ValueError(f"Unknown blob codec {codec}")
+
+
+class BlobLocation:
+    """Where a blob lives in the packs."""
+
+    __slots__ = ('digest', 'pack', 'offset', 'stored_size', 'size', 'codec')
+
+    def __init__(self, digest: bytes, pack: int, offset: int, stored_size: int, size: int, codec: int):
+        """Initialize a location.
+
+        Args:
+            digest: Raw SHA-256 of the blob
+            pack: Number of the pack file
+            offset: Offset of the stored bytes in the pack
+            stored_size: Length of the stored (compressed) bytes
+            size: Length of the blob
+            codec: Codec the blob is stored with
+        """
+        self.digest = digest
+        self.pack = pack
+        self.offset = offset
+        self.stored_size = stored_size
+        self.size = size
+        self.codec = codec
+
+
+class BlobIndex:
+    """Memory-mapped hash table from blob digest to pack location.
+
+    Slots are fixed-size records addressed by the first bytes of the
+    digest with linear probing, so lookups read a few slots of the mapped
+    file and the index costs no Python objects per blob. The table is
+    rebuilt at twice the size when it is 70% full.
+    """
+
+    def __init__(self, path: Path):
+        """Open the index file, creating an empty one if needed.
+
+        Raises:
+            ValueError: If the file is not a valid index
+        """
+        self.path = path
+        if not path.exists():
+            self._create(path, _MIN_CAPACITY, [])
+        self._open()
+
+    def _open(self) -> None:
+        """Map the index file and read its header."""
+        self._file = open(self.path, 'r+b')
+        try:
+            self._map = mmap.mmap(self._file.fileno(), 0)
+        except ValueError:
+            self._file.close()
+            raise ValueError(f"Empty artifact index {self.path}")
+        if len(self._map) < _HEADER_SIZE:
+            self.close()
+            raise ValueError(f"Invalid artifact index {self.path}")
+        magic, version, capacity, self.count, self.raw_bytes, self.stored_bytes = _HEADER.unpack_from(self._map, 0)
+        if magic != _INDEX_MAGIC or version != _INDEX_VERSION or len(self._map) != _HEADER_SIZE + capacity * _SLOT.size:
+            self.close()
+            raise ValueError(f"Invalid artifact index {self.path}")
+        self.capacity = capacity
+
+    @staticmethod
+    def _create(path: Path, capacity: int, locations: List[BlobLocation]) -> None:
+        """Write a new index holding the given blobs, replacing the file atomically."""
+        tmp_path = path.with_suffix('.tmp')
+        with open(tmp_path, 'w+b') as handle:
+            handle.truncate(_HEADER_SIZE + capacity * _SLOT.size)
+            with mmap.mmap(handle.fileno(), 0) as table:
+                for location in locations:
+                    slot = int.from_bytes(location.digest[:8], 'little') % capacity
+                    while table[_HEADER_SIZE + slot * _SLOT.size:_HEADER_SIZE + slot * _SLOT.size + 32] != _EMPTY_DIGEST:
+                        slot = (slot + 1) % capacity
+                    _SLOT.pack_into(table, _HEADER_SIZE + slot * _SLOT.size, location.digest, location.pack, location.offset,
+                                    location.stored_size, location.size, location.codec)
+                _HEADER.pack_into(table, 0, _INDEX_MAGIC, _INDEX_VERSION, capacity, len(locations),
+                                  sum(location.size for location in locations),
+                                  sum(location.stored_size for location in locations))
+                table.flush()
+        tmp_path.replace(path)
+
+    def _slot_of(self, digest: bytes) -> Tuple[int, bool]:
+        """Return the slot holding a digest, or the empty slot it would go in, and whether it was found."""
+        slot = int.from_bytes(digest[:8], 'little') % self.capacity
+        while True:
+            position = _HEADER_SIZE + slot * _SLOT.size
+            stored = self._map[position:position + 32]
+            if stored == digest:
+                return slot, True
+            if stored == _EMPTY_DIGEST:
+                return slot, False
+            slot = (slot + 1) % self.capacity
+
+    def get(self, digest: bytes) -> BlobLocation | None:
+        """Return the location of a blob, or None."""
+        slot, found = self._slot_of(digest)
+        if not found:
+            return None
+        return BlobLocation(*_SLOT.unpack_from(self._map, _HEADER_SIZE + slot * _SLOT.size))
+
+    def add(self, location: BlobLocation) -> None:
+        """Index a blob that was appended to a pack."""
+        if (self.count + 1) > self.capacity * _MAX_LOAD:
+            self.rebuild(list(self.locations()) + [location], self.capacity * 2)
+            return
+        slot, found = self._slot_of(location.digest)
+        if found:
+            return
+        _SLOT.pack_into(self._map, _HEADER_SIZE + slot * _SLOT.size, location.digest, location.pack, location.offset,
+                        location.stored_size, location.size, location.codec)
+        self.count += 1
+        self.raw_bytes += location.size
+        self.stored_bytes += location.stored_size
+        _HEADER.pack_into(self._map, 0, _INDEX_MAGIC, _INDEX_VERSION, self.capacity, self.count, self.raw_bytes, self.stored_bytes)
+
+    def locations(self) -> Iterator[BlobLocation]:
+        """Iterate over every indexed blob."""
+        for slot in range(self.capacity):
+            position = _HEADER_SIZE + slot * _SLOT.size
+            if self._map[position:position + 32] != _EMPTY_DIGEST:
+                yield BlobLocation(*_SLOT.unpack_from(self._map, position))
+
+    def rebuild(self, locations: List[BlobLocation], capacity: int | None = None) -> None:
+        """Replace the index with one holding exactly the given blobs."""
+        if capacity is None:
+            capacity = _MIN_CAPACITY
+            while len(locations) > capacity * _MAX_LOAD:
+                capacity *= 2
+        self.close()
+        self._create(self.path, capacity, locations)
+        self._open()
+
+    def close(self) -> None:
+        """Unmap the index file."""
+        self._map.close()
+        self._file.close()
+
+
+class ArtifactStore:
+    """On-disk store of compressed, content-addressed blobs.
+
+    Blobs (raw page bodies, extracted text, stage outputs) are identified
+    by the SHA-256 of their bytes, so storing the same content twice costs
+    nothing. They are compressed with zstd (zlib when the zstandard
+    package is missing) and appended to pack files of about pack_bytes;
+    a memory-mapped BlobIndex maps digests to pack offsets, so lookups
+    need neither a database query nor per-blob memory. Readable names
+    ("page" + URL, "session" + id) point at digests through a small SQLite
+    table of refs. Once the packs grow past max_bytes the oldest pack is
+    dropped with the blobs in it; refs to dropped blobs resolve to None.
+    The store is written by one process; packs and index are rebuilt from
+    the pack records if the index is lost.
+    """
+
+    def __init__(self, path: Union[str, Path], max_bytes: int | None = 1 << 30, pack_bytes: int = 64 << 20, level: int = 3):
+        """Open the store directory, creating it if needed.
+
+        Args:
+            path: Directory holding the packs, index and refs
+            max_bytes: Total size of the packs before the oldest is dropped (None: unbounded)
+            pack_bytes: Size at which a new pack is started
+            level: Compression level
+        """
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        self.pack_bytes = pack_bytes
+        self.level = level
+        self.stats_counters = {'puts': 0, 'deduplicated': 0, 'reads': 0, 'misses': 0, 'dropped_packs': 0}
+        self._lock = threading.RLock()
+        self._readers: Dict[int, BinaryIO] = {}
+        self._writer: BinaryIO | None = None
+
+        (self.path / 'packs').mkdir(parents=True, exist_ok=True)
+        self._packs = sorted(int(pack.stem) for pack in (self.path / 'packs').glob('*.pack') if pack.stem.isdigit())
+        self._pack_sizes = {pack: self._pack_path(pack).stat().st_size for pack in self._packs}
+        index_path = self.path / 'index.bin'
+        missing = not index_path.exists()
+        try:
+            self._index = BlobIndex(index_path)
+        except ValueError as e:
+            logger.warning(f"{e}, rebuilding it from the packs")
+            index_path.unlink()
+            self._index = BlobIndex(index_path)
+            missing = True
+        if missing and self._packs:
+            self._index.rebuild([location for pack in self._packs for location in self._scan_pack(pack)])
+            logger.info(f"Rebuilt artifact index with {self._index.count} blobs")
+
+        self._conn = sqlite3.connect(str(self.path / 'refs.sqlite3'), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS artifact_refs (
+                namespace TEXT NOT NULL,
+                name TEXT NOT NULL,
+                digest TEXT NOT NULL,
+                updated_at REAL NOT NULL,
+                PRIMARY KEY (namespace, name)
+            )"""
+        )
+        self._conn.commit()
+
+    def _pack_path(self, pack: int) -> Path:
+        return self.path / 'packs' / f"{pack:06d}.pack"
+
+    def _scan_pack(self, pack: int) -> Iterator[BlobLocation]:
+        """Iterate over the blobs of a pack by reading its record headers."""
+        path = self._pack_path(pack)
+        pack_size = path.stat().st_size
+        with open(path, 'rb') as handle:
+            offset = 0
+            while True:
+                header = handle.read(_RECORD.size)
+                if len(header) < _RECORD.size:
+                    return
+                magic, digest, codec, size, stored_size = _RECORD.unpack(header)
+                if magic != _RECORD_MAGIC or offset + _RECORD.size + stored_size > pack_size:
+                    logger.warning(f"Artifact pack {pack} is damaged at offset {offset}, ignoring the rest")
+                    return
+                offset += _RECORD.size
+                yield BlobLocation(digest, pack, offset, stored_size, size, codec)
+                offset += stored_size
+                handle.seek(offset)
+
+    def _append(self, digest: bytes, codec: int, size: int, stored: bytes) -> BlobLocation:
+        """Append a blob record to the current pack, starting a new pack when it is full."""
+        if self._writer is None or self._writer.tell() >= self.pack_bytes:
+            if self._writer is not None:
+                self._writer.close()
+            pack = self._packs[-1] if self._packs else 0
+            if not self._packs or self._pack_path(pack).stat().st_size >= self.pack_bytes:
+                pack += 1
+                self._packs.append(pack)
+            self._writer = open(self._pack_path(pack), 'ab')
+            self._writer.seek(0, os.SEEK_END)
+
+        self._writer.write(_RECORD.pack(_RECORD_MAGIC, digest, codec, size, len(stored)))
+        offset = self._writer.tell()
+        self._writer.write(stored)
+        self._writer.flush()
+        self._pack_sizes[self._packs[-1]] = self._writer.tell()
+        return BlobLocation(digest, self._packs[-1], offset, len(stored), size, codec)
+
+    def put(self, data: Union[bytes, str]) -> str:
+        """Store a blob unless it is already stored.
+
+        Args:
+            data: The blob (text is stored as UTF-8)
+
+        Returns:
+            str: The blob's digest (hex)
+        """
+        if isinstance(data, str):
+            data = data.encode('utf-8')
+        digest = hashlib.sha256(data).digest()
+        with self._lock:
+            if self._index.get(digest) is not None:
+                self.stats_counters['deduplicated'] += 1
+                return digest.hex()
+
+        codec, stored = _compress(data, self.level)
+        with self._lock:
+            if self._index.get(digest) is None:
+                self._index.add(self._append(digest, codec, len(data), stored))
+                self.stats_counters['puts'] += 1
+                self._enforce_limit()
+            else:
+                self.stats_counters['deduplicated'] += 1
+        return digest.hex()
+
+    def put_json(self, value: Any) -> str:
+        """Store a JSON-serializable value and return its digest."""
+        return self.put(json.dumps(value, ensure_ascii=False, sort_keys=True))
+
+    def get(self, digest: str) -> bytes | None:
+        """Return a stored blob, or None if it is unknown, dropped or unreadable."""
+        try:
+            raw_digest = bytes.fromhex(digest)
+        except ValueError:
+            return None
+        with self._lock:
+            location = self._index.get(raw_digest) if len(raw_digest) == 32 else None
+            if location is None or location.pack not in self._packs:
+                self.stats_counters['misses'] += 1
+                return None
+            try:
+                reader = self._readers.get(location.pack)
+                if reader is None:
+                    reader = self._readers[location.pack] = open(self._pack_path(location.pack), 'rb')
+                reader.seek(location.offset)
+                stored = reader.read(location.stored_size)
+            except OSError as e:
+                logger.error(f"Failed to read artifact {digest}: {e}")
+                self.stats_counters['misses'] += 1
+                return None
+            self.stats_counters['reads'] += 1
+
+        try:
+            return _decompress(location.codec, stored, location.size)
+        except Exception as e:
+            logger.error(f"Failed to decompress artifact {digest}: {e}")
+            return None
+
+    def get_text(self, digest: str) -> str | None:
+        """Return a stored text blob, or None."""
+        data = self.get(digest)
+        return data.decode('utf-8', errors='replace') if data is not None else None
+
+    def contains(self, digest: str) -> bool:
+        """Return whether a blob is stored."""
+        try:
+            raw_digest = bytes.fromhex(digest)
+        except ValueError:
+            return False
+        with self._lock:
+            location = self._index.get(raw_digest) if len(raw_digest) == 32 else None
+            return location is not None and location.pack in self._packs
+
+    def link(self, namespace: str, name: str, digest: str) -> None:
+        """Point a named ref at a blob, replacing what it pointed at before."""
+        with self._lock:
+            self._conn.execute("INSERT OR REPLACE INTO artifact_refs VALUES (?, ?, ?, ?)", (namespace, name, digest, time.time()))
+            self._conn.commit()
+
+    def resolve(self, namespace: str, name: str) -> str | None:
+        """Return the digest a ref points at, or None if it is unknown or its blob was dropped."""
+        with self._lock:
+            row = self._conn.execute("SELECT digest FROM artifact_refs WHERE namespace = ? AND name = ?", (namespace, name)).fetchone()
+        if row is None or not self.contains(row[0]):
+            return None
+        return row[0]
+
+    def refs(self, namespace: str, limit: int = 100) -> List[Dict[str, Any]]:
+        """Return the most recently updated refs of a namespace."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT name, digest, updated_at FROM artifact_refs WHERE namespace = ? ORDER BY updated_at DESC LIMIT ?",
+                (namespace, limit)
+            ).fetchall()
+        return [{'name': name, 'digest': digest, 'updated_at': updated_at} for name, digest, updated_at in rows]
+
+    def _enforce_limit(self) -> None:
+        """Drop the oldest packs while the packs exceed max_bytes, with their blobs and refs."""
+        if self.max_bytes is None:
+            return
+        total = sum(self._pack_sizes.values())
+        dropped = []
+        while len(self._packs) > 1 and total > self.max_bytes:
+            oldest = self._packs.pop(0)
+            total -= self._pack_sizes.pop(oldest, 0)
+            dropped.append(oldest)
+        if not dropped:
+            return
+
+        self._index.rebuild([location for location in self._index.locations() if location.pack not in dropped])
+        for pack in dropped:
+            reader = self._readers.pop(pack, None)
+            if reader is not None:
+                reader.close()
+            self._pack_path(pack).unlink()
+        stale = [
+            (namespace, name) for namespace, name, digest in self._conn.execute("SELECT namespace, name, digest FROM artifact_refs")
+            if self._index.get(bytes.fromhex(digest)) is None
+        ]
+        self._conn.executemany("DELETE FROM artifact_refs WHERE namespace = ? AND name = ?", stale)
+        self._conn.commit()
+        self.stats_counters['dropped_packs'] += len(dropped)
+        logger.info(f"Dropped {len(dropped)} artifact packs and {len(stale)} refs to stay under {self.max_bytes} bytes")
+
+    def stats(self) -> Dict[str, Any]:
+        """Return counters, blob count and the raw and stored sizes."""
+        with self._lock:
+            refs = self._conn.execute("SELECT namespace, COUNT(*) FROM artifact_refs GROUP BY namespace").fetchall()
+            raw_bytes, stored_bytes = self._index.raw_bytes, self._index.stored_bytes
+            return {
+                **self.stats_counters,
+                'codec': 'zstd' if ZSTD_AVAILABLE else 'zlib',
+                'blobs': self._index.count,
+                'raw_bytes': raw_bytes,
+                'stored_bytes': stored_bytes,
+                'compression_ratio': round(raw_bytes / stored_bytes, 2) if stored_bytes else 0.0,
+                'packs': len(self._packs),
+                'refs': dict(refs)
+            }
+
+    def close(self) -> None:
+        """Close the packs, index and refs database."""
+        with self._lock:
+            if self._writer is not None:
+                self._writer.close()
+                self._writer = None
+            for reader in self._readers.values():
+                reader.close()
+            self._readers.clear()
+            self._index.close()
+            self._conn.close()
+
+
+_store: ArtifactStore | None = None
+_store_lock = threading.Lock()
+
+
+def get_artifact_store() -> ArtifactStore | None:
+    """Return the process-wide artifact store, or None when it is disabled.
+
+    Settings are read from ARTIFACT_STORE_ENABLED, ARTIFACT_STORE_PATH,
+    ARTIFACT_STORE_MAX_BYTES (0: unbounded), ARTIFACT_STORE_PACK_BYTES and
+    ARTIFACT_STORE_LEVEL.
+    """
+    global _store
+
+    if os.getenv("ARTIFACT_STORE_ENABLED", "true").lower() != "true":
+        return None
+
+    with _store_lock:
+        if _store is None:
+            try:
+                _store = ArtifactStore(
+                    os.getenv("ARTIFACT_STORE_PATH") or get_data_dir() / "artifacts",
+                    max_bytes=int(os.getenv("ARTIFACT_STORE_MAX_BYTES", str(1 << 30))) or None,
+                    pack_bytes=int(os.getenv("ARTIFACT_STORE_PACK_BYTES", str(64 << 20))),
+                    level=int(os.getenv("ARTIFACT_STORE_LEVEL", "3"))
+                )
+                logger.info(f"Artifact store opened at {_store.path}")
+            except Exception as e:
+                logger.error(f"Failed to open artifact store, continuing without it: {e}")
+                return None
+    return _store
@@ -0,0 +1,96 @@
+"""Content-type detection for fetched documents."""
+
+from urllib.parse import urlsplit
+
+# Kinds of documents the fetch pipeline distinguishes
+HTML = 'html'
+TEXT = 'text'
+PDF = 'pdf'
+BINARY = 'binary'
+
+_HTML_TYPES = frozenset(('text/html', 'application/xhtml+xml'))
+_PDF_TYPES = frozenset(('application/pdf', 'application/x-pdf', 'application/acrobat'))
+_TEXT_TYPES = frozenset((
+    'application/json', 'application/ld+json', 'application/xml', 'application/rss+xml',
+    'application/atom+xml', 'application/javascript', 'application/x-yaml', 'application/yaml'
+))
+# Types servers send when they do not know better; the body decides
+_GENERIC_TYPES = frozenset(('', 'application/octet-stream', 'binary/octet-stream', 'application/unknown', 'application/download'))
+_BINARY_PREFIXES = ('image/', 'audio/', 'video/', 'font/', 'model/', 'application/')
+
+# Leading bytes of common binary formats
+_BINARY_SIGNATURES = (
+    b'\x89PNG', b'GIF8', b'\xff\xd8\xff', b'PK\x03\x04', b'\x1f\x8b', b'BZh', b'7z\xbc\xaf',
+    b'Rar!', b'RIFF', b'OggS', b'fLaC', b'ID3', b'\x1a\x45\xdf\xa3', b'wOFF', b'wOF2',
+    b'\xd0\xcf\x11\xe0', b'\x7fELF', b'II*\x00', b'MM\x00*'
+)
+
+# URL path extensions of files that are almost never worth downloading
+_BINARY_EXTENSIONS = frozenset((
+    'jpg', 'jpeg', 'png', 'gif', 'webp', 'bmp', 'tif', 'tiff', 'ico', 'heic', 'avif',
+    'mp3', 'wav', 'ogg', 'flac', 'm4a', 'aac', 'mp4', 'm4v', 'mov', 'avi', 'mkv', 'webm', 'wmv',
+    'zip', 'gz', 'tgz', 'bz2', 'xz', '7z', 'rar', 'tar', 'iso', 'dmg', 'exe', 'msi', 'bin', 'apk',
+    'doc', 'docx', 'xls', 'xlsx', 'ppt', 'pptx', 'woff', 'woff2', 'ttf', 'otf'
+))
+
+
+class UnsupportedContentError(Exception):
+    """Raised when a fetched document is of a type no text can be extracted from."""
+
+
+def _sniff(head: bytes) -> str | None:
+    """Return the kind the first bytes of a body reveal, or None if they are inconclusive."""
+    start = head.lstrip()[:1024]
+    if not start:
+        return None
+    if start.startswith(b'%PDF-'):
+        return PDF
+    if start.startswith(_BINARY_SIGNATURES) or start[4:8] == b'ftyp' or b'\x00' in start:
+        return BINARY
+    lowered = start[:256].lower()
+    if lowered.startswith(b'<') or b'<html' in lowered or b'<!doctype' in lowered:
+        return HTML
+    return TEXT
+
+
+def content_kind(content_type: str | None, head: bytes = b'') -> str:
+    """Classify a document by its Content-Type header and first bytes.
+
+    A PDF signature wins over the header, since servers label PDFs as
+    HTML or octet-stream often enough; generic or missing types are
+    decided by the body. Media and application types other than PDF and
+    structured text are binary.
+
+    Args:
+        content_type: Content-Type header value, if any
+        head: First bytes of the body (may be empty)
+
+    Returns:
+        One of HTML, TEXT, PDF or BINARY
+    """
+    sniffed = _sniff(head)
+    if sniffed == PDF:
+        return PDF
+
+    media_type = (content_type or '').split(';', 1)[0].strip().lower()
+    if media_type in _HTML_TYPES:
+        return HTML
+    if media_type in _PDF_TYPES:
+        return PDF
+    if media_type in _TEXT_TYPES or media_type.startswith('text/') or media_type.endswith(('+xml', '+json')):
+        return TEXT
+    if media_type in _GENERIC_TYPES:
+        return sniffed or HTML
+    if media_type.startswith(_BINARY_PREFIXES):
+        return BINARY
+    return sniffed or HTML
+
+
+def looks_binary(url: str) -> bool:
+    """Return whether a URL's path ends in the extension of a media or binary file."""
+    try:
+        path = urlsplit(url).path
+    except ValueError:
+        return False
+    name = path.rsplit('/', 1)[-1]
+    return '.' in name and name.rsplit('.', 1)[-1].lower() in _BINARY_EXTENSIONS
@@ -1,20 +1,34 @@
 """Enhanced web search tools with multiple fallback options."""
 
 import os
-import requests
+import time
+import asyncio
+import inspect
 import json
-from typing import List, Dict, Any, Tuple
+from typing import List, Dict, Any, Tuple, Callable, Awaitable
 from urllib.parse import quote_plus
 from strands import tool
 from datetime import datetime
 
-# Conditional import for tavily
-try:
-    from tavily import TavilyClient
-    TAVILY_AVAILABLE = True
-except ImportError:
-    TAVILY_AVAILABLE = False
-    TavilyClient = None
+import httpx
+
+from .http_client import get_http_client, run_sync
+from .search_cache import get_search_cache, normalize_query
+from .single_flight import SingleFlight
+from .provider_registry import ProviderUnavailableError, get_provider_registry
+from .provider_quota import get_quota_manager
+from .result_fusion import dedupe_results, reciprocal_rank_fusion
+from .result_packing import pack_results
+from .search_session import get_current_session
+from .search_types import SearchRecord, SearchResult, unique_values
+from .query_ledger import get_similarity_threshold
+from .replay import get_replay_layer
+from .page_fetch import fetch_and_extract, was_truncated
+from .page_extract import ExtractedPage
+from .passage_selection import select_passages
+from .page_fingerprints import PageFingerprint
+from ..utils.text_sanitizer import get_sanitizer
+from ..utils.urls import canonicalize_url
 
 # Conditional import for googlesearch
 try:
@@ -25,22 +39,13 @@ except ImportError:
     search = None
 
 
-@tool
-def enhanced_web_search(query: str, num_results: int = 10) -> str:
-    """
-    Enhanced web search with multiple fallback options.
-    
-    Args:
-        query: The search query string
-        num_results: Number of search results to return (default: 5, max: 10)
-        
-    Returns:
-        Formatted search results with titles, URLs, and snippets
-    """
-    print(f"🔍 Searching for: {query}")
-    
-    # Try multiple search methods in order of preference
-    search_methods = [
+# Concurrent identical provider calls, from any session, share one request
+search_flights = SingleFlight()
+
+
+def _get_search_methods() -> List[Callable[..., Awaitable[List[SearchResult]]]]:
+    """Return the provider adapters in static order of preference."""
+    return [
         _try_tavily_search,
         _try_serpapi_search,
         _try_google_search,
@@ -49,18 +54,332 @@ def enhanced_web_search(query: str, num_results: int = 10) -> str:
         _try_wikipedia_search,
         _try_news_search
     ]
-    
-    for method in search_methods:
+
+
+def _get_registry():
+    """Return the provider registry, registering the adapters on first use."""
+    return get_provider_registry(_get_search_methods())
+
+
+def _get_hedge_settings() -> Dict[str, Any]:
+    """Read the search fan-out settings from the environment.
+
+    SEARCH_STRATEGY selects how providers are tried:
+        - "sequential": one provider at a time, in order of preference
+        - "hedged": first good result set wins (default)
+        - "merge": results of all providers that answer in time are merged
+    """
+    strategy = os.getenv("SEARCH_STRATEGY", "hedged").lower()
+    if strategy not in ("sequential", "hedged", "merge"):
+        strategy = "hedged"
+
+    return {
+        'strategy': strategy,
+        # Number of providers started immediately
+        'fanout': max(1, int(os.getenv("SEARCH_HEDGE_FANOUT", "2"))),
+        # Seconds to wait on in-flight providers before starting the next one
+        'latency_budget': max(0.1, float(os.getenv("SEARCH_HEDGE_LATENCY_BUDGET", "2.0"))),
+        # Hard upper bound for the whole search, in seconds
+        'deadline': max(1.0, float(os.getenv("SEARCH_HEDGE_DEADLINE", "15.0"))),
+    }
+
+
+def _search_depth_key(method: Callable[..., Any], kwargs: Dict[str, Any]) -> str:
+    """Return the search_depth a provider call runs with, for cache keys."""
+    parameter = inspect.signature(method).parameters.get('search_depth')
+    return kwargs.get('search_depth', parameter.default if parameter else "")
+
+
+async def _call_provider(method: Callable[..., Awaitable[List[SearchResult]]], query: str, num_results: int, **kwargs: Any) -> List[SearchResult]:
+    """Call a provider adapter and store non-empty results in the search cache.
+
+    The call is admitted by the provider's rate limiter and quota ledger,
+    bounded by the timeout the provider registry derives from observed
+    latency, and its outcome feeds the provider's health. Concurrent
+    calls for the same provider, normalized query, num_results and
+    search_depth are collapsed into a single request. Search cache reads
+    and writes run in a thread, off the HTTP client loop.
+    """
+    search_depth = _search_depth_key(method, kwargs)
+    registry = _get_registry()
+    name = method.__name__
+    replay_key = [normalize_query(query), num_results, search_depth]
+
+    async def call() -> List[SearchResult]:
+        quota = get_quota_manager()
+        await quota.acquire(name)
+
+        if not registry.begin_call(name):
+            raise Exception(f"{name} circuit open, skipping")
+
+        started = time.monotonic()
         try:
-            results = method(query, num_results)
+            results = await asyncio.wait_for(
+                get_replay_layer().call_provider(method, replay_key, query, num_results, **kwargs),
+                registry.timeout_for(name)
+            )
+        except asyncio.CancelledError:
+            registry.cancel_call(name, time.monotonic() - started)
+            raise
+        except asyncio.TimeoutError:
+            error = Exception(f"timed out after {time.monotonic() - started:.1f}s")
+            await quota.record_call(name)
+            registry.record_failure(name, time.monotonic() - started, error)
+            raise error
+        except Exception as e:
+            if not isinstance(e, ProviderUnavailableError):
+                await quota.record_call(name)
+            registry.record_failure(name, time.monotonic() - started, e)
+            raise
+        await quota.record_call(name)
+        registry.record_success(name, time.monotonic() - started, len(results))
+        for result in results:
+            result.provider = name
+
+        cache = get_search_cache()
+        if results and cache is not None:
+            await asyncio.to_thread(cache.set, query, method.__name__, num_results, results, search_depth)
+
+        return results
+
+    key = ('search', method.__name__, normalize_query(query), num_results, search_depth)
+    return await search_flights.do(key, call)
+
+
+async def _cached_provider_search(method: Callable[..., Awaitable[List[SearchResult]]], query: str, num_results: int, **kwargs: Any) -> List[SearchResult]:
+    """Serve a single provider's results from the cache, calling it on a miss."""
+    cache = get_search_cache()
+    if cache is not None:
+        cached = await asyncio.to_thread(cache.get, query, method.__name__, num_results, _search_depth_key(method, kwargs))
+        if cached:
+            print(f"💾 Cache hit for {method.__name__}: {query}")
+            return cached
+
+    return await _call_provider(method, query, num_results, **kwargs)
+
+
+async def _run_search_methods_async(query: str, num_results: int) -> Tuple[List[SearchResult], str | None, bool]:
+    """Run the provider adapters according to the configured search strategy.
+
+    In hedged mode the first `fanout` providers start at once, and another one
+    is started whenever a provider fails, comes back empty, or the in-flight
+    calls exceed the latency budget. The first non-empty result set wins and
+    the losing calls are cancelled. Merge mode works the same way but gives
+    the remaining in-flight providers one more latency budget and merges
+    every result set that arrives with reciprocal rank fusion.
+
+    Args:
+        query: The search query string
+        num_results: Number of search results to return
+
+    Fresh cached results from any provider are served before any provider
+    is called. Providers are tried in the order chosen by the provider
+    registry, which skips providers whose circuit is open, and providers
+    close to their quota are routed around.
+
+    Returns:
+        Tuple of (results, successful_method, from_cache). successful_method is
+        None when every provider failed; in merge mode it lists all
+        contributing methods.
+    """
+    quota = get_quota_manager()
+    search_methods = [method for method in _get_registry().ordered() if not await quota.near_quota(method.__name__)]
+    settings = _get_hedge_settings()
+
+    cache = get_search_cache()
+    if cache is not None:
+        providers = [(method.__name__, _search_depth_key(method, {})) for method in search_methods]
+        cached = await asyncio.to_thread(cache.get_first, query, providers, num_results)
+        if cached:
+            provider, results = cached
+            print(f"💾 Cache hit for {provider}: {query}")
+            return results, provider, True
+
+    if settings['strategy'] == "sequential":
+        for method in search_methods:
+            try:
+                results = await _call_provider(method, query, num_results)
+                if results:
+                    print(f"✅ Search successful using {method.__name__}")
+                    return results, method.__name__, False
+            except Exception as e:
+                print(f"❌ {method.__name__} failed: {e}")
+                continue
+        return [], None, False
+
+    remaining = iter(search_methods)
+    pending = {}
+    successful = []
+    deadline = time.monotonic() + settings['deadline']
+
+    def launch_next() -> bool:
+        method = next(remaining, None)
+        if method is None:
+            return False
+        pending[asyncio.ensure_future(_call_provider(method, query, num_results))] = method
+        return True
+
+    for _ in range(settings['fanout']):
+        if not launch_next():
+            break
+
+    while pending:
+        time_left = deadline - time.monotonic()
+        if time_left <= 0:
+            print(f"⏱️ Search deadline reached for: {query}")
+            break
+
+        done, _ = await asyncio.wait(pending, timeout=min(settings['latency_budget'], time_left), return_when=asyncio.FIRST_COMPLETED)
+
+        if not done:
+            if successful:
+                # Merge mode: stragglers get one latency budget after the first answer
+                break
+            # Latency budget exceeded: hedge with the next provider
+            if launch_next():
+                print(f"⏱️ Providers slow, hedging with {list(pending.values())[-1].__name__}")
+            continue
+
+        for future in done:
+            method = pending.pop(future)
+            try:
+                results = future.result()
+            except asyncio.CancelledError:
+                results = []
+            except Exception as e:
+                print(f"❌ {method.__name__} failed: {e}")
+                results = []
+
             if results:
                 print(f"✅ Search successful using {method.__name__}")
-                return results
-        except Exception as e:
-            print(f"❌ {method.__name__} failed: {e}")
+                successful.append((method, results))
+            elif not successful:
+                launch_next()
+
+        if successful and settings['strategy'] == "hedged":
+            break
+
+    # Cancel the losing calls; their connections go back to the shared pool
+    for future in pending:
+        future.cancel()
+
+    if not successful:
+        return [], None, False
+
+    if settings['strategy'] == "merge" and len(successful) > 1:
+        # Keep preference order regardless of which provider answered first
+        successful.sort(key=lambda item: search_methods.index(item[0]))
+        merged = reciprocal_rank_fusion([results for _, results in successful], num_results)
+        return merged, "+".join(method.__name__ for method, _ in successful), False
+
+    method, results = successful[0]
+    return results, method.__name__, False
+
+
+def _run_search_methods(query: str, num_results: int) -> Tuple[List[SearchResult], str | None, bool]:
+    """Run the configured search strategy from synchronous code."""
+    return run_sync(_run_search_methods_async(query, num_results))
+
+
+def _select_new_results(results: List[SearchResult], query: str) -> Tuple[List[SearchResult], int]:
+    """Deduplicate results by canonical URL and drop those already returned earlier in the session.
+
+    Returns:
+        Tuple of (unique new results, number of results dropped as repeats from earlier rounds)
+    """
+    results = dedupe_results(results)
+    session = get_current_session()
+    if session is None:
+        return results, 0
+    return session.claim_results(results, query)
+
+
+def _record_search(record: SearchRecord) -> None:
+    """Add a search outcome to the telemetry of the running research session."""
+    session = get_current_session()
+    if session is not None:
+        session.record_search(record)
+
+
+def _record_query(query: str, results: List[SearchResult]) -> None:
+    """Add a searched query to the session's ledger of near-duplicate candidates."""
+    session = get_current_session()
+    if session is not None:
+        session.record_query(query, results)
+
+
+def _skip_near_duplicates(queries: List[str]) -> Tuple[List[str], List[Tuple[str, str, List[SearchResult]]]]:
+    """Split queries into those to search and near-duplicates to skip.
+
+    A query is skipped when it nearly duplicates a query searched earlier in
+    the session (see query_ledger.py). Queries of the same list are never
+    compared with each other: they are deliberate variants of one topic.
+
+    Returns:
+        Tuple of (queries to search, [(skipped query, earlier query, earlier results)])
+    """
+    session = get_current_session()
+    threshold = get_similarity_threshold()
+    if session is None or threshold is None:
+        return queries, []
+
+    to_search = []
+    skipped = []
+    for query in queries:
+        match = session.find_prior_query(query)
+        if match is None:
+            to_search.append(query)
             continue
+        entry, score = match
+        print(f"♻️ Skipping near-duplicate query '{query}' (similar to '{entry.query}', {score:.2f})")
+        session.note_avoided_search(query, entry.query)
+        skipped.append((query, entry.query, entry.results))
+    return to_search, skipped
+
+
+def _format_skipped_query(query: str, prior_query: str, prior_results: List[SearchResult]) -> str:
+    """Tell the agent a query was skipped and point it at the earlier results."""
+    clean = get_sanitizer().clean
+    message = f"Skipped '{clean(query)}': it is a near-duplicate of the earlier search '{clean(prior_query)}'."
+    if not prior_results:
+        return message + " Try a substantially different query."
+    lines = [f"- {clean(result.title) or 'Untitled'}: {result.link}" for result in prior_results[:5]]
+    return message + " Its results were already returned in this session, for example:\n" + "\n".join(lines)
+
+
+@tool
+def enhanced_web_search(query: str, num_results: int = 10) -> str:
+    """
+    Enhanced web search with multiple fallback options.
     
+    Args:
+        query: The search query string
+        num_results: Number of search results to return (default: 5, max: 10)
+        
+    Returns:
+        Formatted search results with titles, URLs, and snippets
+    """
+    print(f"🔍 Searching for: {query}")
+
+    _, skipped = _skip_near_duplicates([query])
+    if skipped:
+        return _format_skipped_query(*skipped[0])
+
+    results, successful_method, from_cache = _run_search_methods(query, num_results)
+    if results:
+        _record_query(query, results)
+        new_results, repeated = _select_new_results(results, query)
+        _record_search(SearchRecord(query, successful_method, new_results, repeated, from_cache))
+        if not new_results:
+            return f"All {repeated} results for '{query}' were already returned by earlier searches in this session. Use the sources you already have or try a different query."
+
+        formatted = _format_search_results(new_results, query)
+        if repeated:
+            formatted += f"\n\n[{repeated} results already returned by earlier searches were omitted]"
+        return formatted
+
     # If all methods fail, return a helpful message
+    _record_search(SearchRecord(query, None, [], error='All search methods failed'))
     return f"""Search temporarily unavailable for query: '{query}'
 
 I apologize, but I'm currently unable to access external search engines due to network connectivity issues. However, I can still provide information based on my training data.
@@ -68,50 +387,125 @@ I apologize, but I'm currently unable to access external search engines due to n
 For the topic '{query}', I can offer general information and insights. Please let me know if you'd like me to provide what I know about this subject, or if you'd prefer to try the search again later."""
 
 
-def _try_tavily_search(query: str, num_results: int, search_depth: str = "advanced") -> List[Dict[str, Any]]:
-    """Try Tavily Search API."""
-    if not TAVILY_AVAILABLE:
-        raise Exception("Tavily library not available")
+@tool
+def enhanced_multi_search(queries: List[str], num_results_per_query: int = 5, max_results: int = 15) -> str:
+    """Run several web searches concurrently and return one merged result list.
+
+    Use this with all queries from generate_search_queries in a single call
+    instead of calling enhanced_web_search once per query.
 
+    Args:
+        queries: The search query strings
+        num_results_per_query: Number of results to fetch per query (default: 5, max: 10)
+        max_results: Maximum number of merged results to return (default: 15)
+
+    Returns:
+        Formatted, deduplicated search results with titles, URLs, and snippets
+    """
+    # Drop repeated and blank queries, keeping the first spelling
+    unique_queries = []
+    seen = set()
+    for query in queries:
+        key = normalize_query(query)
+        if key and key not in seen:
+            seen.add(key)
+            unique_queries.append(query.strip())
+
+    if not unique_queries:
+        return "No search queries provided."
+
+    unique_queries, skipped = _skip_near_duplicates(unique_queries)
+    skipped_note = ""
+    if skipped:
+        skipped_note = "\n\n[Skipped as near-duplicates of other searches: " + "; ".join(
+            f"'{query}' ~ '{prior_query}'" for query, prior_query, _ in skipped
+        ) + "]"
+    if not unique_queries:
+        return "All queries are near-duplicates of earlier searches in this session; their results were already returned. Use the sources you already have or try substantially different queries." + skipped_note
+    print(f"🔍 Batch searching for {len(unique_queries)} queries: {unique_queries}")
+
+    async def search_all() -> List[Tuple[List[SearchResult], str | None, bool]]:
+        return await asyncio.gather(*[
+            _run_search_methods_async(query, num_results_per_query) for query in unique_queries
+        ])
+
+    outcomes = run_sync(search_all())
+    for query, (results, _, _) in zip(unique_queries, outcomes):
+        _record_query(query, results)
+    failed_queries = [query for query, (results, _, _) in zip(unique_queries, outcomes) if not results]
+    result_sets = [results for results, _, _ in outcomes if results]
+
+    if not result_sets:
+        _record_search(SearchRecord(" | ".join(unique_queries), None, [], error='All search methods failed'))
+        return f"Search temporarily unavailable for queries: {', '.join(repr(query) for query in unique_queries)}" + skipped_note
+
+    fused = reciprocal_rank_fusion(result_sets, max_results)
+    label = " | ".join(unique_queries)
+    new_results, repeated = _select_new_results(fused, label)
+    _record_search(SearchRecord(
+        label,
+        "+".join(unique_values(method for _, method, _ in outcomes if method)),
+        new_results,
+        repeated,
+        all(from_cache for results, _, from_cache in outcomes if results)
+    ))
+    if not new_results:
+        return f"All {repeated} results for these queries were already returned by earlier searches in this session. Use the sources you already have or try different queries." + skipped_note
+
+    formatted = _format_search_results(new_results, label)
+    if repeated:
+        formatted += f"\n\n[{repeated} results already returned by earlier searches were omitted]"
+    if failed_queries:
+        formatted += f"\n\n[No results for: {', '.join(failed_queries)}]"
+    return formatted + skipped_note
+
+
+async def _try_tavily_search(query: str, num_results: int, search_depth: str = "advanced") -> List[SearchResult]:
+    """Try Tavily Search API."""
     api_key = os.getenv("TAVILY_API_KEY")
 
     if not api_key:
-        raise Exception("Tavily Search API key not configured")
+        raise ProviderUnavailableError("Tavily Search API key not configured")
     print(f"🔍 num_results: {num_results}")
-    tavily_client = TavilyClient(api_key=api_key)
-    
-    # 调用Tavily搜索API
-    response = tavily_client.search(
-        query=query,
-        search_depth=search_depth,  # 可选值: "basic" 或 "advanced"
-        max_results=min(num_results, 10),
-        include_domains=[],  # 可选: 指定要包含的域名
-        exclude_domains=[],  # 可选: 指定要排除的域名
-        include_answer=True,  # 是否包含AI生成的摘要答案
-        include_raw_content= False,  # 是否包含原始内容
+
+    # 调用Tavily搜索API (REST, through the shared connection pool)
+    http_response = await get_http_client().post(
+        "https://api.tavily.com/search",
+        headers={'Authorization': f"Bearer {api_key}"},
+        json={
+            'query': query,
+            'search_depth': search_depth,  # 可选值: "basic" 或 "advanced"
+            'max_results': min(num_results, 10),
+            'include_domains': [],  # 可选: 指定要包含的域名
+            'exclude_domains': [],  # 可选: 指定要排除的域名
+            'include_answer': True,  # 是否包含AI生成的摘要答案
+            'include_raw_content': False,  # 是否包含原始内容
+        }
     )
-    
+    http_response.raise_for_status()
+    response = http_response.json()
+
     results = []
     
     # 处理搜索结果
     if response and "results" in response:
         for item in response["results"][:num_results]:
-            results.append({
-                'title': item.get('title', ''),
-                'link': item.get('url', ''),
-                'snippet': item.get('content', ''),
-                'source': 'Tavily'
-            })
+            results.append(SearchResult(
+                title=item.get('title', ''),
+                link=item.get('url', ''),
+                snippet=item.get('content', ''),
+                source='Tavily'
+            ))
   
     return results
 
 
-def _try_serpapi_search(query: str, num_results: int) -> List[Dict[str, Any]]:
+async def _try_serpapi_search(query: str, num_results: int) -> List[SearchResult]:
     """Try SerpAPI Search."""
     api_key = os.getenv("SERPAPI_API_KEY")
 
     if not api_key:
-        raise Exception("SerpAPI key not configured")
+        raise ProviderUnavailableError("SerpAPI key not configured")
 
     params = {
         "api_key": api_key,
@@ -124,7 +518,7 @@ def _try_serpapi_search(query: str, num_results: int) -> List[Dict[str, Any]]:
     }
 
     url = "https://serpapi.com/search"
-    response = requests.get(url, params=params, timeout=10)
+    response = await get_http_client().get(url, params=params)
     response.raise_for_status()
 
     data = response.json()
@@ -133,23 +527,23 @@ def _try_serpapi_search(query: str, num_results: int) -> List[Dict[str, Any]]:
     # Process organic results
     organic_results = data.get('organic_results', [])
     for item in organic_results[:num_results]:
-        results.append({
-            'title': item.get('title', ''),
-            'link': item.get('link', ''),
-            'snippet': item.get('snippet', ''),
-            'source': 'SerpAPI'
-        })
+        results.append(SearchResult(
+            title=item.get('title', ''),
+            link=item.get('link', ''),
+            snippet=item.get('snippet', ''),
+            source='SerpAPI'
+        ))
 
     return results
 
 
-def _try_google_search(query: str, num_results: int) -> List[Dict[str, Any]]:
+async def _try_google_search(query: str, num_results: int) -> List[SearchResult]:
     """Try Google Custom Search API."""
     api_key = os.getenv("GOOGLE_SEARCH_API_KEY")
     search_engine_id = os.getenv("GOOGLE_SEARCH_ENGINE_ID")
     
     if not api_key or not search_engine_id:
-        raise Exception("Google Search API credentials not configured")
+        raise ProviderUnavailableError("Google Search API credentials not configured")
     
     base_url = "https://www.googleapis.com/customsearch/v1"
     params = {
@@ -159,7 +553,7 @@ def _try_google_search(query: str, num_results: int) -> List[Dict[str, Any]]:
         'num': min(num_results, 10)
     }
     
-    response = requests.get(base_url, params=params, timeout=10)
+    response = await get_http_client().get(base_url, params=params)
     response.raise_for_status()
     
     data = response.json()
@@ -167,44 +561,47 @@ def _try_google_search(query: str, num_results: int) -> List[Dict[str, Any]]:
     
     if 'items' in data:
         for item in data['items']:
-            results.append({
-                'title': item.get('title', ''),
-                'link': item.get('link', ''),
-                'snippet': item.get('snippet', ''),
-                'source': item.get('displayLink', '')
-            })
+            results.append(SearchResult(
+                title=item.get('title', ''),
+                link=item.get('link', ''),
+                snippet=item.get('snippet', ''),
+                source=item.get('displayLink', '')
+            ))
     
     return results
 
 
-def _try_googlesearch_library(query: str, num_results: int) -> List[Dict[str, Any]]:
+async def _try_googlesearch_library(query: str, num_results: int) -> List[SearchResult]:
     """Try googlesearch library (free Google search without API key)."""
     if not GOOGLESEARCH_AVAILABLE:
-        raise Exception("googlesearch library not available")
+        raise ProviderUnavailableError("googlesearch library not available")
 
     try:
         # Use the googlesearch library to perform search
-        # The search function returns URLs, we need to get titles and snippets separately
-        search_results = search(query, advanced=True, num_results=min(num_results, 10))
+        # The search function returns URLs, we need to get titles and snippets separately.
+        # The library is blocking, so it runs in a worker thread.
+        search_results = await asyncio.to_thread(
+            lambda: list(search(query, advanced=True, num_results=min(num_results, 10)))
+        )
 
         results = []
         for result in search_results:
             # The advanced=True option returns SearchResult objects with url, title, description
             if hasattr(result, 'url') and hasattr(result, 'title'):
-                results.append({
-                    'title': result.title or 'No title available',
-                    'link': result.url,
-                    'snippet': getattr(result, 'description', '') or 'No description available',
-                    'source': 'GoogleSearch Library'
-                })
+                results.append(SearchResult(
+                    title=result.title or 'No title available',
+                    link=result.url,
+                    snippet=getattr(result, 'description', '') or 'No description available',
+                    source='GoogleSearch Library'
+                ))
             else:
                 # Fallback for simple URL results
-                results.append({
-                    'title': f"Search result for: {query}",
-                    'link': str(result),
-                    'snippet': 'No description available',
-                    'source': 'GoogleSearch Library'
-                })
+                results.append(SearchResult(
+                    title=f"Search result for: {query}",
+                    link=str(result),
+                    snippet='No description available',
+                    source='GoogleSearch Library'
+                ))
 
             if len(results) >= num_results:
                 break
@@ -215,11 +612,11 @@ def _try_googlesearch_library(query: str, num_results: int) -> List[Dict[str, An
         raise Exception(f"GoogleSearch library error: {str(e)}")
 
 
-def _try_duckduckgo_search(query: str, num_results: int) -> List[Dict[str, Any]]:
+async def _try_duckduckgo_search(query: str, num_results: int) -> List[SearchResult]:
     """Try DuckDuckGo search."""
     url = f"https://api.duckduckgo.com/?q={quote_plus(query)}&format=json&no_html=1&skip_disambig=1"
     
-    response = requests.get(url, timeout=10)
+    response = await get_http_client().get(url)
     response.raise_for_status()
     
     data = response.json()
@@ -227,41 +624,41 @@ def _try_duckduckgo_search(query: str, num_results: int) -> List[Dict[str, Any]]
     
     # Add abstract if available
     if data.get('Abstract'):
-        results.append({
-            'title': data.get('AbstractSource', 'DuckDuckGo'),
-            'link': data.get('AbstractURL', ''),
-            'snippet': data.get('Abstract', ''),
-            'source': data.get('AbstractSource', '')
-        })
+        results.append(SearchResult(
+            title=data.get('AbstractSource', 'DuckDuckGo'),
+            link=data.get('AbstractURL', ''),
+            snippet=data.get('Abstract', ''),
+            source=data.get('AbstractSource', '')
+        ))
     
     # Add related topics
     for topic in data.get('RelatedTopics', [])[:num_results-1]:
         if isinstance(topic, dict) and 'Text' in topic:
-            results.append({
-                'title': topic.get('Text', '').split(' - ')[0] if ' - ' in topic.get('Text', '') else topic.get('Text', ''),
-                'link': topic.get('FirstURL', ''),
-                'snippet': topic.get('Text', ''),
-                'source': topic.get('FirstURL', '').split('/')[2] if topic.get('FirstURL') else ''
-            })
+            results.append(SearchResult(
+                title=topic.get('Text', '').split(' - ')[0] if ' - ' in topic.get('Text', '') else topic.get('Text', ''),
+                link=topic.get('FirstURL', ''),
+                snippet=topic.get('Text', ''),
+                source=topic.get('FirstURL', '').split('/')[2] if topic.get('FirstURL') else ''
+            ))
     
     return results[:num_results]
 
 
-def _try_wikipedia_search(query: str, num_results: int) -> List[Dict[str, Any]]:
+async def _try_wikipedia_search(query: str, num_results: int) -> List[SearchResult]:
     """Try Wikipedia search as fallback."""
     search_url = "https://en.wikipedia.org/api/rest_v1/page/summary/" + quote_plus(query)
     
     try:
-        response = requests.get(search_url, timeout=10)
+        response = await get_http_client().get(search_url)
         if response.status_code == 200:
             data = response.json()
-            return [{
-                'title': data.get('title', query),
-                'link': data.get('content_urls', {}).get('desktop', {}).get('page', ''),
-                'snippet': data.get('extract', ''),
-                'source': 'Wikipedia'
-            }]
-    except:
+            return [SearchResult(
+                title=data.get('title', query),
+                link=data.get('content_urls', {}).get('desktop', {}).get('page', ''),
+                snippet=data.get('extract', ''),
+                source='Wikipedia'
+            )]
+    except Exception:
         pass
     
     # Try Wikipedia search API
@@ -274,108 +671,51 @@ def _try_wikipedia_search(query: str, num_results: int) -> List[Dict[str, Any]]:
         'srlimit': min(num_results, 5)
     }
     
-    response = requests.get(search_api, params=params, timeout=10)
+    response = await get_http_client().get(search_api, params=params)
     response.raise_for_status()
     
     data = response.json()
     results = []
     
     for item in data.get('query', {}).get('search', []):
-        results.append({
-            'title': item.get('title', ''),
-            'link': f"https://en.wikipedia.org/wiki/{quote_plus(item.get('title', ''))}",
-            'snippet': item.get('snippet', '').replace('<span class="searchmatch">', '').replace('</span>', ''),
-            'source': 'Wikipedia'
-        })
+        results.append(SearchResult(
+            title=item.get('title', ''),
+            link=f"https://en.wikipedia.org/wiki/{quote_plus(item.get('title', ''))}",
+            snippet=item.get('snippet', '').replace('<span class="searchmatch">', '').replace('</span>', ''),
+            source='Wikipedia'
+        ))
     
     return results
 
 
-def _try_news_search(query: str, num_results: int) -> List[Dict[str, Any]]:
+async def _try_news_search(query: str, num_results: int) -> List[SearchResult]:
     """Try news search as another fallback."""
     # This is a placeholder for news API integration
     # You could integrate with NewsAPI, Bing News, etc.
-    return []
+    # Until then it reports itself unconfigured so it never takes a provider slot
+    raise ProviderUnavailableError("News search is not configured")
+
 
+def _format_search_results(results: List[SearchResult], query: str, token_budget: int | None = None) -> str:
+    """Format search results for the agent.
 
-def _format_search_results(results: List[Dict[str, Any]], query: str) -> str:
-    """Format search results for the agent with enhanced DeepSeek API compatibility."""
+    Text fields are cleaned with the character policy of the configured
+    model (see utils/text_sanitizer.py) and results are packed into a
+    compact listing that fits the model's token budget (see
+    result_packing.py), shortening snippets instead of cutting the output
+    off mid-result.
+    """
     if not results:
         return f"No search results found for query: {query}"
 
-    # Create detailed search summary
-    sources = list(set([result.get('source', 'Unknown') for result in results if result.get('source')]))
-
-    # Enhanced cleaning function for DeepSeek API compatibility
-    def clean_text_for_deepseek(text: str) -> str:
-        """Clean text to ensure compatibility with DeepSeek API."""
-        if not text:
-            return ""
-
-        # Convert to string if not already
-        text = str(text)
-
-        # Remove null bytes and other problematic characters
-        text = text.replace('\x00', '')
-
-        # Remove or replace non-printable characters except common whitespace
-        import re
-        text = re.sub(r'[\x00-\x08\x0B\x0C\x0E-\x1F\x7F-\x9F]', ' ', text)
-
-        # Replace problematic Unicode characters that might cause issues
-        text = re.sub(r'[^\x20-\x7E\u4e00-\u9fff\u3400-\u4dbf\u3000-\u303f\uff00-\uffef]', ' ', text)
-
-        # Normalize whitespace
-        text = re.sub(r'\s+', ' ', text)
-
-        # Ensure the string is not empty
-        if not text.strip():
-            return "N/A"
-
-        return text.strip()
-
-    # Clean query for safe display
-    clean_query = clean_text_for_deepseek(query)
-
-    formatted = f"""## Search Results Summary
-**Query**: {clean_query}
-**Results Count**: {len(results)}
-**Sources**: {', '.join([clean_text_for_deepseek(s) for s in sources])}
-**Search Time**: {__import__('datetime').datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
-
-## Detailed Results
-
-"""
-
-    for i, result in enumerate(results, 1):
-        # Clean all text fields to ensure they are valid strings
-        title = clean_text_for_deepseek(result.get('title', 'N/A'))
-        url = str(result.get('link', 'N/A'))  # URLs should be ASCII-safe
-        snippet = clean_text_for_deepseek(result.get('snippet', 'N/A'))
-        source = clean_text_for_deepseek(result.get('source', 'N/A'))
-
-        # Limit individual field lengths
-        title = title[:200] if len(title) > 200 else title
-        snippet = snippet[:500] if len(snippet) > 500 else snippet
-        source = source[:100] if len(source) > 100 else source
-
-        formatted += f"### Result {i}: {title}\n"
-        formatted += f"**Source**: {source}\n"
-        formatted += f"**URL**: {url}\n"
-        formatted += f"**Summary**: {snippet}\n\n"
-        formatted += "---\n\n"
-
-    # Final cleanup of the entire formatted string
-    formatted = clean_text_for_deepseek(formatted)
+    sanitizer = get_sanitizer()
 
-    # Limit total length to prevent API issues with DeepSeek
-    max_total_length = 2500  # Conservative limit for DeepSeek API
-    if len(formatted) > max_total_length:
-        formatted = formatted[:max_total_length] + "\n\n[Search results truncated due to length limit]"
+    # Each field is cleaned once; the listing keeps its line structure
+    formatted = pack_results(results, query, token_budget, clean=sanitizer.clean)
 
     # Ensure the result is a valid string
     if not formatted or not formatted.strip():
-        return f"Search completed for query: {clean_query}, but no valid results could be formatted."
+        return f"Search completed for query: {sanitizer.clean(query)}, but no valid results could be formatted."
 
     return formatted
 
@@ -393,68 +733,21 @@ def enhanced_web_search_with_summary(query: str, num_results: int = 5) -> Tuple[
     """
     print(f"🔍 Searching for: {query}")
 
-    # Try multiple search methods in order of preference
-    search_methods = [
-        _try_tavily_search,
-        _try_serpapi_search,
-        _try_google_search,
-        _try_googlesearch_library,
-        _try_duckduckgo_search,
-        _try_wikipedia_search,
-        _try_news_search
-    ]
-
-    results = []
-    successful_method = None
-
-    for method in search_methods:
-        try:
-            results = method(query, num_results)
-            if results:
-                successful_method = method.__name__
-                print(f"✅ Search successful using {method.__name__}")
-                break
-        except Exception as e:
-            print(f"❌ {method.__name__} failed: {e}")
-            continue
+    results, successful_method, from_cache = _run_search_methods(query, num_results)
+    results = dedupe_results(results)
+    cache = get_search_cache()
+    cache_info = {'hit': from_cache, **cache.stats()} if cache is not None else {'enabled': False}
 
     if not results:
         # If all methods fail, return empty results
-        summary_data = {
-            'query': query,
-            'total_results': 0,
-            'sources': [],
-            'search_method': 'failed',
-            'timestamp': datetime.now().isoformat(),
-            'status': 'failed',
-            'error': 'All search methods failed'
-        }
+        record = SearchRecord(query, None, [], error='All search methods failed')
+        summary_data = {**record.to_summary(), 'cache': cache_info}
         formatted_results = f"Search temporarily unavailable for query: '{query}'"
         return formatted_results, summary_data
 
-    # Generate summary data
-    sources = list(set([result.get('source', 'Unknown') for result in results if result.get('source')]))
-    domains = list(set([result.get('link', '').split('/')[2] if result.get('link') and '://' in result.get('link', '') else 'Unknown' for result in results]))
-    domains = [d for d in domains if d != 'Unknown']
-
-    summary_data = {
-        'query': query,
-        'total_results': len(results),
-        'sources': sources,
-        'domains': domains[:5],  # Top 5 domains
-        'search_method': successful_method,
-        'timestamp': datetime.now().isoformat(),
-        'status': 'success',
-        'results_preview': [
-            {
-                'title': result.get('title', 'N/A')[:100],
-                'domain': result.get('link', '').split('/')[2] if result.get('link') and '://' in result.get('link', '') else 'Unknown',
-                'snippet': result.get('snippet', 'N/A')[:150],
-                'source': result.get('source', 'Unknown')
-            }
-            for result in results[:3]  # Top 3 results preview
-        ]
-    }
+    # Generate summary data from the result records
+    record = SearchRecord(query, successful_method, results, from_cache=from_cache)
+    summary_data = {**record.to_summary(), 'cache': cache_info}
 
     # Format results
     formatted_results = _format_search_results(results, query)
@@ -462,111 +755,302 @@ def enhanced_web_search_with_summary(query: str, num_results: int = 5) -> Tuple[
     return formatted_results, summary_data
 
 
+def _focus_queries(focus: str = "") -> List[str]:
+    """Return the queries page passages are ranked against.
+
+    These are the session's research question and latest search, plus
+    the focus the agent passed, most specific last; empty when passage
+    selection is disabled (PAGE_PASSAGE_SELECTION).
+    """
+    if os.getenv("PAGE_PASSAGE_SELECTION", "true").lower() != "true":
+        return []
+    session = get_current_session()
+    queries = session.focus_queries() if session is not None else []
+    if focus and focus.strip():
+        queries.append(focus.strip())
+    return queries
+
+
+def _read_chars(max_chars: int, queries: List[str]) -> int:
+    """Return how many characters of a page to fetch for max_chars of output."""
+    if not queries:
+        return max_chars
+    # Relevant passages are often far down the page, so read past the first screens
+    return max_chars * max(1, int(os.getenv("PAGE_PASSAGE_READ_FACTOR", "3")))
+
+
+def _cut_text(text: str, limit: int) -> str:
+    """Cut text to at most limit characters, preferring a paragraph or line break."""
+    if len(text) <= limit:
+        return text
+    cut = text[:limit]
+    boundary = cut.rfind('\n')
+    return cut[:boundary].rstrip() if boundary > limit * 0.7 else cut.rstrip()
+
+
+def _fit_text(text: str, limit: int, queries: List[str]) -> Tuple[str, bool]:
+    """Fit page text into limit characters.
+
+    Returns:
+        Tuple of (text, focused): the passages most relevant to the queries
+        when some match, otherwise the start of the page
+    """
+    if queries:
+        selected = select_passages(text, queries, limit)
+        if selected is not None:
+            return selected, True
+    return _cut_text(text, limit), False
+
+
+def _duplicate_notice(url: str, original: PageFingerprint) -> str:
+    """Tell the agent that a page repeats one it already has."""
+    title = f" ({original.title})" if original.title else ""
+    return (
+        f"## Duplicate of an earlier page\n**Source**: {url}\n\n"
+        f"This page carries the same content as {original.url}{title}, which was already retrieved in this research session. "
+        f"It was recorded as a corroborating source for that page; cite both URLs instead of fetching it again."
+    )
+
+
 @tool
-def get_page_content(url: str, max_chars: int = 4000) -> str:
+def get_page_content(url: str, max_chars: int = 4000, focus: str = "") -> str:
     """
     Fetch and extract text content from a web page and convert it to markdown.
-    
+
+    Long pages are reduced to the passages most relevant to the research
+    question and the latest search, instead of their first max_chars. A
+    page that repeats one already retrieved in this research (syndicated
+    or mirrored copies) is not returned again.
+
     Args:
         url: The URL to fetch content from
-        max_chars: Maximum number of characters to return (default: 2000)
-        
+        max_chars: Maximum number of characters to return (default: 4000)
+        focus: What to look for on the page, e.g. the current sub-question (optional)
+
     Returns:
         Extracted text content from the web page as markdown
     """
     try:
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-        }
-        
-        response = requests.get(url, headers=headers, timeout=10)
-        response.raise_for_status()
-       
-        # Use BeautifulSoup for better HTML parsing and HTML to Markdown conversion
-        try:
-            from bs4 import BeautifulSoup
-            from markdownify import markdownify as md
-            
-            soup = BeautifulSoup(response.text, 'html.parser')
-            
-            # Remove unwanted elements
-            for element in soup(['script', 'style', 'nav', 'footer', 'iframe']):
-                element.decompose()
-            
-            print(f"✅ 成功从 {url} 获取内容")
-            # Convert HTML to Markdown
-            markdown_content = md(str(soup))
-
-            # Clean up the markdown
-            import re
-            markdown_content = re.sub(r'\n{3,}', '\n\n', markdown_content)  # Remove excess newlines
-            markdown_content = markdown_content.strip()
-
-            # Enhanced content cleaning for DeepSeek API compatibility
-            def clean_content_for_deepseek(content: str) -> str:
-                """Clean content to ensure compatibility with DeepSeek API."""
-                if not content:
-                    return ""
-
-                # Remove null bytes and other problematic characters
-                content = content.replace('\x00', '')
-
-                # Remove or replace non-printable characters except common whitespace
-                content = re.sub(r'[\x00-\x08\x0B\x0C\x0E-\x1F\x7F-\x9F]', ' ', content)
-
-                # Replace problematic Unicode characters that might cause issues
-                content = re.sub(r'[^\x20-\x7E\u4e00-\u9fff\u3400-\u4dbf\u3000-\u303f\uff00-\uffef]', ' ', content)
-
-                # Normalize whitespace
-                content = re.sub(r'\s+', ' ', content)
-
-                return content.strip()
-
-            markdown_content = clean_content_for_deepseek(markdown_content)
-            title_text = clean_content_for_deepseek(soup.title.text if soup.title else "Web Page")
-
-            result = f"""## Web Content: {title_text}
+        session = get_current_session()
+        original = session.known_duplicate(url) if session is not None else None
+        if original is not None:
+            return _duplicate_notice(url, original)
+
+        queries = _focus_queries(focus)
+        # Raw bytes straight to cleaned markdown, parsed in the extraction pool
+        response, page = run_sync(fetch_and_extract(url, _read_chars(max_chars, queries)))
+        truncated = was_truncated(response)
+        markdown_content = page.text
+        title_text = page.title or "Web Page"
+
+        # Ensure the result is not empty
+        if not markdown_content:
+            return f"Successfully retrieved content from {url}, but content could not be properly formatted."
+
+        original = session.register_page(url, title_text, markdown_content) if session is not None else None
+        if original is not None:
+            print(f"♻️ {url} duplicates {original.url}")
+            return _duplicate_notice(url, original)
+
+        print(f"✅ 成功从 {url} 获取内容 ({page.engine})")
+        content, focused = _fit_text(markdown_content, max_chars, queries)
+        result = f"""## Web Content: {title_text}
 **Source**: {url}
-**Retrieved**: {__import__('datetime').datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
+**Retrieved**: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
 
-{markdown_content[:max_chars] if len(markdown_content) > max_chars else markdown_content}
-"""
-            if len(markdown_content) > max_chars:
-                result += "\n\n[Content truncated due to length limit]"
-
-            # Final cleanup of the result
-            result = clean_content_for_deepseek(result)
-
-            # Ensure the result is not empty
-            if not result or not result.strip():
-                return f"Successfully retrieved content from {url}, but content could not be properly formatted."
-
-            print(f"✅ Successfully retrieved content, length: {len(result)} characters")
-            return result
-            
-        except ImportError:
-            # Fallback if markdownify or BeautifulSoup is not available
-            import re
-            text = response.text
-            text = re.sub(r'<[^>]+>', ' ', text)  # Remove HTML tags
-            text = re.sub(r'\s+', ' ', text)      # Normalize whitespace
-            text = text.strip()
-            
-            result = f"""## 网页内容
-**来源**: {url}
-**获取时间**: {__import__('datetime').datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
-
-{text[:max_chars] if len(text) > max_chars else text}
+{content}
 """
-            if len(text) > max_chars:
-                result += "\n\n[内容已截断，超出字符限制]"
-                
-            return result
-        
+        if focused:
+            result += "\n\n[Showing the passages most relevant to the research question; [...] marks omitted text]"
+        elif truncated or len(content) < len(markdown_content):
+            result += "\n\n[Content truncated due to length limit]"
+
+        print(f"✅ Successfully retrieved content, length: {len(result)} characters")
+        return result
+
     except Exception as e:
         return f"Error fetching page content from {url}: {str(e)}"
 
 
+class PageOutcome:
+    """The result of one URL in a get_page_contents batch.
+
+    Exactly one of page and error is set; latency is the wall time from
+    the start of the batch until the page was extracted or failed.
+    duplicate_of is the earlier page of the session that the page repeats.
+    """
+
+    __slots__ = ('url', 'page', 'truncated', 'latency', 'error', 'duplicate_of')
+
+    def __init__(self, url: str, page: ExtractedPage | None = None, truncated: bool = False, latency: float = 0.0, error: str | None = None):
+        """Initialize the outcome; see the class docstring for the fields."""
+        self.url = url
+        self.page = page
+        self.truncated = truncated
+        self.latency = latency
+        self.error = error
+        self.duplicate_of: PageFingerprint | None = None
+
+
+def _describe_fetch_error(error: Exception) -> str:
+    """Return a short reason for a failed page fetch."""
+    if isinstance(error, httpx.HTTPStatusError):
+        return f"HTTP {error.response.status_code}"
+    if isinstance(error, httpx.TimeoutException):
+        return "timed out"
+    return str(error) or type(error).__name__
+
+
+async def _fetch_pages(urls: List[str], max_chars: int, deadline: float) -> List[PageOutcome]:
+    """Fetch and extract pages concurrently.
+
+    Concurrency per domain is left to the fetch scheduler (see
+    fetch_scheduler.py), which every page fetch goes through. Pages still
+    running when the deadline passes are cancelled and reported as timed
+    out; outcomes keep the order of urls.
+    """
+    started = time.monotonic()
+
+    async def fetch_one(url: str) -> PageOutcome:
+        try:
+            response, page = await fetch_and_extract(url, max_chars)
+            return PageOutcome(url, page, was_truncated(response), time.monotonic() - started)
+        except Exception as e:
+            return PageOutcome(url, latency=time.monotonic() - started, error=_describe_fetch_error(e))
+
+    tasks = [asyncio.ensure_future(fetch_one(url)) for url in urls]
+    await asyncio.wait(tasks, timeout=deadline)
+    outcomes = []
+    for url, task in zip(urls, tasks):
+        if task.done():
+            outcomes.append(task.result())
+        else:
+            task.cancel()
+            outcomes.append(PageOutcome(url, latency=deadline, error="deadline exceeded"))
+    return outcomes
+
+
+def _allocate_budgets(lengths: List[int], total: int) -> List[int]:
+    """Split a character budget across pages of the given lengths.
+
+    Every page gets an equal share; what short pages leave unused goes to
+    the longer ones (water-filling), so the budget is spent where there is
+    text to fill it.
+    """
+    budgets = [0] * len(lengths)
+    remaining = total
+    pending = sorted(range(len(lengths)), key=lambda index: lengths[index])
+    while pending:
+        share = remaining // len(pending)
+        index = pending.pop(0)
+        budgets[index] = min(lengths[index], share)
+        remaining -= budgets[index]
+    return budgets
+
+
+@tool
+def get_page_contents(urls: List[str], max_total_chars: int = 12000, focus: str = "") -> str:
+    """Fetch several web pages concurrently and return their content as markdown.
+
+    Use this with the most promising URLs from the search results in a
+    single call instead of calling get_page_content once per URL. Long
+    pages are reduced to the passages most relevant to the research
+    question and the latest search, and pages that repeat one already
+    retrieved in this research are listed instead of returned again.
+
+    Args:
+        urls: The URLs to fetch (duplicates are skipped; at most 8 are fetched)
+        max_total_chars: Maximum number of characters to return across all pages (default: 12000)
+        focus: What to look for on the pages, e.g. the current sub-question (optional)
+
+    Returns:
+        The extracted content of each page, followed by per-URL fetch times and failures
+    """
+    # Drop repeated URLs, keeping the first spelling
+    unique_urls = []
+    seen = set()
+    for url in urls:
+        key = canonicalize_url(url.strip()) if url and url.strip() else ""
+        if key and key not in seen:
+            seen.add(key)
+            unique_urls.append(url.strip())
+
+    if not unique_urls:
+        return "No URLs provided."
+
+    session = get_current_session()
+    known_duplicates = []
+    if session is not None:
+        for url in list(unique_urls):
+            original = session.known_duplicate(url)
+            if original is not None:
+                unique_urls.remove(url)
+                known_duplicates.append((url, original))
+    if not unique_urls:
+        return "\n\n".join(_duplicate_notice(url, original) for url, original in known_duplicates)
+
+    max_urls = int(os.getenv("PAGE_BATCH_MAX_URLS", "8"))
+    skipped_urls = unique_urls[max_urls:]
+    unique_urls = unique_urls[:max_urls]
+    print(f"📄 Fetching {len(unique_urls)} pages concurrently")
+
+    # Fetch a fair share per page; the fetch margin leaves room to hand on what short pages leave over
+    per_page_chars = max(1000, max_total_chars // len(unique_urls))
+    queries = _focus_queries(focus)
+    started = time.monotonic()
+    outcomes = run_sync(_fetch_pages(
+        unique_urls,
+        _read_chars(per_page_chars, queries),
+        float(os.getenv("PAGE_BATCH_DEADLINE", "20"))
+    ))
+    elapsed = time.monotonic() - started
+
+    for outcome in outcomes:
+        if outcome.page is not None and not outcome.page.text:
+            outcome.error = "no text content"
+        elif outcome.page is not None and session is not None:
+            # Pages are registered in input order, so the first copy is the one returned
+            outcome.duplicate_of = session.register_page(outcome.url, outcome.page.title or "Web Page", outcome.page.text)
+    fetched = [outcome for outcome in outcomes if outcome.page is not None and outcome.page.text and outcome.duplicate_of is None]
+    budgets = _allocate_budgets([len(outcome.page.text) for outcome in fetched], max_total_chars)
+
+    sections = []
+    for number, (outcome, budget) in enumerate(zip(fetched, budgets), 1):
+        text, focused = _fit_text(outcome.page.text, budget, queries)
+        section = f"""## [{number}] {outcome.page.title or "Web Page"}
+**Source**: {outcome.url}
+**Fetched in**: {outcome.latency:.2f}s
+
+{text}"""
+        if focused:
+            section += "\n\n[Most relevant passages; [...] marks omitted text]"
+        elif outcome.truncated or len(text) < len(outcome.page.text):
+            section += "\n\n[Content truncated due to length limit]"
+        sections.append(section)
+
+    report = [f"Returned {len(fetched)} of {len(outcomes)} pages in {elapsed:.2f}s at {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"]
+    for outcome in outcomes:
+        if outcome.error is not None:
+            report.append(f"- {outcome.url}: failed ({outcome.error}) after {outcome.latency:.2f}s")
+        elif outcome.duplicate_of is not None:
+            report.append(f"- {outcome.url}: {outcome.latency:.2f}s, duplicate of {outcome.duplicate_of.url} (recorded as corroborating, not repeated)")
+        else:
+            report.append(f"- {outcome.url}: {outcome.latency:.2f}s")
+    report.extend(
+        f"- {url}: not fetched, known duplicate of {original.url} (recorded as corroborating)"
+        for url, original in known_duplicates
+    )
+    if skipped_urls:
+        report.append(f"[Not fetched, over the limit of {max_urls} URLs per call: {', '.join(skipped_urls)}]")
+
+    print(f"✅ Retrieved {len(fetched)}/{len(outcomes)} pages in {elapsed:.2f}s")
+    if not fetched:
+        if any(outcome.duplicate_of is not None for outcome in outcomes):
+            return "All retrieved pages repeat pages already retrieved in this research session.\n\n" + "\n".join(report)
+        return "Could not retrieve any of the pages.\n\n" + "\n".join(report)
+    return "\n\n---\n\n".join(sections) + "\n\n---\n\n" + "\n".join(report)
+
+
 @tool
 def serpapi_search(query: str, num_results: int = 5) -> str:
     """
@@ -582,7 +1066,7 @@ def serpapi_search(query: str, num_results: int = 5) -> str:
     print(f"🔍 使用SerpAPI搜索: {query}")
 
     try:
-        results = _try_serpapi_search(query, num_results)
+        results = run_sync(_cached_provider_search(_try_serpapi_search, query, num_results))
         if results:
             return _format_search_results(results, query)
         else:
@@ -607,7 +1091,7 @@ def tavily_search(query: str, search_depth: str = "advanced", num_results: int =
     print(f"🔍 使用Tavily搜索: {query}")
 
     try:
-        results = _try_tavily_search(query, num_results, search_depth)
+        results = run_sync(_cached_provider_search(_try_tavily_search, query, num_results, search_depth=search_depth))
         if results:
             return _format_search_results(results, query)
         else:
@@ -631,7 +1115,7 @@ def googlesearch_library_search(query: str, num_results: int = 5) -> str:
     print(f"🔍 使用GoogleSearch库搜索: {query}")
 
     try:
-        results = _try_googlesearch_library(query, num_results)
+        results = run_sync(_cached_provider_search(_try_googlesearch_library, query, num_results))
         if results:
             return _format_search_results(results, query)
         else:
@@ -0,0 +1,194 @@
+"""Process pool for CPU-bound page extraction."""
+
+import asyncio
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Dict
+
+from ..utils.text_sanitizer import get_sanitizer
+from .content_types import HTML, PDF, TEXT
+from .page_extract import ExtractedPage, extract_page, extract_text_document
+from .pdf_extract import extract_pdf
+
+logger = logging.getLogger(__name__)
+
+
+def _extract_in_worker(
+    content: bytes,
+    encoding: str | None,
+    markdown: bool,
+    main_content: bool | None,
+    model_type: str,
+    kind: str = HTML,
+    max_chars: int | None = None
+) -> ExtractedPage:
+    """Extract a document of the given kind in a worker process with the caller's character policy."""
+    sanitizer = get_sanitizer(model_type)
+    if kind == PDF:
+        return extract_pdf(content, max_chars, markdown, sanitizer)
+    if kind == TEXT:
+        return extract_text_document(content, encoding, markdown, sanitizer)
+    return extract_page(content, encoding, markdown, sanitizer=sanitizer, main_content=main_content)
+
+
+class ExtractionPool:
+    """Worker processes that turn raw page bodies into extracted text.
+
+    HTML parsing and markdown rendering hold the GIL, so running them on
+    fetch threads serializes concurrent sessions on one core and stalls the
+    event loops serving SSE streams. Bodies of at least min_bytes are sent
+    to a pool of worker processes instead; smaller ones are cheaper to
+    extract in a thread than to ship to a worker, and are never parsed on
+    the client loop itself. PDFs always go to a worker.
+
+    At most max_pending extractions are submitted at once and further
+    callers wait for a slot (backpressure); a caller that waits longer than
+    queue_timeout extracts in a thread of its own rather than failing. All
+    async methods must be used from the HTTP client loop.
+    """
+
+    def __init__(self, workers: int, max_pending: int = 0, min_bytes: int = 32 * 1024, queue_timeout: float = 5.0):
+        """Initialize the pool; worker processes start on first use.
+
+        Args:
+            workers: Number of worker processes (0 extracts everything in threads)
+            max_pending: Extractions submitted at once (default: 4 per worker)
+            min_bytes: Smallest body sent to a worker
+            queue_timeout: Seconds a caller waits for a slot before extracting itself
+        """
+        self.workers = max(0, workers)
+        self.max_pending = max_pending or self.workers * 4
+        self.min_bytes = min_bytes
+        self.queue_timeout = queue_timeout
+        self._executor: ProcessPoolExecutor | None = None
+        self._slots: asyncio.Semaphore | None = None
+        self._lock = threading.Lock()
+        self.stats = {'submitted': 0, 'inline': 0, 'overflow': 0, 'worker_errors': 0, 'waiting': 0, 'peak_waiting': 0}
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        """Return the process pool, starting it on first use."""
+        with self._lock:
+            if self._executor is None:
+                # spawn: forking a process that runs the HTTP client loop thread is unsafe
+                self._executor = ProcessPoolExecutor(self.workers, mp_context=multiprocessing.get_context('spawn'))
+                logger.info(f"Started page extraction pool with {self.workers} workers")
+            return self._executor
+
+    def _reset_executor(self, executor: ProcessPoolExecutor) -> None:
+        """Drop a broken pool so the next call starts a fresh one."""
+        with self._lock:
+            if self._executor is executor:
+                self._executor = None
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    async def extract(
+        self,
+        content: bytes,
+        encoding: str | None = None,
+        markdown: bool = True,
+        main_content: bool | None = None,
+        kind: str = HTML,
+        max_chars: int | None = None
+    ) -> ExtractedPage:
+        """Extract a page body, in a worker process when it is large enough.
+
+        Args:
+            content: Raw (already content-decoded) response body
+            encoding: Charset declared by the response, if any
+            markdown: Return markdown instead of flat text
+            main_content: Keep only the main content (default: PAGE_EXTRACT_MAIN_CONTENT)
+            kind: Document kind from content_types (HTML, TEXT or PDF)
+            max_chars: Characters of text after which PDF extraction stops
+
+        Returns:
+            ExtractedPage: The cleaned title and body
+        """
+        loop = asyncio.get_running_loop()
+        model_type = get_sanitizer().name
+        args = (content, encoding, markdown, main_content, model_type, kind, max_chars)
+
+        if len(content) < self.min_bytes and kind != PDF:
+            self.stats['inline'] += 1
+            return await asyncio.to_thread(_extract_in_worker, *args)
+        if not self.workers:
+            self.stats['inline'] += 1
+            return await loop.run_in_executor(None, _extract_in_worker, *args)
+
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_pending)
+        self.stats['waiting'] += 1
+        self.stats['peak_waiting'] = max(self.stats['peak_waiting'], self.stats['waiting'])
+        try:
+            await asyncio.wait_for(self._slots.acquire(), self.queue_timeout)
+        except asyncio.TimeoutError:
+            self.stats['overflow'] += 1
+            return await loop.run_in_executor(None, _extract_in_worker, *args)
+        finally:
+            self.stats['waiting'] -= 1
+
+        try:
+            executor = self._get_executor()
+            self.stats['submitted'] += 1
+            try:
+                return await loop.run_in_executor(executor, _extract_in_worker, *args)
+            except BrokenProcessPool as e:
+                # A worker died (e.g. out of memory); restart the pool and extract here
+                self.stats['worker_errors'] += 1
+                logger.error(f"Page extraction pool broke, restarting it: {e}")
+                self._reset_executor(executor)
+                return await loop.run_in_executor(None, _extract_in_worker, *args)
+        finally:
+            self._slots.release()
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Return the pool settings and counters."""
+        return {
+            'workers': self.workers,
+            'max_pending': self.max_pending,
+            'min_bytes': self.min_bytes,
+            'running': self._executor is not None,
+            **self.stats
+        }
+
+    def shutdown(self) -> None:
+        """Stop the worker processes."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+
+_pool: ExtractionPool | None = None
+_pool_lock = threading.Lock()
+
+
+def get_extraction_pool() -> ExtractionPool:
+    """Return the process-wide extraction pool.
+
+    Settings are read from EXTRACT_POOL_WORKERS (default: CPU count, at
+    most 4; 0 disables the pool), EXTRACT_POOL_MAX_PENDING,
+    EXTRACT_POOL_MIN_BYTES and EXTRACT_POOL_QUEUE_TIMEOUT.
+    """
+    global _pool
+
+    with _pool_lock:
+        if _pool is None:
+            _pool = ExtractionPool(
+                workers=int(os.getenv("EXTRACT_POOL_WORKERS", str(min(4, os.cpu_count() or 1)))),
+                max_pending=int(os.getenv("EXTRACT_POOL_MAX_PENDING", "0")),
+                min_bytes=int(os.getenv("EXTRACT_POOL_MIN_BYTES", str(32 * 1024))),
+                queue_timeout=float(os.getenv("EXTRACT_POOL_QUEUE_TIMEOUT", "5"))
+            )
+    return _pool
+
+
+def close_extraction_pool() -> None:
+    """Stop the worker processes of the shared pool."""
+    with _pool_lock:
+        pool = _pool
+    if pool is not None:
+        pool.shutdown()
@@ -0,0 +1,240 @@
+"""Per-domain politeness scheduling for outbound page fetches."""
+
+import asyncio
+import logging
+import os
+import threading
+import time
+from contextlib import asynccontextmanager
+from email.utils import parsedate_to_datetime
+from typing import Any, AsyncIterator, Dict
+from urllib.parse import urlsplit
+
+logger = logging.getLogger(__name__)
+
+# Statuses servers use to ask clients to slow down
+THROTTLE_STATUSES = frozenset((429, 503))
+
+
+class DomainThrottledError(Exception):
+    """Raised when a domain asked us to back off for longer than a fetch may wait."""
+
+
+def fetch_domain(url: str) -> str:
+    """Return the scheduling domain of a URL: its host without a leading "www."."""
+    try:
+        host = (urlsplit(url).hostname or "").lower()
+    except ValueError:
+        return ""
+    return host[4:] if host.startswith("www.") else host
+
+
+def parse_retry_after(value: str | None, now: float | None = None) -> float | None:
+    """Parse a Retry-After header into seconds from now.
+
+    Args:
+        value: Header value, either delay-seconds or an HTTP date
+        now: Current wall-clock time (default: time.time())
+
+    Returns:
+        Seconds to wait (at least 0), or None if the value is missing or invalid
+    """
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        retry_at = parsedate_to_datetime(value).timestamp()
+    except (TypeError, ValueError, IndexError, OverflowError):
+        return None
+    return max(0.0, retry_at - (time.time() if now is None else now))
+
+
+class _DomainState:
+    """Scheduling state of one domain."""
+
+    __slots__ = ('slots', 'gate', 'active', 'waiting', 'next_start', 'blocked_until', 'strikes', 'requests', 'throttled', 'waited', 'last_used')
+
+    def __init__(self, max_concurrency: int):
+        """Initialize an idle domain."""
+        self.slots = asyncio.Semaphore(max_concurrency)
+        # Serializes start times so that requests are spaced out in arrival order
+        self.gate = asyncio.Lock()
+        self.active = 0
+        self.waiting = 0
+        self.next_start = 0.0
+        self.blocked_until = 0.0
+        # Consecutive throttling responses, for exponential backoff
+        self.strikes = 0
+        self.requests = 0
+        self.throttled = 0
+        self.waited = 0.0
+        self.last_used = time.monotonic()
+
+
+class FetchScheduler:
+    """Admission control for page fetches, per domain.
+
+    Each domain runs at most max_concurrency fetches at once, and starts
+    them at least min_interval seconds apart. A 429 or 503 response blocks
+    the domain for its Retry-After delay, or for an exponential backoff
+    starting at backoff seconds when there is none. A fetch that would
+    have to wait longer than max_wait fails at once with
+    DomainThrottledError instead of running into the tool's timeout.
+    Waiting fetches only hold their own domain's queue, so fetches for
+    other domains keep flowing. All methods must be used from the HTTP
+    client loop.
+    """
+
+    def __init__(self, max_concurrency: int = 2, min_interval: float = 0.5, max_wait: float = 15.0, backoff: float = 5.0, max_backoff: float = 300.0):
+        """Initialize the scheduler.
+
+        Args:
+            max_concurrency: Fetches in flight per domain
+            min_interval: Seconds between the starts of two fetches to a domain
+            max_wait: Longest a fetch waits for a throttled domain before failing
+            backoff: First block after a throttling response without Retry-After
+            max_backoff: Longest block applied to a domain
+        """
+        self.max_concurrency = max(1, max_concurrency)
+        self.min_interval = max(0.0, min_interval)
+        self.max_wait = max_wait
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self._domains: Dict[str, _DomainState] = {}
+        self.stats = {'requests': 0, 'throttled_responses': 0, 'rejected': 0, 'delayed': 0}
+
+    def _state(self, domain: str) -> _DomainState:
+        """Return the state of a domain, creating it on first use."""
+        state = self._domains.get(domain)
+        if state is None:
+            if len(self._domains) >= 1000:
+                self._prune()
+            state = self._domains[domain] = _DomainState(self.max_concurrency)
+        return state
+
+    def _prune(self) -> None:
+        """Forget domains that are idle, unblocked and unused for ten minutes."""
+        now = time.monotonic()
+        for domain, state in list(self._domains.items()):
+            if not state.active and not state.waiting and state.blocked_until <= now and now - state.last_used > 600:
+                del self._domains[domain]
+
+    def _check_blocked(self, domain: str, state: _DomainState) -> None:
+        """Fail fast if the domain is blocked for longer than a fetch may wait."""
+        blocked_for = state.blocked_until - time.monotonic()
+        if blocked_for > self.max_wait:
+            self.stats['rejected'] += 1
+            raise DomainThrottledError(f"{domain} asked to back off, retry in {blocked_for:.0f}s")
+
+    @asynccontextmanager
+    async def slot(self, url: str) -> AsyncIterator[None]:
+        """Hold a fetch slot for the URL's domain while the fetch runs.
+
+        Raises:
+            DomainThrottledError: If the domain is blocked for longer than max_wait
+        """
+        domain = fetch_domain(url)
+        state = self._state(domain)
+        self._check_blocked(domain, state)
+
+        queued = time.monotonic()
+        state.waiting += 1
+        try:
+            await state.slots.acquire()
+            try:
+                async with state.gate:
+                    self._check_blocked(domain, state)
+                    delay = max(state.next_start, state.blocked_until) - time.monotonic()
+                    if delay > 0:
+                        self.stats['delayed'] += 1
+                        await asyncio.sleep(delay)
+                    state.next_start = time.monotonic() + self.min_interval
+            except BaseException:
+                state.slots.release()
+                raise
+        finally:
+            state.waiting -= 1
+
+        state.waited += time.monotonic() - queued
+        state.active += 1
+        state.requests += 1
+        state.last_used = time.monotonic()
+        self.stats['requests'] += 1
+        try:
+            yield
+        finally:
+            state.active -= 1
+            state.slots.release()
+
+    def observe(self, url: str, status_code: int, headers: Any) -> None:
+        """Learn from a response: block the domain after a throttling status.
+
+        Args:
+            url: The requested URL
+            status_code: Response status
+            headers: Response headers (for Retry-After)
+        """
+        state = self._state(fetch_domain(url))
+        if status_code not in THROTTLE_STATUSES:
+            state.strikes = 0
+            return
+
+        state.strikes += 1
+        state.throttled += 1
+        self.stats['throttled_responses'] += 1
+        delay = parse_retry_after(headers.get('retry-after'))
+        if delay is None:
+            delay = self.backoff * 2 ** (state.strikes - 1)
+        delay = min(delay, self.max_backoff)
+        state.blocked_until = max(state.blocked_until, time.monotonic() + delay)
+        logger.warning(f"{fetch_domain(url)} answered {status_code}, pausing fetches to it for {delay:.0f}s")
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Return the settings, counters and queue of every domain with activity."""
+        now = time.monotonic()
+        domains = {
+            domain: {
+                'active': state.active,
+                'waiting': state.waiting,
+                'blocked_for': round(max(0.0, state.blocked_until - now), 1),
+                'requests': state.requests,
+                'throttled': state.throttled,
+                'avg_wait': round(state.waited / state.requests, 3) if state.requests else 0.0
+            }
+            for domain, state in sorted(list(self._domains.items()), key=lambda item: -item[1].waiting)
+        }
+        return {
+            'max_concurrency': self.max_concurrency,
+            'min_interval': self.min_interval,
+            'max_wait': self.max_wait,
+            'queued': sum(state.waiting for state in self._domains.values()),
+            **self.stats,
+            'domains': domains
+        }
+
+
+_scheduler: FetchScheduler | None = None
+_scheduler_lock = threading.Lock()
+
+
+def get_fetch_scheduler() -> FetchScheduler:
+    """Return the process-wide fetch scheduler.
+
+    Settings are read from FETCH_DOMAIN_MAX_CONCURRENCY,
+    FETCH_DOMAIN_MIN_INTERVAL, FETCH_DOMAIN_MAX_WAIT, FETCH_DOMAIN_BACKOFF
+    and FETCH_DOMAIN_MAX_BACKOFF.
+    """
+    global _scheduler
+
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = FetchScheduler(
+                max_concurrency=int(os.getenv("FETCH_DOMAIN_MAX_CONCURRENCY", "2")),
+                min_interval=float(os.getenv("FETCH_DOMAIN_MIN_INTERVAL", "0.5")),
+                max_wait=float(os.getenv("FETCH_DOMAIN_MAX_WAIT", "15")),
+                backoff=float(os.getenv("FETCH_DOMAIN_BACKOFF", "5")),
+                max_backoff=float(os.getenv("FETCH_DOMAIN_MAX_BACKOFF", "300"))
+            )
+    return _scheduler
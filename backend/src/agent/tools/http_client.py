@@ -0,0 +1,217 @@
+"""Shared async HTTP client used by the search providers and page fetchers."""
+
+import asyncio
+import logging
+import os
+import threading
+from concurrent.futures import Future
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Awaitable, Dict, TypeVar
+from urllib.parse import urlsplit
+
+import httpx
+
+# HTTP/2 needs the optional h2 package (installed with httpx[http2])
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+DEFAULT_USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+
+
+class AsyncHttpClient:
+    """Connection-pooled async HTTP client with bounded per-host concurrency.
+
+    One instance is shared by every provider adapter and page fetcher, so
+    keep-alive connections (and HTTP/2 sessions where the server supports
+    them) are reused across searches instead of paying DNS + TCP + TLS on
+    every call. The instance must only be used from the loop returned by
+    `get_client_loop`.
+    """
+
+    def __init__(
+        self,
+        timeout: float = 10.0,
+        connect_timeout: float = 5.0,
+        max_connections: int = 100,
+        max_keepalive_connections: int = 20,
+        max_per_host: int = 6,
+        http2: bool | None = None
+    ):
+        """Initialize the client.
+
+        Args:
+            timeout: Default read/write/pool timeout in seconds
+            connect_timeout: Timeout for establishing a connection in seconds
+            max_connections: Upper bound for open connections across all hosts
+            max_keepalive_connections: Idle connections kept in the pool
+            max_per_host: Concurrent requests allowed per host
+            http2: Whether to negotiate HTTP/2 (default: when h2 is installed)
+        """
+        self.timeout = httpx.Timeout(timeout, connect=connect_timeout)
+        self.max_per_host = max_per_host
+        self._client = httpx.AsyncClient(
+            timeout=self.timeout,
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_keepalive_connections
+            ),
+            http2=HTTP2_AVAILABLE if http2 is None else http2,
+            headers={'User-Agent': DEFAULT_USER_AGENT},
+            follow_redirects=True
+        )
+        self._host_semaphores: Dict[str, asyncio.Semaphore] = {}
+
+    def _host_semaphore(self, url: str) -> asyncio.Semaphore:
+        """Return the concurrency limiter for the host of the given URL."""
+        host = urlsplit(url).netloc.lower()
+        semaphore = self._host_semaphores.get(host)
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(self.max_per_host)
+            self._host_semaphores[host] = semaphore
+        return semaphore
+
+    async def request(self, method: str, url: str, timeout: float | None = None, **kwargs: Any) -> httpx.Response:
+        """Send a request through the shared pool.
+
+        Args:
+            method: HTTP method
+            url: Target URL
+            timeout: Optional per-call timeout overriding the shared default
+            **kwargs: Passed through to httpx (params, json, headers, ...)
+
+        Returns:
+            httpx.Response: The fully read response
+        """
+        if timeout is not None:
+            kwargs['timeout'] = httpx.Timeout(timeout, connect=min(timeout, self.timeout.connect or timeout))
+
+        async with self._host_semaphore(url):
+            return await self._client.request(method, url, **kwargs)
+
+    @asynccontextmanager
+    async def stream(self, method: str, url: str, timeout: float | None = None, **kwargs: Any) -> AsyncIterator[httpx.Response]:
+        """Send a request through the shared pool without reading the body.
+
+        The host slot is held until the context exits, so callers should read
+        what they need and leave; leaving early closes the connection instead
+        of draining the rest of the body.
+
+        Args:
+            method: HTTP method
+            url: Target URL
+            timeout: Optional per-call timeout overriding the shared default
+            **kwargs: Passed through to httpx (params, headers, ...)
+
+        Yields:
+            httpx.Response: The response with its body still unread
+        """
+        if timeout is not None:
+            kwargs['timeout'] = httpx.Timeout(timeout, connect=min(timeout, self.timeout.connect or timeout))
+
+        async with self._host_semaphore(url):
+            async with self._client.stream(method, url, **kwargs) as response:
+                yield response
+
+    async def get(self, url: str, **kwargs: Any) -> httpx.Response:
+        """Send a GET request through the shared pool."""
+        return await self.request("GET", url, **kwargs)
+
+    async def post(self, url: str, **kwargs: Any) -> httpx.Response:
+        """Send a POST request through the shared pool."""
+        return await self.request("POST", url, **kwargs)
+
+    async def aclose(self) -> None:
+        """Close all pooled connections."""
+        await self._client.aclose()
+
+
+_loop: asyncio.AbstractEventLoop | None = None
+_loop_thread: threading.Thread | None = None
+_client: AsyncHttpClient | None = None
+_lock = threading.Lock()
+
+
+def get_client_loop() -> asyncio.AbstractEventLoop:
+    """Return the background event loop that owns the shared HTTP client.
+
+    The loop runs in a daemon thread so that the synchronous @tool functions
+    can use the async client even when they are called from a thread that
+    already runs its own event loop.
+    """
+    global _loop, _loop_thread
+
+    with _lock:
+        if _loop is None:
+            _loop = asyncio.new_event_loop()
+            _loop_thread = threading.Thread(target=_loop.run_forever, name="http-client-loop", daemon=True)
+            _loop_thread.start()
+            logger.info(f"Started shared HTTP client loop (HTTP/2 {'enabled' if HTTP2_AVAILABLE else 'unavailable'})")
+    return _loop
+
+
+def get_http_client() -> AsyncHttpClient:
+    """Return the process-wide HTTP client, creating it on first use.
+
+    Settings are read from HTTP_TIMEOUT, HTTP_CONNECT_TIMEOUT,
+    HTTP_MAX_CONNECTIONS and HTTP_MAX_PER_HOST.
+    """
+    global _client
+
+    with _lock:
+        if _client is None:
+            _client = AsyncHttpClient(
+                timeout=float(os.getenv("HTTP_TIMEOUT", "10")),
+                connect_timeout=float(os.getenv("HTTP_CONNECT_TIMEOUT", "5")),
+                max_connections=int(os.getenv("HTTP_MAX_CONNECTIONS", "100")),
+                max_per_host=int(os.getenv("HTTP_MAX_PER_HOST", "6"))
+            )
+    return _client
+
+
+def submit(coro: Awaitable[T]) -> "Future[T]":
+    """Schedule a coroutine on the client loop and return a concurrent Future."""
+    return asyncio.run_coroutine_threadsafe(coro, get_client_loop())
+
+
+def run_sync(coro: Awaitable[T], timeout: float | None = None) -> T:
+    """Run a coroutine on the client loop and block until it finishes.
+
+    Args:
+        coro: The coroutine to run
+        timeout: Optional number of seconds to wait for the result
+
+    Returns:
+        The coroutine's result
+    """
+    loop = get_client_loop()
+    if threading.current_thread() is _loop_thread:
+        raise RuntimeError("run_sync() cannot be called from the HTTP client loop")
+
+    future = asyncio.run_coroutine_threadsafe(coro, loop)
+    try:
+        return future.result(timeout)
+    except BaseException:
+        future.cancel()
+        raise
+
+
+async def run_on_client_loop(coro: Awaitable[T]) -> T:
+    """Await a coroutine on the client loop from any other event loop."""
+    return await asyncio.wrap_future(submit(coro))
+
+
+def close_http_client() -> None:
+    """Close the shared client and its pooled connections."""
+    global _client
+
+    with _lock:
+        client, _client = _client, None
+    if client is not None and _loop is not None:
+        run_sync(client.aclose(), timeout=5)
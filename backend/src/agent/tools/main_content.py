@@ -0,0 +1,159 @@
+"""Readability-style main-content selection on parsed HTML trees."""
+
+import re
+from typing import Dict, List
+
+# class/id fragments of blocks that hold the article body, or never do
+_POSITIVE_PATTERN = re.compile(r'article|body|content|entry|main|post|story|text|blog|hentry', re.IGNORECASE)
+_NEGATIVE_PATTERN = re.compile(
+    r'banner|breadcrumb|comment|consent|cookie|footer|menu|modal|nav|newsletter|popup|promo|related|'
+    r'share|sidebar|social|sponsor|subscribe|widget|advert|masthead|toolbar|catlinks|(^|[\s_-])ads?([\s_-]|$)',
+    re.IGNORECASE
+)
+
+# Tags scored as paragraphs, and the base score their containers start from
+_PARAGRAPH_TAGS = ('p', 'pre', 'td', 'dd', 'blockquote')
+_TAG_BONUS = {
+    'article': 10, 'main': 10, 'div': 5, 'section': 3, 'pre': 3, 'td': 3, 'blockquote': 3,
+    'ul': -3, 'ol': -3, 'dl': -3, 'form': -3, 'aside': -5, 'th': -5, 'header': -5,
+    'h1': -5, 'h2': -5, 'h3': -5, 'h4': -5, 'h5': -5, 'h6': -5
+}
+# Containers removed from the selected content when they look like boilerplate
+_CLEANED_TAGS = ('div', 'section', 'aside', 'ul', 'ol', 'table', 'form', 'figure', 'header')
+
+_MIN_PARAGRAPH_CHARS = 25
+
+
+def _class_weight(element) -> int:
+    """Score an element's class and id: +25 for article-like, -25 for boilerplate names."""
+    weight = 0
+    for value in (element.get('class'), element.get('id')):
+        if value:
+            if _NEGATIVE_PATTERN.search(value):
+                weight -= 25
+            if _POSITIVE_PATTERN.search(value):
+                weight += 25
+    return weight
+
+
+def _text_length(element) -> int:
+    """Return the length of an element's whitespace-collapsed text."""
+    return len(' '.join(element.text_content().split()))
+
+
+def _link_density(element, text_length: int | None = None) -> float:
+    """Return the share of an element's text that sits inside links."""
+    text_length = _text_length(element) if text_length is None else text_length
+    if not text_length:
+        return 0.0
+    link_length = sum(_text_length(link) for link in element.iter('a'))
+    return min(1.0, link_length / text_length)
+
+
+def _paragraph_score(text: str) -> float:
+    """Score a paragraph by its commas and length, as in Readability."""
+    return 1 + text.count(',') + text.count('，') + text.count('、') + min(len(text) // 100, 3)
+
+
+def select_main_content(root, min_chars: int = 250) -> List | None:
+    """Find the elements holding the main content of a document.
+
+    Paragraph-like blocks add their score to their parent and, decaying,
+    to two further ancestors; each candidate's score is adjusted by its tag
+    and class/id names and scaled by (1 - link density). The best candidate
+    is taken together with siblings that score close to it, and menus,
+    share bars, related-link lists and similar boilerplate are removed from
+    inside it. The tree is only modified once a selection is accepted, so a
+    caller falling back to the whole document sees it unchanged.
+
+    Args:
+        root: lxml document root, with scripts and styles already removed
+        min_chars: Minimum text the selection must hold to be used
+
+    Returns:
+        The selected elements in document order, or None when no candidate
+        holds enough text (the caller should then use the whole document)
+    """
+    scores: Dict = {}
+
+    def candidate_score(element) -> float:
+        if element not in scores:
+            scores[element] = _TAG_BONUS.get(element.tag, 0) + _class_weight(element)
+        return scores[element]
+
+    for paragraph in root.iter(*_PARAGRAPH_TAGS, 'div', 'section'):
+        if paragraph.tag in ('div', 'section'):
+            # Only divs that hold text directly act as paragraphs
+            text = ' '.join(((paragraph.text or '') + ' '.join(child.tail or '' for child in paragraph)).split())
+        else:
+            text = ' '.join(paragraph.text_content().split())
+        if len(text) < _MIN_PARAGRAPH_CHARS:
+            continue
+
+        score = _paragraph_score(text)
+        ancestor = paragraph.getparent()
+        for level in range(3):
+            if ancestor is None or not isinstance(ancestor.tag, str) or ancestor.tag in ('html', 'body'):
+                break
+            candidate_score(ancestor)
+            scores[ancestor] += score / (1 if level == 0 else level * 2)
+            ancestor = ancestor.getparent()
+
+    if not scores:
+        return None
+
+    for element in scores:
+        scores[element] *= 1 - _link_density(element)
+    top = max(scores, key=scores.get)
+    if scores[top] <= 0:
+        return None
+
+    # Siblings that are part of the same article (split bodies, lead paragraphs)
+    parent = top.getparent()
+    selected = []
+    threshold = max(10.0, scores[top] * 0.2)
+    for sibling in (parent if parent is not None else [top]):
+        if not isinstance(sibling.tag, str):
+            continue
+        if sibling is top:
+            selected.append(sibling)
+        elif scores.get(sibling, 0) >= threshold and _class_weight(sibling) >= 0:
+            selected.append(sibling)
+        elif sibling.tag == 'p':
+            length = _text_length(sibling)
+            if length > 80 and _link_density(sibling, length) < 0.25:
+                selected.append(sibling)
+
+    boilerplate = [element for content in selected for element in _find_boilerplate(content)]
+    kept = sum(_text_length(element) for element in selected) - sum(_text_length(element) for element in boilerplate)
+    if kept < min_chars:
+        return None
+
+    for element in boilerplate:
+        element.drop_tree()
+    return selected
+
+
+def _find_boilerplate(content) -> List:
+    """Return the outermost boilerplate containers inside the selected content."""
+    found: List = []
+    inside = set()
+    for element in content.iterdescendants(*_CLEANED_TAGS):
+        if any(ancestor in inside for ancestor in element.iterancestors()):
+            continue
+        weight = _class_weight(element)
+        if element.tag == 'form' or weight < 0:
+            found.append(element)
+            inside.add(element)
+            continue
+
+        text = element.text_content()
+        if text.count(',') + text.count('，') >= 10:
+            continue
+        length = len(' '.join(text.split()))
+        paragraphs = sum(1 for _ in element.iter('p'))
+        items = sum(1 for _ in element.iter('li'))
+        if _link_density(element, length) > (0.5 if weight >= 25 else 0.25) or (element.tag not in ('ul', 'ol') and items > paragraphs + 20):
+            found.append(element)
+            inside.add(element)
+    return found
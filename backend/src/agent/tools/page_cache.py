@@ -0,0 +1,288 @@
+"""Persistent cache of extracted page content with HTTP revalidation."""
+
+import hashlib
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Union
+
+from ..utils.storage import get_data_dir
+from ..utils.urls import canonicalize_url
+from .page_extract import ExtractedPage
+
+logger = logging.getLogger(__name__)
+
+_MAX_AGE_PATTERN = re.compile(r'max-age=(\d+)')
+
+
+class CachedPage:
+    """A stored page: the extracted text plus what is needed to revalidate it.
+
+    text_budget is the text budget the page was fetched with when the
+    stored text is only a prefix of the document, or None when it holds
+    the whole document.
+    """
+
+    __slots__ = ('key', 'url', 'page', 'etag', 'last_modified', 'content_hash', 'text_budget', 'expires_at')
+
+    def __init__(
+        self,
+        key: str,
+        url: str,
+        page: ExtractedPage,
+        etag: str = "",
+        last_modified: str = "",
+        content_hash: str = "",
+        text_budget: int | None = None,
+        expires_at: float = 0.0
+    ):
+        """Initialize the entry; see the class docstring for the fields."""
+        self.key = key
+        self.url = url
+        self.page = page
+        self.etag = etag
+        self.last_modified = last_modified
+        self.content_hash = content_hash
+        self.text_budget = text_budget
+        self.expires_at = expires_at
+
+    @property
+    def fresh(self) -> bool:
+        """Return whether the entry may be served without asking the server."""
+        return self.expires_at > time.time()
+
+    def covers(self, text_budget: int | None) -> bool:
+        """Return whether the stored text is long enough for a fetch with the given text budget."""
+        if self.text_budget is None:
+            return True
+        return text_budget is not None and text_budget <= self.text_budget
+
+    def validators(self) -> Dict[str, str]:
+        """Return the conditional request headers for revalidating the entry."""
+        headers = {}
+        if self.etag:
+            headers['If-None-Match'] = self.etag
+        if self.last_modified:
+            headers['If-Modified-Since'] = self.last_modified
+        return headers
+
+
+def content_hash(content: bytes) -> str:
+    """Return the hash a response body is identified by."""
+    return hashlib.sha256(content).hexdigest()
+
+
+class PageCache:
+    """On-disk cache of extracted pages backed by SQLite.
+
+    Entries are keyed by canonical URL, output format and character
+    policy, and hold the extracted title and text together with the
+    response's ETag, Last-Modified and body hash. An entry is served as is
+    for ttl seconds (less if the response's Cache-Control says so); after
+    that the caller revalidates it with a conditional GET and keeps the
+    stored text on a 304, or on a 200 whose body hash is unchanged.
+    Entries are dropped max_age seconds after they were last confirmed,
+    and the least recently used ones once the cache grows past
+    max_entries.
+    """
+
+    def __init__(self, path: Union[str, Path], ttl: int = 6 * 3600, max_age: int = 30 * 86400, max_entries: int = 2000):
+        """Initialize the cache and create its table if needed.
+
+        Args:
+            path: SQLite database file
+            ttl: Seconds an entry is served without revalidation
+            max_age: Seconds an entry is kept after it was last confirmed
+            max_entries: Maximum number of stored pages
+        """
+        self.path = str(path)
+        self.ttl = ttl
+        self.max_age = max_age
+        self.max_entries = max_entries
+        self.stats_counters = {'hits': 0, 'revalidated': 0, 'unchanged': 0, 'changed': 0, 'misses': 0}
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS page_cache (
+                key TEXT PRIMARY KEY,
+                url TEXT NOT NULL,
+                title TEXT NOT NULL,
+                text TEXT NOT NULL,
+                engine TEXT NOT NULL,
+                main_content INTEGER NOT NULL,
+                etag TEXT NOT NULL,
+                last_modified TEXT NOT NULL,
+                content_hash TEXT NOT NULL,
+                text_budget INTEGER,
+                confirmed_at REAL NOT NULL,
+                expires_at REAL NOT NULL,
+                last_accessed REAL NOT NULL
+            )"""
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_page_cache_accessed ON page_cache (last_accessed)")
+        self._conn.commit()
+
+    @staticmethod
+    def make_key(url: str, markdown: bool, policy: str) -> str:
+        """Build the cache key for a page in one output format and character policy."""
+        raw = json.dumps([canonicalize_url(url), bool(markdown), policy], ensure_ascii=False)
+        return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+    def get(self, url: str, markdown: bool, policy: str) -> CachedPage | None:
+        """Look up a stored page, fresh or not.
+
+        Returns:
+            The entry, or None if the page was never stored or has aged out
+        """
+        key = self.make_key(url, markdown, policy)
+        now = time.time()
+
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT url, title, text, engine, main_content, etag, last_modified, content_hash, text_budget, expires_at "
+                "FROM page_cache WHERE key = ? AND confirmed_at > ?",
+                (key, now - self.max_age)
+            ).fetchone()
+            if row is not None:
+                self._conn.execute("UPDATE page_cache SET last_accessed = ? WHERE key = ?", (now, key))
+                self._conn.commit()
+
+        if row is None:
+            return None
+        stored_url, title, text, engine, main_content, etag, last_modified, body_hash, text_budget, expires_at = row
+        return CachedPage(key, stored_url, ExtractedPage(title, text, engine, bool(main_content)), etag, last_modified, body_hash, text_budget, expires_at)
+
+    def ttl_for(self, headers: Any) -> int:
+        """Return how long a response may be served without revalidation."""
+        cache_control = (headers.get('cache-control') or '').lower()
+        if 'no-cache' in cache_control or 'must-revalidate' in cache_control:
+            return 0
+        max_age = _MAX_AGE_PATTERN.search(cache_control)
+        return min(self.ttl, int(max_age.group(1))) if max_age else self.ttl
+
+    def set(
+        self,
+        url: str,
+        markdown: bool,
+        policy: str,
+        page: ExtractedPage,
+        headers: Any,
+        body_hash: str,
+        text_budget: int | None = None
+    ) -> CachedPage | None:
+        """Store an extracted page with its response's validators.
+
+        Args:
+            url: The fetched URL
+            markdown: Whether the text is markdown
+            policy: Name of the character policy the text was cleaned with
+            page: The extracted page
+            headers: The response headers
+            body_hash: content_hash of the response body
+            text_budget: Text budget of the fetch if the text is only a prefix of the document
+
+        Returns:
+            The stored entry, or None if the response must not be stored
+        """
+        if 'no-store' in (headers.get('cache-control') or '').lower() or not page.text:
+            return None
+        key = self.make_key(url, markdown, policy)
+        now = time.time()
+        entry = CachedPage(
+            key, url, page, headers.get('etag') or "", headers.get('last-modified') or "",
+            body_hash, text_budget, now + self.ttl_for(headers)
+        )
+
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO page_cache VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, url, page.title, page.text, page.engine, int(page.main_content), entry.etag, entry.last_modified,
+                 body_hash, text_budget, now, entry.expires_at, now)
+            )
+            self._evict(now)
+            self._conn.commit()
+        return entry
+
+    def confirm(self, entry: CachedPage, headers: Any) -> None:
+        """Mark a stored page as still current after the server confirmed it."""
+        now = time.time()
+        entry.etag = headers.get('etag') or entry.etag
+        entry.last_modified = headers.get('last-modified') or entry.last_modified
+        entry.expires_at = now + self.ttl_for(headers)
+
+        with self._lock:
+            self._conn.execute(
+                "UPDATE page_cache SET etag = ?, last_modified = ?, confirmed_at = ?, expires_at = ?, last_accessed = ? WHERE key = ?",
+                (entry.etag, entry.last_modified, now, entry.expires_at, now, entry.key)
+            )
+            self._conn.commit()
+
+    def record(self, outcome: str) -> None:
+        """Count a lookup outcome: hits, revalidated, unchanged, changed or misses."""
+        self.stats_counters[outcome] += 1
+
+    def _evict(self, now: float) -> None:
+        """Drop aged-out entries, then least recently used ones above max_entries."""
+        self._conn.execute("DELETE FROM page_cache WHERE confirmed_at <= ?", (now - self.max_age,))
+        overflow = self._conn.execute("SELECT COUNT(*) FROM page_cache").fetchone()[0] - self.max_entries
+        if overflow > 0:
+            self._conn.execute(
+                "DELETE FROM page_cache WHERE key IN "
+                "(SELECT key FROM page_cache ORDER BY last_accessed ASC LIMIT ?)",
+                (overflow,)
+            )
+
+    def stats(self) -> Dict[str, Any]:
+        """Return lookup counters and the number of stored pages."""
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM page_cache").fetchone()[0]
+        lookups = sum(self.stats_counters.values())
+        served = self.stats_counters['hits'] + self.stats_counters['revalidated'] + self.stats_counters['unchanged']
+        return {
+            **self.stats_counters,
+            'served_from_cache_rate': round(served / lookups, 3) if lookups else 0.0,
+            'entries': entries
+        }
+
+    def clear(self) -> None:
+        """Remove every stored page."""
+        with self._lock:
+            self._conn.execute("DELETE FROM page_cache")
+            self._conn.commit()
+
+
+_cache: PageCache | None = None
+_cache_lock = threading.Lock()
+
+
+def get_page_cache() -> PageCache | None:
+    """Return the process-wide page cache, or None when caching is disabled.
+
+    Settings are read from PAGE_CACHE_ENABLED, PAGE_CACHE_PATH,
+    PAGE_CACHE_TTL, PAGE_CACHE_MAX_AGE and PAGE_CACHE_MAX_ENTRIES.
+    """
+    global _cache
+
+    if os.getenv("PAGE_CACHE_ENABLED", "true").lower() != "true":
+        return None
+
+    with _cache_lock:
+        if _cache is None:
+            try:
+                _cache = PageCache(
+                    os.getenv("PAGE_CACHE_PATH") or get_data_dir() / "page_cache.sqlite3",
+                    ttl=int(os.getenv("PAGE_CACHE_TTL", str(6 * 3600))),
+                    max_age=int(os.getenv("PAGE_CACHE_MAX_AGE", str(30 * 86400))),
+                    max_entries=int(os.getenv("PAGE_CACHE_MAX_ENTRIES", "2000"))
+                )
+                logger.info(f"Page cache opened at {_cache.path}")
+            except Exception as e:
+                logger.error(f"Failed to open page cache, continuing without it: {e}")
+                return None
+    return _cache
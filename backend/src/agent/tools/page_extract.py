@@ -0,0 +1,458 @@
+"""HTML to markdown/text extraction engines for fetched pages."""
+
+import codecs
+import logging
+import os
+import re
+from abc import ABC, abstractmethod
+from typing import Dict, List, Type
+
+from ..utils.text_sanitizer import TextSanitizer, get_sanitizer
+from .main_content import select_main_content
+
+# Conditional import for the C-backed lxml parser
+try:
+    import lxml.etree
+    import lxml.html
+    LXML_AVAILABLE = True
+except ImportError:
+    LXML_AVAILABLE = False
+
+# Conditional import for the BeautifulSoup + markdownify path
+try:
+    from bs4 import BeautifulSoup
+    BS4_AVAILABLE = True
+except ImportError:
+    BeautifulSoup = None
+    BS4_AVAILABLE = False
+
+try:
+    from markdownify import markdownify
+    MARKDOWNIFY_AVAILABLE = True
+except ImportError:
+    markdownify = None
+    MARKDOWNIFY_AVAILABLE = False
+
+# Conditional import for statistical charset detection of undeclared legacy encodings
+try:
+    from charset_normalizer import from_bytes as detect_charsets
+    CHARSET_NORMALIZER_AVAILABLE = True
+except ImportError:
+    detect_charsets = None
+    CHARSET_NORMALIZER_AVAILABLE = False
+
+try:
+    from bs4.dammit import EncodingDetector
+except ImportError:
+    EncodingDetector = None
+
+logger = logging.getLogger(__name__)
+
+# Elements whose content never reaches the agent
+SKIPPED_TAGS = frozenset(('script', 'style', 'nav', 'footer', 'iframe', 'noscript', 'template'))
+
+_HEADING_LEVELS = {'h1': 1, 'h2': 2, 'h3': 3, 'h4': 4, 'h5': 5, 'h6': 6}
+
+# Elements rendered as paragraphs of their own
+_BLOCK_TAGS = frozenset((
+    'p', 'div', 'section', 'article', 'main', 'header', 'aside', 'blockquote', 'figure',
+    'figcaption', 'form', 'fieldset', 'table', 'thead', 'tbody', 'dl', 'dt', 'dd',
+    'address', 'details', 'summary', 'center', 'body', 'html'
+))
+
+# Elements that carry no text worth extracting
+_IGNORED_TAGS = SKIPPED_TAGS | {'head', 'svg', 'canvas', 'object', 'embed', 'select', 'button', 'img', 'picture', 'video', 'audio', 'map'}
+
+_INLINE_MARKERS = {'strong': '**', 'b': '**', 'em': '*', 'i': '*', 'code': '`'}
+
+_WHITESPACE_PATTERN = re.compile(r'\s+')
+_HTML_TAG_PATTERN = re.compile(r'<[^>]+>')
+_TITLE_PATTERN = re.compile(r'<title[^>]*>(.*?)</title>', re.IGNORECASE | re.DOTALL)
+_SKIPPED_BLOCK_PATTERN = re.compile(r'<(script|style|noscript|template)\b.*?</\1\s*>', re.IGNORECASE | re.DOTALL)
+_META_CHARSET_PATTERN = re.compile(rb'<meta[^>]+charset\s*=\s*["\']?\s*([a-zA-Z0-9_:.-]+)', re.IGNORECASE)
+
+_BOMS = ((codecs.BOM_UTF8, 'utf-8'), (codecs.BOM_UTF16_LE, 'utf-16-le'), (codecs.BOM_UTF16_BE, 'utf-16-be'))
+# Bytes looked at for a meta charset and by the statistical detectors
+_SNIFF_BYTES = 4096
+_DETECT_BYTES = 65536
+
+
+class ExtractedPage:
+    """Title and markdown (or plain text) body of a fetched page."""
+
+    __slots__ = ('title', 'text', 'engine', 'main_content')
+
+    def __init__(self, title: str, text: str, engine: str, main_content: bool = False):
+        """Initialize the page.
+
+        Args:
+            title: Document title, empty if there is none
+            text: Markdown or plain text body
+            engine: Name of the engine that produced it
+            main_content: Whether the body is the detected main content
+                rather than the whole document
+        """
+        self.title = title
+        self.text = text
+        self.engine = engine
+        self.main_content = main_content
+
+
+def _known_encoding(name: str | None) -> str | None:
+    """Return the canonical name of a charset label, or None if Python does not know it."""
+    if not name:
+        return None
+    try:
+        return codecs.lookup(name.strip().strip('"\'')).name
+    except LookupError:
+        return None
+
+
+def _is_utf8(content: bytes) -> bool:
+    """Return whether a body is valid UTF-8, allowing a character cut off at the end."""
+    try:
+        codecs.getincrementaldecoder('utf-8')().decode(content, final=False)
+    except UnicodeDecodeError:
+        return False
+    return True
+
+
+def detect_encoding(content: bytes, declared: str | None = None) -> str:
+    """Return the charset to decode a fetched body with.
+
+    A byte order mark wins, then the charset declared by the response,
+    then a <meta charset> in the document head. Undeclared bodies that
+    are valid UTF-8 are UTF-8; anything else is left to charset_normalizer
+    (or BeautifulSoup's detector), with windows-1252 as the last resort,
+    as in browsers.
+
+    Args:
+        content: Raw (already content-decoded) response body
+        declared: Charset declared by the response, if any
+
+    Returns:
+        str: A charset name Python can decode with
+    """
+    for bom, encoding in _BOMS:
+        if content.startswith(bom):
+            return encoding
+
+    encoding = _known_encoding(declared)
+    if encoding:
+        return encoding
+
+    match = _META_CHARSET_PATTERN.search(content[:_SNIFF_BYTES])
+    encoding = _known_encoding(match.group(1).decode('ascii', errors='ignore')) if match else None
+    if encoding and not encoding.startswith('utf-16'):
+        # A document readable as ASCII cannot be UTF-16, whatever its meta tag says
+        return encoding
+
+    sample = content[:_DETECT_BYTES]
+    if _is_utf8(sample):
+        return 'utf-8'
+    if CHARSET_NORMALIZER_AVAILABLE:
+        best = detect_charsets(sample).best()
+        encoding = _known_encoding(best.encoding) if best is not None else None
+        if encoding:
+            return encoding
+    elif EncodingDetector is not None:
+        for candidate in EncodingDetector(sample).encodings:
+            encoding = _known_encoding(candidate)
+            if encoding and encoding not in ('ascii', 'utf-8'):
+                return encoding
+    return 'cp1252'
+
+
+def _decode(content: bytes, encoding: str | None) -> str:
+    """Decode a body with the declared charset, falling back to UTF-8."""
+    try:
+        return content.decode(encoding or 'utf-8', errors='replace')
+    except LookupError:
+        return content.decode('utf-8', errors='replace')
+
+
+class ExtractionEngine(ABC):
+    """Base class of the extraction engines.
+
+    Engines go from the raw body to an ExtractedPage. Markdown output keeps
+    headings, lists, links and emphasis; text output is the same content
+    without markup. Both are sanitized by extract_page, not here.
+    """
+
+    name = "base"
+
+    @classmethod
+    def available(cls) -> bool:
+        """Return whether the engine's dependencies are installed."""
+        return True
+
+    @abstractmethod
+    def extract(self, content: bytes, encoding: str | None, markdown: bool = True, main_content: bool = False) -> ExtractedPage:
+        """Extract the title and body of an HTML document.
+
+        Args:
+            content: Raw (already content-decoded) response body
+            encoding: Charset declared by the response, if any
+            markdown: Render markdown instead of plain text
+            main_content: Keep only the main content if the engine can find it
+
+        Returns:
+            ExtractedPage: The uncleaned title and body
+        """
+
+
+class LxmlEngine(ExtractionEngine):
+    """Single pass over an lxml tree, parsed by libxml2 straight from bytes.
+
+    The markdown is written while walking the tree, so the document is
+    never re-serialized and re-parsed as in the BeautifulSoup path. It is
+    the only engine that selects the main content (see main_content.py).
+    """
+
+    name = "lxml"
+
+    @classmethod
+    def available(cls) -> bool:
+        """Return whether lxml is installed."""
+        return LXML_AVAILABLE
+
+    def extract(self, content: bytes, encoding: str | None, markdown: bool = True, main_content: bool = False) -> ExtractedPage:
+        """Extract the title and body with lxml."""
+        if not content.strip():
+            return ExtractedPage("", "", self.name)
+        # Without a charset libxml2 assumes Latin-1 and turns UTF-8 into mojibake
+        encoding = encoding or detect_encoding(content)
+        try:
+            parser = lxml.html.HTMLParser(encoding=encoding, remove_comments=True, remove_pis=True)
+            root = lxml.html.document_fromstring(content, parser=parser)
+        except LookupError:
+            # Charset label unknown to libxml2 (e.g. "latin-1"); decode in Python instead
+            parser = lxml.html.HTMLParser(remove_comments=True, remove_pis=True)
+            root = lxml.html.document_fromstring(_decode(content, encoding), parser=parser)
+
+        title_element = root.find('.//title')
+        title = title_element.text_content() if title_element is not None else ""
+
+        # Drop scripts, menus etc. once, so neither scoring nor rendering sees them
+        lxml.etree.strip_elements(root, *_IGNORED_TAGS, with_tail=False)
+
+        parts: List[str] = []
+        selected = select_main_content(root) if main_content else None
+        if selected:
+            for element in selected:
+                _render(element, parts, markdown)
+        else:
+            _render_children(root, parts, markdown)
+        return ExtractedPage(title, ''.join(parts), self.name, selected is not None)
+
+
+def _inline_text(text: str | None) -> str:
+    """Collapse source whitespace in a text node; line breaks come from the markup."""
+    return _WHITESPACE_PATTERN.sub(' ', text) if text else ""
+
+
+def _render_children(element, parts: List[str], markdown: bool) -> None:
+    """Render the text and child elements of an element."""
+    if element.text:
+        parts.append(_inline_text(element.text))
+    for child in element:
+        _render(child, parts, markdown)
+        if child.tail:
+            parts.append(_inline_text(child.tail))
+
+
+def _render_inner(element, markdown: bool) -> str:
+    """Render the content of an element to a string."""
+    inner: List[str] = []
+    _render_children(element, inner, markdown)
+    return ''.join(inner).strip()
+
+
+def _render(element, parts: List[str], markdown: bool) -> None:
+    """Render one element (without its tail) into parts."""
+    tag = element.tag
+    if not isinstance(tag, str):
+        # Comments and processing instructions
+        return
+    tag = tag.lower()
+
+    if tag in _IGNORED_TAGS:
+        return
+    if tag == 'br':
+        parts.append('\n')
+    elif tag == 'hr':
+        parts.append('\n\n---\n\n' if markdown else '\n\n')
+    elif tag in _HEADING_LEVELS:
+        inner = _render_inner(element, markdown)
+        if inner:
+            prefix = '#' * _HEADING_LEVELS[tag] + ' ' if markdown else ''
+            parts.append(f'\n\n{prefix}{inner}\n\n')
+    elif tag in ('ul', 'ol'):
+        parts.append('\n\n')
+        number = 0
+        for child in element:
+            if isinstance(child.tag, str) and child.tag.lower() == 'li':
+                number += 1
+                inner = _render_inner(child, markdown)
+                if inner:
+                    bullet = (f'{number}. ' if tag == 'ol' else '- ') if markdown else ''
+                    parts.append(f'\n{bullet}{inner}')
+            else:
+                _render(child, parts, markdown)
+                parts.append(_inline_text(child.tail))
+        parts.append('\n\n')
+    elif tag == 'li':
+        # List item outside a list
+        parts.append('\n')
+        _render_children(element, parts, markdown)
+        parts.append('\n')
+    elif tag == 'pre':
+        code = element.text_content().strip('\n')
+        if code.strip():
+            parts.append(f'\n\n```\n{code}\n```\n\n' if markdown else f'\n\n{code}\n\n')
+    elif tag == 'tr':
+        cells = [_render_inner(cell, markdown) for cell in element if isinstance(cell.tag, str)]
+        if any(cells):
+            parts.append('\n' + ' | '.join(cells))
+    elif tag in _BLOCK_TAGS:
+        parts.append('\n\n')
+        _render_children(element, parts, markdown)
+        parts.append('\n\n')
+    elif markdown and tag == 'a':
+        inner = _render_inner(element, markdown)
+        href = (element.get('href') or '').strip()
+        if inner and href and not href.startswith(('#', 'javascript:')):
+            parts.append(f'[{inner}]({href})')
+        elif inner:
+            parts.append(inner)
+    elif markdown and tag in _INLINE_MARKERS:
+        inner = _render_inner(element, markdown)
+        if inner:
+            marker = _INLINE_MARKERS[tag]
+            parts.append(f'{marker}{inner}{marker}')
+    else:
+        _render_children(element, parts, markdown)
+
+
+class SoupEngine(ExtractionEngine):
+    """The former path: BeautifulSoup with html.parser, then markdownify."""
+
+    name = "bs4"
+
+    @classmethod
+    def available(cls) -> bool:
+        """Return whether BeautifulSoup is installed."""
+        return BS4_AVAILABLE
+
+    def extract(self, content: bytes, encoding: str | None, markdown: bool = True, main_content: bool = False) -> ExtractedPage:
+        """Extract the title and body with BeautifulSoup (and markdownify if installed)."""
+        soup = BeautifulSoup(content, 'html.parser', from_encoding=encoding)
+
+        # Remove unwanted elements
+        for element in soup(list(SKIPPED_TAGS)):
+            element.decompose()
+
+        title = soup.title.text if soup.title else ""
+        if markdown and MARKDOWNIFY_AVAILABLE:
+            return ExtractedPage(title, markdownify(str(soup)), self.name)
+        return ExtractedPage(title, soup.get_text('\n' if markdown else ' '), self.name)
+
+
+class RegexEngine(ExtractionEngine):
+    """Last resort without any HTML library: strip the tags."""
+
+    name = "regex"
+
+    def extract(self, content: bytes, encoding: str | None, markdown: bool = True, main_content: bool = False) -> ExtractedPage:
+        """Extract the title and body by removing tags."""
+        html = _decode(content, encoding)
+        match = _TITLE_PATTERN.search(html)
+        title = _HTML_TAG_PATTERN.sub(' ', match.group(1)) if match else ""
+        return ExtractedPage(title, _HTML_TAG_PATTERN.sub(' ', _SKIPPED_BLOCK_PATTERN.sub(' ', html)), self.name)
+
+
+ENGINES: Dict[str, Type[ExtractionEngine]] = {
+    'lxml': LxmlEngine,
+    'bs4': SoupEngine,
+    'regex': RegexEngine,
+}
+
+
+def get_engine_chain(name: str | None = None) -> List[ExtractionEngine]:
+    """Return the engines to try, preferred first, skipping unavailable ones.
+
+    Args:
+        name: "auto", "lxml", "bs4" or "regex"; defaults to the
+            PAGE_EXTRACT_ENGINE environment variable ("auto"). A named
+            engine is tried first and the others remain as fallbacks.
+    """
+    name = (name or os.getenv("PAGE_EXTRACT_ENGINE", "auto")).lower()
+    order = list(ENGINES)
+    if name in ENGINES:
+        order.remove(name)
+        order.insert(0, name)
+    return [ENGINES[engine]() for engine in order if ENGINES[engine].available()]
+
+
+def extract_page(
+    content: bytes,
+    encoding: str | None = None,
+    markdown: bool = True,
+    engine: str | None = None,
+    sanitizer: TextSanitizer | None = None,
+    main_content: bool | None = None
+) -> ExtractedPage:
+    """Extract the cleaned title and body of an HTML page.
+
+    Engines are tried in order of preference (see get_engine_chain); one
+    that fails on a malformed document hands over to the next. By default
+    only the main content (the article body, without cookie banners,
+    menus and sidebars) is kept when it can be found.
+
+    Args:
+        content: Raw (already content-decoded) response body
+        encoding: Charset declared by the response, if any (detected otherwise, see detect_encoding)
+        markdown: Return markdown with paragraph breaks instead of flat text
+        engine: Preferred engine name (default: PAGE_EXTRACT_ENGINE)
+        sanitizer: Character policy (default: the configured model's)
+        main_content: Keep only the main content (default: PAGE_EXTRACT_MAIN_CONTENT, true)
+
+    Returns:
+        ExtractedPage: The cleaned title and body
+    """
+    sanitizer = sanitizer or get_sanitizer()
+    encoding = detect_encoding(content, encoding)
+    if main_content is None:
+        main_content = os.getenv("PAGE_EXTRACT_MAIN_CONTENT", "true").lower() == "true"
+
+    for extractor in get_engine_chain(engine):
+        try:
+            page = extractor.extract(content, encoding, markdown, main_content)
+        except Exception as e:
+            logger.warning(f"{extractor.name} extraction failed, trying the next engine: {e}")
+            continue
+        page.title = sanitizer.clean(page.title)
+        page.text = sanitizer.clean(page.text, keep_newlines=markdown)
+        return page
+    return ExtractedPage("", "", "none")
+
+
+def extract_text_document(
+    content: bytes,
+    encoding: str | None = None,
+    markdown: bool = True,
+    sanitizer: TextSanitizer | None = None
+) -> ExtractedPage:
+    """Extract the body of a plain-text document (text/plain, JSON, XML, ...).
+
+    Args:
+        content: Raw (already content-decoded) response body
+        encoding: Charset declared by the response, if any
+        markdown: Keep line breaks instead of flattening to one line
+        sanitizer: Character policy (default: the configured model's)
+
+    Returns:
+        ExtractedPage: The cleaned body, with an empty title
+    """
+    sanitizer = sanitizer or get_sanitizer()
+    return ExtractedPage("", sanitizer.clean(_decode(content, detect_encoding(content, encoding)), keep_newlines=markdown), "text")
@@ -0,0 +1,424 @@
+"""Shared page fetching for the get_page_content tools."""
+
+import asyncio
+import codecs
+import logging
+import os
+from html.parser import HTMLParser
+from typing import Any, Dict, List, Tuple
+
+import httpx
+
+from ..utils.text_sanitizer import get_sanitizer
+from ..utils.urls import canonicalize_url
+from .artifact_store import get_artifact_store
+from .content_types import (
+    BINARY,
+    HTML,
+    PDF,
+    UnsupportedContentError,
+    content_kind,
+    looks_binary,
+)
+from .extraction_pool import get_extraction_pool
+from .fetch_scheduler import get_fetch_scheduler
+from .http_client import get_http_client
+from .page_cache import CachedPage, content_hash, get_page_cache
+from .page_extract import SKIPPED_TAGS, ExtractedPage
+from .replay import get_replay_layer
+from .single_flight import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+# Concurrent fetches of the same canonical URL share one request
+page_flights = SingleFlight()
+
+# Counters over all streamed fetches, for benchmarks and logging
+fetch_stats = {'pages': 0, 'stopped_at_budget': 0, 'stopped_at_cap': 0, 'stopped_at_skipped': 0, 'probes': 0, 'bytes_downloaded': 0}
+
+
+class PageFetchLimits:
+    """Caps applied while a page body streams in.
+
+    max_download_bytes bounds the bytes read from the wire and
+    max_decoded_bytes the body after content decoding (gzip, brotli), so a
+    compression bomb cannot inflate past it. text_margin is the share of
+    visible text read beyond the requested number of characters, since
+    main-content selection later drops banners, menus and sidebars that
+    the streaming count cannot tell apart from the article.
+
+    PDFs cannot be cut at a text budget (their page index usually sits at
+    the end of the file), so they are read whole up to max_pdf_bytes. URLs
+    that look like media or binary files are probed with a HEAD request
+    (or a one-chunk range request) first when probe is set, and skipped
+    without a download if the probe confirms it.
+    """
+
+    def __init__(
+        self,
+        max_download_bytes: int = 5 * 1024 * 1024,
+        max_decoded_bytes: int = 10 * 1024 * 1024,
+        chunk_size: int = 64 * 1024,
+        text_margin: float = 2.0,
+        max_pdf_bytes: int = 20 * 1024 * 1024,
+        probe: bool = True,
+        probe_timeout: float = 5.0
+    ):
+        """Initialize the limits; see the class docstring for the fields."""
+        self.max_download_bytes = max_download_bytes
+        self.max_decoded_bytes = max_decoded_bytes
+        self.chunk_size = chunk_size
+        self.text_margin = text_margin
+        self.max_pdf_bytes = max_pdf_bytes
+        self.probe = probe
+        self.probe_timeout = probe_timeout
+
+    @classmethod
+    def from_env(cls) -> "PageFetchLimits":
+        """Build limits from the environment.
+
+        Reads PAGE_FETCH_MAX_BYTES, PAGE_FETCH_MAX_DECODED_BYTES,
+        PAGE_FETCH_CHUNK_SIZE, PAGE_FETCH_TEXT_MARGIN, PAGE_FETCH_MAX_PDF_BYTES,
+        PAGE_FETCH_PROBE and PAGE_FETCH_PROBE_TIMEOUT.
+        """
+        return cls(
+            max_download_bytes=int(os.getenv("PAGE_FETCH_MAX_BYTES", str(5 * 1024 * 1024))),
+            max_decoded_bytes=int(os.getenv("PAGE_FETCH_MAX_DECODED_BYTES", str(10 * 1024 * 1024))),
+            chunk_size=int(os.getenv("PAGE_FETCH_CHUNK_SIZE", str(64 * 1024))),
+            text_margin=max(1.0, float(os.getenv("PAGE_FETCH_TEXT_MARGIN", "2.0"))),
+            max_pdf_bytes=int(os.getenv("PAGE_FETCH_MAX_PDF_BYTES", str(20 * 1024 * 1024))),
+            probe=os.getenv("PAGE_FETCH_PROBE", "true").lower() == "true",
+            probe_timeout=float(os.getenv("PAGE_FETCH_PROBE_TIMEOUT", "5"))
+        )
+
+    def text_budget(self, max_chars: int | None) -> int | None:
+        """Return the visible characters to read for max_chars of output, or None for no limit."""
+        if not max_chars or max_chars <= 0:
+            return None
+        return int(max_chars * self.text_margin)
+
+
+class _TextMeter(HTMLParser):
+    """Count the visible text characters of an HTML document as it streams in.
+
+    Text inside SKIPPED_TAGS is not counted, since extraction drops it anyway.
+    """
+
+    def __init__(self):
+        """Initialize an empty meter."""
+        super().__init__(convert_charrefs=True)
+        self.chars = 0
+        self._skip_depth = 0
+
+    def handle_starttag(self, tag: str, attrs: List[Any]) -> None:
+        """Enter a skipped element."""
+        if tag in SKIPPED_TAGS:
+            self._skip_depth += 1
+
+    def handle_endtag(self, tag: str) -> None:
+        """Leave a skipped element."""
+        if tag in SKIPPED_TAGS and self._skip_depth:
+            self._skip_depth -= 1
+
+    def handle_data(self, data: str) -> None:
+        """Count text outside skipped elements, whitespace collapsed."""
+        if not self._skip_depth:
+            self.chars += len(' '.join(data.split()))
+
+
+class _PlainMeter:
+    """Count the visible characters of a plain-text document as it streams in."""
+
+    def __init__(self):
+        """Initialize an empty meter."""
+        self.chars = 0
+
+    def feed(self, data: str) -> None:
+        """Count text, whitespace collapsed."""
+        self.chars += len(' '.join(data.split()))
+
+
+def _incremental_decoder(encoding: str | None) -> codecs.IncrementalDecoder:
+    """Return a decoder for the declared charset, falling back to UTF-8."""
+    try:
+        return codecs.getincrementaldecoder(encoding or 'utf-8')(errors='replace')
+    except LookupError:
+        return codecs.getincrementaldecoder('utf-8')(errors='replace')
+
+
+def _bodiless_response(response: httpx.Response, stopped: str) -> httpx.Response:
+    """Return a copy of a response's status and content type without a body."""
+    return httpx.Response(
+        response.status_code,
+        headers={'content-type': response.headers.get('content-type', '')},
+        request=response.request,
+        extensions={'page_fetch': {'stopped': stopped, 'bytes_downloaded': 0, 'bytes_decoded': 0}}
+    )
+
+
+async def _probe(url: str, limits: PageFetchLimits) -> httpx.Response | None:
+    """Check what a URL serves without downloading it.
+
+    A HEAD request is tried first; servers that reject HEAD or omit the
+    content type get a range request for the first bytes instead.
+
+    Returns:
+        httpx.Response: A bodiless response if the URL serves a binary
+            document, or None if it should be fetched (also when the probe
+            itself fails)
+    """
+    client = get_http_client()
+    scheduler = get_fetch_scheduler()
+    fetch_stats['probes'] += 1
+    try:
+        async with scheduler.slot(url):
+            response = await client.request("HEAD", url, timeout=limits.probe_timeout)
+        scheduler.observe(url, response.status_code, response.headers)
+        if response.status_code < 400 and response.headers.get('content-type'):
+            kind = content_kind(response.headers['content-type'])
+        else:
+            head = b''
+            async with scheduler.slot(url), client.stream("GET", url, timeout=limits.probe_timeout, headers={'Range': 'bytes=0-1023'}) as response:
+                scheduler.observe(url, response.status_code, response.headers)
+                if response.status_code >= 400:
+                    return None
+                async for chunk in response.aiter_bytes(1024):
+                    head = chunk
+                    break
+            kind = content_kind(response.headers.get('content-type'), head)
+    except httpx.HTTPError:
+        return None
+    return _bodiless_response(response, 'skipped') if kind == BINARY else None
+
+
+async def _stream_page(url: str, text_budget: int | None, limits: PageFetchLimits, headers: Dict[str, str] | None = None) -> httpx.Response:
+    """Read a page in chunks until the text budget or a byte cap is reached.
+
+    The request waits for a slot of the fetch scheduler, which spaces out
+    and caps concurrent fetches per domain and backs off after 429/503.
+
+    The content type is decided from the headers and the first chunk:
+    binary documents are not read further, PDFs are read whole up to
+    max_pdf_bytes, and HTML and plain text stop at the text budget.
+    headers are sent with the request (e.g. conditional request headers).
+
+    Returns:
+        httpx.Response: A response holding the body read so far; what was
+            read and why reading stopped is kept in extensions['page_fetch']
+    """
+    if limits.probe and not headers and looks_binary(url):
+        probed = await _probe(url, limits)
+        if probed is not None:
+            fetch_stats['pages'] += 1
+            fetch_stats['stopped_at_skipped'] += 1
+            return probed
+
+    chunks: List[bytes] = []
+    decoded_bytes = 0
+    stopped = None
+    max_download_bytes = limits.max_download_bytes
+    max_decoded_bytes = limits.max_decoded_bytes
+
+    scheduler = get_fetch_scheduler()
+    async with scheduler.slot(url), get_http_client().stream("GET", url, headers=headers) as response:
+        scheduler.observe(url, response.status_code, response.headers)
+        content_type = response.headers.get('content-type')
+        # Error pages are not worth downloading; the caller raises on the status
+        if response.status_code < 400 and content_kind(content_type) == BINARY:
+            stopped = 'skipped'
+        elif response.status_code < 400:
+            meter = None
+            decoder = None
+
+            async for chunk in response.aiter_bytes(limits.chunk_size):
+                if not chunks:
+                    # The first bytes settle types the headers leave open
+                    kind = content_kind(content_type, chunk)
+                    if kind == BINARY:
+                        chunks.append(chunk)
+                        stopped = 'skipped'
+                        break
+                    if kind == PDF:
+                        max_download_bytes = max_decoded_bytes = limits.max_pdf_bytes
+                    elif text_budget:
+                        meter = _TextMeter() if kind == HTML else _PlainMeter()
+                        decoder = _incremental_decoder(response.charset_encoding)
+
+                chunks.append(chunk)
+                decoded_bytes += len(chunk)
+                if decoded_bytes >= max_decoded_bytes or response.num_bytes_downloaded >= max_download_bytes:
+                    stopped = 'cap'
+                    break
+                if meter is not None:
+                    meter.feed(decoder.decode(chunk))
+                    if meter.chars >= text_budget:
+                        stopped = 'budget'
+                        break
+        downloaded = response.num_bytes_downloaded
+
+    fetch_stats['pages'] += 1
+    fetch_stats['bytes_downloaded'] += downloaded
+    if stopped:
+        fetch_stats[f'stopped_at_{stopped}'] += 1
+
+    response_headers = {
+        name: value for name, value in response.headers.items()
+        # The body below is already decoded and possibly cut short
+        if name.lower() not in ('content-encoding', 'transfer-encoding', 'content-length')
+    }
+    return httpx.Response(
+        response.status_code,
+        headers=response_headers,
+        content=b''.join(chunks)[:max_decoded_bytes],
+        request=response.request,
+        extensions={'page_fetch': {'stopped': stopped, 'bytes_downloaded': downloaded, 'bytes_decoded': decoded_bytes}}
+    )
+
+
+def fetch_info(response: httpx.Response) -> Dict[str, Any]:
+    """Return how a fetched body was read (empty for replayed responses)."""
+    return response.extensions.get('page_fetch', {})
+
+
+def was_truncated(response: httpx.Response) -> bool:
+    """Return whether reading stopped before the end of the body."""
+    return fetch_info(response).get('stopped') is not None
+
+
+async def fetch_page(url: str, max_chars: int | None = None, validators: Dict[str, str] | None = None) -> httpx.Response:
+    """Fetch a page through the shared HTTP client.
+
+    The body is streamed and reading stops once enough visible text for
+    max_chars has arrived, or at the download and decoded size caps (see
+    PageFetchLimits), so large pages cost no more than their first
+    screens. Concurrent callers for the same canonical URL and budget, from
+    any session, attach to a single in-flight request and receive the same
+    response.
+
+    Args:
+        url: The URL to fetch
+        max_chars: Characters of text the caller will keep (default: whole body up to the caps)
+        validators: Conditional request headers (If-None-Match, If-Modified-Since)
+
+    Returns:
+        httpx.Response: The response with the body read so far (a bodiless
+            304 if the validators still match)
+    """
+    canonical_url = canonicalize_url(url)
+    limits = PageFetchLimits.from_env()
+    text_budget = limits.text_budget(max_chars)
+    conditions = tuple(sorted((validators or {}).items()))
+    replay_key = ([text_budget] if text_budget else []) + [list(condition) for condition in conditions]
+    return await page_flights.do(
+        ('page', canonical_url, text_budget, conditions),
+        lambda: get_replay_layer().fetch(canonical_url, lambda: _stream_page(url, text_budget, limits, validators), *replay_key)
+    )
+
+
+def _store_artifacts(url: str, body: bytes, page: ExtractedPage, markdown: bool) -> None:
+    """Keep a fetched body and its extracted text in the artifact store.
+
+    The body is stored under its content_hash, which is also the page
+    cache's body hash, and both are named by canonical URL in the "page"
+    and "text" (or "plain_text") ref namespaces. Compression and pack
+    writes are blocking, so callers on the client loop run this in a thread.
+    """
+    store = get_artifact_store()
+    if store is None:
+        return
+    canonical_url = canonicalize_url(url)
+    try:
+        store.link('page', canonical_url, store.put(body))
+        if page.text:
+            store.link('text' if markdown else 'plain_text', canonical_url, store.put(page.text))
+    except Exception as e:
+        logger.warning(f"Failed to store artifacts of {url}: {e}")
+
+
+def _cached_response(url: str, entry: CachedPage, source: str) -> httpx.Response:
+    """Return a stand-in response for a page served from the page cache."""
+    return httpx.Response(
+        200,
+        request=httpx.Request("GET", url),
+        extensions={'page_fetch': {
+            'stopped': 'budget' if entry.text_budget is not None else None,
+            'bytes_downloaded': 0,
+            'bytes_decoded': 0,
+            'cache': source
+        }}
+    )
+
+
+async def fetch_and_extract(url: str, max_chars: int | None = None, markdown: bool = True) -> Tuple[httpx.Response, ExtractedPage]:
+    """Fetch a page and extract its text in the extraction pool.
+
+    The raw body goes to a worker process (see extraction_pool.py), so
+    parsing does not hold the GIL of the threads serving other sessions.
+    HTML is rendered by the page extraction engines, PDFs by the
+    incremental PDF extractor, and plain text is passed through.
+
+    Extracted pages are kept in the page cache (see page_cache.py). A
+    fresh entry is served without any request; a stale one is revalidated
+    with a conditional GET, and on a 304, or a 200 with an unchanged body
+    hash, the stored text is served without parsing the page again.
+    Cache reads and writes hit SQLite, so they run in a thread rather than
+    on the client loop.
+    Freshly fetched bodies and their text also go to the artifact store
+    (see artifact_store.py).
+
+    Args:
+        url: The URL to fetch
+        max_chars: Characters of text the caller will keep
+        markdown: Extract markdown instead of flat text
+
+    Returns:
+        Tuple of (response, extracted page)
+
+    Raises:
+        httpx.HTTPStatusError: If the server answered with an error status
+        UnsupportedContentError: If the URL serves an image, video, archive
+            or other binary document
+    """
+    text_budget = PageFetchLimits.from_env().text_budget(max_chars)
+    policy = get_sanitizer().name
+    cache = get_page_cache()
+    entry = await asyncio.to_thread(cache.get, url, markdown, policy) if cache is not None else None
+    if entry is not None and not entry.covers(text_budget):
+        entry = None
+
+    if entry is not None and entry.fresh:
+        cache.record('hits')
+        return _cached_response(url, entry, 'hit'), entry.page
+
+    validators = entry.validators() if entry is not None else {}
+    response = await fetch_page(url, max_chars, validators or None)
+    if entry is not None and response.status_code == 304:
+        await asyncio.to_thread(cache.confirm, entry, response.headers)
+        cache.record('revalidated')
+        return _cached_response(url, entry, 'revalidated'), entry.page
+    response.raise_for_status()
+
+    body_hash = content_hash(response.content)
+    if entry is not None and body_hash == entry.content_hash:
+        # Servers without validators still let an unchanged body skip extraction
+        await asyncio.to_thread(cache.confirm, entry, response.headers)
+        cache.record('unchanged')
+        return response, entry.page
+
+    kind = content_kind(response.headers.get('content-type'), response.content[:1024])
+    if kind == BINARY:
+        raise UnsupportedContentError(f"Skipped {response.headers.get('content-type') or 'binary'} content, no text to extract")
+    page = await get_extraction_pool().extract(
+        response.content, response.charset_encoding, markdown,
+        kind=kind, max_chars=text_budget
+    )
+
+    await asyncio.to_thread(_store_artifacts, url, response.content, page, markdown)
+    if cache is not None:
+        cache.record('changed' if entry is not None else 'misses')
+        # PDF extraction stops at the text budget even when the whole file was read
+        partial = was_truncated(response) or (kind == PDF and text_budget is not None)
+        await asyncio.to_thread(
+            cache.set, url, markdown, policy, page, response.headers, body_hash, text_budget if partial else None
+        )
+    return response, page
@@ -0,0 +1,235 @@
+"""SimHash fingerprints of extracted page content for near-duplicate detection."""
+
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Dict, List, Tuple, Union
+
+from ..utils.storage import get_data_dir
+from ..utils.urls import canonicalize_url
+from .query_ledger import text_terms
+
+logger = logging.getLogger(__name__)
+
+_BITS = 64
+# Bands the fingerprint is split into for lookup; max_distance must stay below this
+_BANDS = 8
+_BAND_BITS = _BITS // _BANDS
+_BAND_MASK = (1 << _BAND_BITS) - 1
+
+# Pages with less text than this are too generic to call duplicates
+MIN_FINGERPRINT_CHARS = 300
+# Text beyond this is not fingerprinted; mirrors agree long before it
+_MAX_FINGERPRINT_CHARS = 50000
+
+
+def simhash(text: str) -> int | None:
+    """Return the 64-bit SimHash of a text, or None if it is too short.
+
+    Features are word trigrams (CJK character bigrams count as words),
+    weighted by how often they occur, so pages that share most of their
+    text get fingerprints a few bits apart regardless of boilerplate or
+    small edits.
+    """
+    if len(text) < MIN_FINGERPRINT_CHARS:
+        return None
+    terms = text_terms(text[:_MAX_FINGERPRINT_CHARS])
+    if len(terms) < 3:
+        return None
+    features = Counter(' '.join(terms[i:i + 3]) for i in range(len(terms) - 2))
+
+    totals = [0] * _BITS
+    for feature, weight in features.items():
+        value = int.from_bytes(hashlib.blake2b(feature.encode('utf-8'), digest_size=8).digest(), 'big')
+        for bit in range(_BITS):
+            totals[bit] += weight if value >> bit & 1 else -weight
+    return sum(1 << bit for bit, total in enumerate(totals) if total > 0)
+
+
+def hamming_distance(first: int, second: int) -> int:
+    """Return the number of bits two fingerprints differ in."""
+    return bin(first ^ second).count('1')
+
+
+class PageFingerprint:
+    """A page whose content was handed to the agent, and the URLs that repeat it."""
+
+    __slots__ = ('url', 'title', 'fingerprint', 'corroborating')
+
+    def __init__(self, url: str, title: str, fingerprint: int):
+        """Initialize an entry.
+
+        Args:
+            url: URL the content was first fetched from
+            title: Page title
+            fingerprint: SimHash of the page text
+        """
+        self.url = url
+        self.title = title
+        self.fingerprint = fingerprint
+        # URLs found to carry the same content, in the order they were fetched
+        self.corroborating: List[str] = []
+
+
+class PageFingerprintIndex:
+    """Fingerprints of the pages fetched during one research session.
+
+    Fingerprints are indexed by eight 8-bit bands; two fingerprints at most
+    seven bits apart share at least one band, so lookups only compare
+    against pages in the same buckets.
+    """
+
+    def __init__(self, max_distance: int = 5):
+        """Initialize an empty index.
+
+        Args:
+            max_distance: Largest Hamming distance at which pages count as duplicates (below 8)
+        """
+        self.max_distance = min(max_distance, _BANDS - 1)
+        self.entries: List[PageFingerprint] = []
+        self._buckets: Dict[Tuple[int, int], List[PageFingerprint]] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _band_keys(fingerprint: int) -> List[Tuple[int, int]]:
+        return [(band, fingerprint >> (band * _BAND_BITS) & _BAND_MASK) for band in range(_BANDS)]
+
+    def find(self, fingerprint: int) -> PageFingerprint | None:
+        """Return the closest indexed page within max_distance, or None."""
+        with self._lock:
+            candidates = {id(entry): entry for key in self._band_keys(fingerprint) for entry in self._buckets.get(key, [])}
+        best: Tuple[int, PageFingerprint] | None = None
+        for entry in candidates.values():
+            distance = hamming_distance(fingerprint, entry.fingerprint)
+            if distance <= self.max_distance and (best is None or distance < best[0]):
+                best = (distance, entry)
+        return best[1] if best else None
+
+    def add(self, url: str, title: str, fingerprint: int) -> PageFingerprint:
+        """Index a page that was handed to the agent."""
+        entry = PageFingerprint(url, title, fingerprint)
+        with self._lock:
+            self.entries.append(entry)
+            for key in self._band_keys(fingerprint):
+                self._buckets.setdefault(key, []).append(entry)
+        return entry
+
+    def check(self, url: str, title: str, fingerprint: int, add: bool = True) -> PageFingerprint | None:
+        """Return the page a fetched page duplicates, or index it as new.
+
+        The URL is recorded as corroborating the original when it is a
+        duplicate from a different URL. Fetching the same canonical URL
+        again is not a duplicate.
+
+        Args:
+            url: URL of the fetched page
+            title: Page title
+            fingerprint: SimHash of the page text
+            add: Index the page when it is new
+
+        Returns:
+            The original page, or None if the page is new
+        """
+        original = self.find(fingerprint)
+        if original is None:
+            if add:
+                self.add(url, title, fingerprint)
+            return None
+        canonical_url = canonicalize_url(url)
+        if canonical_url == canonicalize_url(original.url):
+            return None
+        with self._lock:
+            if canonical_url not in (canonicalize_url(other) for other in original.corroborating):
+                original.corroborating.append(url)
+        return original
+
+
+class FingerprintStore:
+    """Fingerprints of fetched pages by canonical URL, kept across sessions.
+
+    Lets a session recognize a known mirror of a page it already has
+    before fetching it.
+    """
+
+    def __init__(self, path: Union[str, Path], max_entries: int = 20000):
+        """Initialize the store and create its table if needed.
+
+        Args:
+            path: SQLite database file
+            max_entries: Maximum number of stored fingerprints
+        """
+        self.path = str(path)
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS page_fingerprints (
+                url TEXT PRIMARY KEY,
+                fingerprint INTEGER NOT NULL,
+                seen_at REAL NOT NULL
+            )"""
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_page_fingerprints_seen ON page_fingerprints (seen_at)")
+        self._conn.commit()
+
+    def get(self, url: str) -> int | None:
+        """Return the last fingerprint seen for a URL, or None."""
+        with self._lock:
+            row = self._conn.execute("SELECT fingerprint FROM page_fingerprints WHERE url = ?", (canonicalize_url(url),)).fetchone()
+        # SQLite integers are signed
+        return row[0] & ((1 << _BITS) - 1) if row else None
+
+    def set(self, url: str, fingerprint: int) -> None:
+        """Remember the fingerprint of a URL's content."""
+        signed = fingerprint - (1 << _BITS) if fingerprint >= 1 << (_BITS - 1) else fingerprint
+        with self._lock:
+            self._conn.execute("INSERT OR REPLACE INTO page_fingerprints VALUES (?, ?, ?)", (canonicalize_url(url), signed, time.time()))
+            overflow = self._conn.execute("SELECT COUNT(*) FROM page_fingerprints").fetchone()[0] - self.max_entries
+            if overflow > 0:
+                self._conn.execute(
+                    "DELETE FROM page_fingerprints WHERE url IN "
+                    "(SELECT url FROM page_fingerprints ORDER BY seen_at ASC LIMIT ?)",
+                    (overflow,)
+                )
+            self._conn.commit()
+
+
+def get_dedup_distance() -> int | None:
+    """Return the near-duplicate page distance from PAGE_DEDUP_MAX_DISTANCE.
+
+    Returns None when page deduplication is disabled (a negative value).
+    """
+    distance = int(os.getenv("PAGE_DEDUP_MAX_DISTANCE", "5"))
+    return distance if distance >= 0 else None
+
+
+_store: FingerprintStore | None = None
+_store_lock = threading.Lock()
+
+
+def get_fingerprint_store() -> FingerprintStore | None:
+    """Return the cross-session fingerprint store, or None unless enabled.
+
+    Settings are read from PAGE_DEDUP_ACROSS_SESSIONS (default: false) and
+    PAGE_DEDUP_STORE_PATH.
+    """
+    global _store
+
+    if os.getenv("PAGE_DEDUP_ACROSS_SESSIONS", "false").lower() != "true":
+        return None
+
+    with _store_lock:
+        if _store is None:
+            try:
+                _store = FingerprintStore(os.getenv("PAGE_DEDUP_STORE_PATH") or get_data_dir() / "page_fingerprints.sqlite3")
+                logger.info(f"Page fingerprint store opened at {_store.path}")
+            except Exception as e:
+                logger.error(f"Failed to open page fingerprint store, continuing without it: {e}")
+                return None
+    return _store
@@ -0,0 +1,175 @@
+"""Query-focused selection of passages from extracted page text."""
+
+import math
+import os
+import re
+from collections import Counter
+from typing import List, Sequence
+
+from .query_ledger import text_terms
+
+# BM25 parameters (the usual Okapi defaults)
+_K1 = 1.2
+_B = 0.75
+
+_PARAGRAPH_SPLIT_PATTERN = re.compile(r'\n\s*\n')
+_SENTENCE_END_PATTERN = re.compile(r'(?<=[.!?;])\s+|(?<=[。！？；])')
+_HEADING_PATTERN = re.compile(r'#{1,6} ')
+
+# Marks text left out between selected passages
+GAP_MARKER = "[...]"
+
+
+class Passage:
+    """A run of consecutive paragraphs of a page."""
+
+    __slots__ = ('index', 'text', 'terms', 'score')
+
+    def __init__(self, index: int, text: str):
+        """Initialize a passage.
+
+        Args:
+            index: Position of the passage in the page
+            text: The passage text
+        """
+        self.index = index
+        self.text = text
+        self.terms = Counter(text_terms(text))
+        self.score = 0.0
+
+
+def _split_long(paragraph: str, target_chars: int) -> List[str]:
+    """Split a paragraph longer than target_chars at sentence ends."""
+    pieces: List[str] = []
+    current = ""
+    for sentence in _SENTENCE_END_PATTERN.split(paragraph):
+        if current and len(current) + len(sentence) + 1 > target_chars:
+            pieces.append(current)
+            current = ""
+        current = f"{current} {sentence}" if current else sentence
+    if current:
+        pieces.append(current)
+    return pieces
+
+
+def split_passages(text: str, target_chars: int = 600) -> List[Passage]:
+    """Split page text into passages of about target_chars.
+
+    Paragraphs (blank-line separated) are merged until a passage reaches
+    target_chars, so lists and short paragraphs stay together; headings
+    always start a new passage, and paragraphs longer than twice
+    target_chars are split at sentence ends.
+    """
+    blocks: List[str] = []
+    for paragraph in _PARAGRAPH_SPLIT_PATTERN.split(text):
+        paragraph = paragraph.strip()
+        if not paragraph:
+            continue
+        blocks.extend(_split_long(paragraph, target_chars) if len(paragraph) > 2 * target_chars else [paragraph])
+
+    passages: List[str] = []
+    current: List[str] = []
+    size = 0
+    for block in blocks:
+        if current and (size >= target_chars or _HEADING_PATTERN.match(block)):
+            passages.append('\n\n'.join(current))
+            current, size = [], 0
+        current.append(block)
+        size += len(block)
+    if current:
+        passages.append('\n\n'.join(current))
+    return [Passage(index, passage) for index, passage in enumerate(passages)]
+
+
+def score_passages(passages: Sequence[Passage], queries: Sequence[str]) -> bool:
+    """Score passages with BM25 against the queries, treating the page as the corpus.
+
+    Later queries are the more specific ones (the current sub-query after
+    the research question), so their terms count double.
+
+    Returns:
+        bool: Whether any passage matched a query term
+    """
+    weights: Counter = Counter()
+    for position, query in enumerate(queries):
+        for term in set(text_terms(query)):
+            weights[term] = max(weights[term], 2.0 if position == len(queries) - 1 and len(queries) > 1 else 1.0)
+    if not weights or not passages:
+        return False
+
+    count = len(passages)
+    average_length = sum(sum(passage.terms.values()) for passage in passages) / count or 1.0
+    frequencies = Counter(term for passage in passages for term in passage.terms if term in weights)
+
+    matched = False
+    for passage in passages:
+        length = sum(passage.terms.values())
+        score = 0.0
+        for term, weight in weights.items():
+            tf = passage.terms.get(term, 0)
+            if not tf:
+                continue
+            idf = math.log(1 + (count - frequencies[term] + 0.5) / (frequencies[term] + 0.5))
+            score += weight * idf * tf * (_K1 + 1) / (tf + _K1 * (1 - _B + _B * length / average_length))
+        passage.score = score
+        matched = matched or score > 0
+    return matched
+
+
+def select_passages(text: str, queries: Sequence[str], max_chars: int, target_chars: int | None = None) -> str | None:
+    """Return the passages of a page that best answer the queries, within max_chars.
+
+    The page's first passage is kept for context when it fits in a fifth
+    of the budget; the rest of the budget goes to the highest scoring
+    passages. Selected passages are returned in page order, with a gap
+    marker where text was left out.
+
+    Args:
+        text: Extracted page text (markdown with paragraph breaks)
+        queries: Research question and sub-queries, most specific last
+        max_chars: Character budget of the result
+        target_chars: Passage size (default: PAGE_PASSAGE_CHARS, 600)
+
+    Returns:
+        The selected text, or None if the page fits the budget or no
+        passage matches the queries (the caller keeps the page prefix)
+    """
+    if len(text) <= max_chars:
+        return None
+    target_chars = target_chars or int(os.getenv("PAGE_PASSAGE_CHARS", "600"))
+    passages = split_passages(text, min(target_chars, max(100, max_chars // 2)))
+    if len(passages) < 2 or not score_passages(passages, queries):
+        return None
+
+    # Each passage costs at most its text, a gap marker and two separators;
+    # room for the trailing gap marker is reserved up front
+    separator = len('\n\n')
+    selected = []
+    used = len(GAP_MARKER) + separator
+    lead = passages[0]
+    if len(lead.text) <= max_chars // 5:
+        selected.append(lead)
+        used += len(lead.text)
+
+    for passage in sorted(passages[1:] if selected else passages, key=lambda passage: -passage.score):
+        if passage.score <= 0:
+            break
+        cost = len(passage.text) + len(GAP_MARKER) + 2 * separator
+        if used + cost > max_chars:
+            continue
+        selected.append(passage)
+        used += cost
+
+    if not any(passage.score > 0 for passage in selected):
+        return None
+
+    parts: List[str] = []
+    previous = -1
+    for passage in sorted(selected, key=lambda passage: passage.index):
+        if passage.index != previous + 1:
+            parts.append(GAP_MARKER)
+        parts.append(passage.text)
+        previous = passage.index
+    if previous != len(passages) - 1:
+        parts.append(GAP_MARKER)
+    return '\n\n'.join(parts)
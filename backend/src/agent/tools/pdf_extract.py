@@ -0,0 +1,87 @@
+"""Incremental text extraction from PDF documents."""
+
+import io
+import logging
+import re
+from typing import List
+
+from ..utils.text_sanitizer import TextSanitizer, get_sanitizer
+from .content_types import UnsupportedContentError
+from .page_extract import ExtractedPage
+
+# Conditional import for the pure-Python PDF reader
+try:
+    from pypdf import PdfReader
+    PYPDF_AVAILABLE = True
+except ImportError:
+    PdfReader = None
+    PYPDF_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+_HYPHENATED_BREAK_PATTERN = re.compile(r'(\w)-\n(\w)')
+_BLANK_LINES_PATTERN = re.compile(r'\n{3,}')
+
+
+def _clean_page_text(text: str) -> str:
+    """Join words hyphenated across lines and squeeze blank lines in one page's text."""
+    text = _HYPHENATED_BREAK_PATTERN.sub(r'\1\2', text.replace('\r\n', '\n'))
+    lines = [line.rstrip() for line in text.split('\n')]
+    return _BLANK_LINES_PATTERN.sub('\n\n', '\n'.join(lines)).strip()
+
+
+def extract_pdf(
+    content: bytes,
+    max_chars: int | None = None,
+    markdown: bool = True,
+    sanitizer: TextSanitizer | None = None
+) -> ExtractedPage:
+    """Extract the title and text of a PDF, page by page.
+
+    Pages are extracted in order and extraction stops once max_chars of
+    text have been collected, so the cost of a long report or filing is
+    that of its first pages. Damaged or cut-off files are read leniently.
+
+    Args:
+        content: Raw PDF bytes
+        max_chars: Characters of text to collect (default: the whole document)
+        markdown: Separate pages with blank lines instead of flattening to one line
+        sanitizer: Character policy (default: the configured model's)
+
+    Returns:
+        ExtractedPage: The cleaned title and body; main_content is False
+
+    Raises:
+        UnsupportedContentError: If pypdf is not installed or the file cannot be read
+    """
+    if not PYPDF_AVAILABLE:
+        raise UnsupportedContentError("PDF extraction requires pypdf (pip install pypdf)")
+    sanitizer = sanitizer or get_sanitizer()
+
+    try:
+        reader = PdfReader(io.BytesIO(content), strict=False)
+        if reader.is_encrypted:
+            # Many PDFs are encrypted with an empty user password
+            reader.decrypt('')
+        pages = reader.pages
+        title = (reader.metadata.title if reader.metadata else None) or ''
+    except Exception as e:
+        raise UnsupportedContentError(f"Could not read PDF: {e}") from e
+
+    parts: List[str] = []
+    collected = 0
+    for number, page in enumerate(pages, 1):
+        try:
+            text = _clean_page_text(page.extract_text() or '')
+        except Exception as e:
+            logger.warning(f"Skipping unreadable PDF page {number}: {e}")
+            continue
+        if not text:
+            continue
+        parts.append(text)
+        collected += len(text)
+        if max_chars and collected >= max_chars:
+            break
+
+    text = '\n\n'.join(parts) if markdown else ' '.join(' '.join(parts).split())
+    return ExtractedPage(sanitizer.clean(str(title)), sanitizer.clean(text, keep_newlines=markdown), 'pypdf')
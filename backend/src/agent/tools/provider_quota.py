@@ -0,0 +1,275 @@
+"""Per-provider rate limiting and persisted quota ledger for search APIs."""
+
+import asyncio
+import logging
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Dict, Set, Tuple, Union
+
+from ..utils.storage import get_data_dir
+
+logger = logging.getLogger(__name__)
+
+# Default limits per provider; 0 means unlimited. Quotas depend on the
+# account's plan, so none are assumed: set SEARCH_QUOTA_<PROVIDER>_DAILY and
+# SEARCH_QUOTA_<PROVIDER>_MONTHLY to match it. Rates are overridden with
+# SEARCH_RATE_<PROVIDER>_RPS.
+DEFAULT_LIMITS = {
+    'TAVILY': {'rps': 5.0, 'daily': 0, 'monthly': 0},
+    'SERPAPI': {'rps': 2.0, 'daily': 0, 'monthly': 0},
+    'GOOGLE': {'rps': 5.0, 'daily': 0, 'monthly': 0},
+}
+
+
+class QuotaExceededError(Exception):
+    """Raised when a provider call is refused locally by its rate limit or quota."""
+
+
+def provider_key(name: str) -> str:
+    """Map an adapter name such as _try_tavily_search to its key (TAVILY)."""
+    return name.removeprefix('_try_').removesuffix('_search').upper()
+
+
+class TokenBucket:
+    """Token bucket rate limiter for use on a single event loop."""
+
+    def __init__(self, rate: float, capacity: float | None = None):
+        """Initialize a full bucket.
+
+        Args:
+            rate: Tokens added per second
+            capacity: Maximum burst size (default: max(1, rate))
+        """
+        self.rate = rate
+        self.capacity = capacity or max(1.0, rate)
+        self.tokens = self.capacity
+        self.updated_at = time.monotonic()
+
+    def _refill(self) -> None:
+        """Add the tokens accrued since the last update."""
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    async def acquire(self, max_wait: float = 0.0) -> bool:
+        """Take one token, waiting up to max_wait seconds for it.
+
+        Returns:
+            bool: False if no token becomes available within max_wait
+        """
+        self._refill()
+        wait = (1.0 - self.tokens) / self.rate if self.tokens < 1.0 else 0.0
+        if wait > max_wait:
+            return False
+
+        # Reserve the token now so concurrent callers queue behind it
+        self.tokens -= 1.0
+        if wait > 0:
+            await asyncio.sleep(wait)
+        return True
+
+
+class QuotaLedger:
+    """SQLite ledger counting provider calls per UTC day."""
+
+    def __init__(self, path: Union[str, Path]):
+        """Open the ledger and create its table if needed.
+
+        Args:
+            path: SQLite database file
+        """
+        self.path = str(path)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS quota_ledger (
+                provider TEXT NOT NULL,
+                day TEXT NOT NULL,
+                calls INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (provider, day)
+            )"""
+        )
+        self._conn.commit()
+
+    @staticmethod
+    def _today() -> str:
+        """Return the current UTC day as YYYY-MM-DD."""
+        return datetime.now(timezone.utc).strftime('%Y-%m-%d')
+
+    def record(self, provider: str, calls: int = 1) -> None:
+        """Add calls to today's count for a provider."""
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO quota_ledger (provider, day, calls) VALUES (?, ?, ?) "
+                "ON CONFLICT (provider, day) DO UPDATE SET calls = calls + excluded.calls",
+                (provider, self._today(), calls)
+            )
+            self._conn.commit()
+
+    def usage(self, provider: str) -> Tuple[int, int]:
+        """Return (calls today, calls this month) for a provider."""
+        today = self._today()
+        with self._lock:
+            daily = self._conn.execute(
+                "SELECT calls FROM quota_ledger WHERE provider = ? AND day = ?", (provider, today)
+            ).fetchone()
+            monthly = self._conn.execute(
+                "SELECT SUM(calls) FROM quota_ledger WHERE provider = ? AND day LIKE ?", (provider, today[:8] + '%')
+            ).fetchone()
+        return (daily[0] if daily else 0), (monthly[0] or 0)
+
+    def history(self, days: int = 31) -> Dict[str, Dict[str, int]]:
+        """Return per-day call counts of the last `days` days, keyed by provider."""
+        since = (datetime.now(timezone.utc) - timedelta(days=days - 1)).strftime('%Y-%m-%d')
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT provider, day, calls FROM quota_ledger WHERE day >= ? ORDER BY day DESC", (since,)
+            ).fetchall()
+        history: Dict[str, Dict[str, int]] = {}
+        for provider, day, calls in rows:
+            history.setdefault(provider, {})[day] = calls
+        return history
+
+
+class ProviderQuotaManager:
+    """Rate limits and quota accounting for every search provider.
+
+    Each provider with a configured rate gets a token bucket; every call that
+    reaches a provider is counted in the ledger. A provider whose daily or
+    monthly usage reaches the soft limit (a fraction of its quota) is routed
+    around before it starts returning 429s. Ledger reads and writes run in a
+    thread, so the HTTP client loop never waits on SQLite.
+    """
+
+    def __init__(self, ledger: QuotaLedger, soft_limit: float = 0.9, max_wait: float = 0.5):
+        """Initialize the manager.
+
+        Args:
+            ledger: Persisted call counts
+            soft_limit: Fraction of a quota at which the provider is avoided
+            max_wait: Seconds a call may wait for a rate-limit token
+        """
+        self.ledger = ledger
+        self.soft_limit = soft_limit
+        self.max_wait = max_wait
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._skipped: Set[str] = set()
+
+    @staticmethod
+    def limits(provider: str) -> Dict[str, float]:
+        """Return the configured rps/daily/monthly limits of a provider."""
+        defaults = DEFAULT_LIMITS.get(provider, {'rps': 0.0, 'daily': 0, 'monthly': 0})
+        return {
+            'rps': float(os.getenv(f"SEARCH_RATE_{provider}_RPS", defaults['rps'])),
+            'daily': int(os.getenv(f"SEARCH_QUOTA_{provider}_DAILY", defaults['daily'])),
+            'monthly': int(os.getenv(f"SEARCH_QUOTA_{provider}_MONTHLY", defaults['monthly'])),
+        }
+
+    async def near_quota(self, name: str) -> bool:
+        """Check whether an adapter's provider usage has reached the soft limit.
+
+        Logs when a provider starts and stops being skipped for its quota.
+        """
+        provider = provider_key(name)
+        limits = self.limits(provider)
+        if not limits['daily'] and not limits['monthly']:
+            return False
+
+        near = await asyncio.to_thread(self._near_quota, provider)
+        if near and provider not in self._skipped:
+            self._skipped.add(provider)
+            daily, monthly = limits['daily'] or 'unlimited', limits['monthly'] or 'unlimited'
+            logger.warning(
+                f"Skipping search provider {name}: usage reached {self.soft_limit:.0%} of its quota "
+                f"(daily {daily}, monthly {monthly}; see SEARCH_QUOTA_{provider}_*)"
+            )
+        elif not near and provider in self._skipped:
+            self._skipped.discard(provider)
+            logger.info(f"Search provider {name} is back under its quota")
+        return near
+
+    def _near_quota(self, provider: str) -> bool:
+        """Check a provider key against its daily and monthly soft limits."""
+        limits = self.limits(provider)
+        if not limits['daily'] and not limits['monthly']:
+            return False
+
+        daily, monthly = self.ledger.usage(provider)
+        return bool(
+            (limits['daily'] and daily >= limits['daily'] * self.soft_limit)
+            or (limits['monthly'] and monthly >= limits['monthly'] * self.soft_limit)
+        )
+
+    async def acquire(self, name: str) -> None:
+        """Admit a call to a provider, or raise QuotaExceededError.
+
+        Must be called from the HTTP client loop.
+        """
+        provider = provider_key(name)
+        if await self.near_quota(name):
+            raise QuotaExceededError(f"{name} is near its quota, skipping")
+
+        rate = self.limits(provider)['rps']
+        if rate > 0:
+            bucket = self._buckets.get(provider)
+            if bucket is None or bucket.rate != rate:
+                bucket = self._buckets[provider] = TokenBucket(rate)
+            if not await bucket.acquire(self.max_wait):
+                raise QuotaExceededError(f"{name} rate limit of {rate:g}/s reached")
+
+    async def record_call(self, name: str) -> None:
+        """Count one call that reached the provider."""
+        await asyncio.to_thread(self.ledger.record, provider_key(name))
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Return usage against limits for every provider in the ledger or defaults."""
+        history = self.ledger.history()
+        providers = {}
+        for provider in sorted(set(DEFAULT_LIMITS) | set(history)):
+            limits = self.limits(provider)
+            daily, monthly = self.ledger.usage(provider)
+            providers[provider] = {
+                'calls_today': daily,
+                'calls_this_month': monthly,
+                'daily_limit': limits['daily'] or None,
+                'monthly_limit': limits['monthly'] or None,
+                'rate_limit_rps': limits['rps'] or None,
+                'daily_remaining': max(0, limits['daily'] - daily) if limits['daily'] else None,
+                'monthly_remaining': max(0, limits['monthly'] - monthly) if limits['monthly'] else None,
+                'near_quota': self._near_quota(provider),
+                'history': history.get(provider, {})
+            }
+        return {
+            'soft_limit': self.soft_limit,
+            'providers': providers,
+            'timestamp': datetime.now().isoformat()
+        }
+
+
+_manager: ProviderQuotaManager | None = None
+_manager_lock = threading.Lock()
+
+
+def get_quota_manager() -> ProviderQuotaManager:
+    """Return the process-wide quota manager.
+
+    Settings are read from SEARCH_QUOTA_LEDGER_PATH, SEARCH_QUOTA_SOFT_LIMIT
+    and SEARCH_RATE_MAX_WAIT.
+    """
+    global _manager
+
+    with _manager_lock:
+        if _manager is None:
+            ledger = QuotaLedger(os.getenv("SEARCH_QUOTA_LEDGER_PATH") or get_data_dir() / "quota_ledger.sqlite3")
+            _manager = ProviderQuotaManager(
+                ledger,
+                soft_limit=float(os.getenv("SEARCH_QUOTA_SOFT_LIMIT", "0.9")),
+                max_wait=float(os.getenv("SEARCH_RATE_MAX_WAIT", "0.5"))
+            )
+            logger.info(f"Search quota ledger opened at {ledger.path}")
+    return _manager
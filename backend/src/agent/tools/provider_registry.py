@@ -0,0 +1,290 @@
+"""Health tracking, circuit breaking and adaptive ordering of search providers."""
+
+import logging
+import os
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List
+
+logger = logging.getLogger(__name__)
+
+
+class ProviderUnavailableError(Exception):
+    """Raised by a provider adapter that is not configured or not installed."""
+
+
+class ProviderHealth:
+    """Observed latency, success rate and empty-result rate of one provider."""
+
+    __slots__ = (
+        'name', 'priority', 'ewma_latency', 'success_rate', 'empty_rate', 'latencies',
+        'calls', 'failures', 'consecutive_failures', 'consecutive_empty', 'state', 'opened_at', 'open_for',
+        'trial_in_progress', 'last_error'
+    )
+
+    def __init__(self, name: str, priority: int, prior_latency: float):
+        """Initialize health with optimistic priors.
+
+        Args:
+            name: Provider (adapter) name
+            priority: Static preference, lower is preferred
+            prior_latency: Latency assumed before any observation, in seconds
+        """
+        self.name = name
+        self.priority = priority
+        self.ewma_latency = prior_latency
+        self.success_rate = 1.0
+        self.empty_rate = 0.0
+        self.latencies: Deque[float] = deque(maxlen=100)
+        self.calls = 0
+        self.failures = 0
+        self.consecutive_failures = 0
+        self.consecutive_empty = 0
+        self.state = "closed"
+        self.opened_at = 0.0
+        self.open_for = 0.0
+        self.trial_in_progress = False
+        self.last_error: str | None = None
+
+    def expected_cost(self) -> float:
+        """Return the expected seconds spent per useful (non-empty) result set."""
+        useful_rate = max(self.success_rate * (1.0 - self.empty_rate), 0.05)
+        return self.ewma_latency / useful_rate
+
+    def latency_percentile(self, percentile: float) -> float | None:
+        """Return the given percentile of recent latencies, if any were observed."""
+        if not self.latencies:
+            return None
+        ordered = sorted(self.latencies)
+        index = min(len(ordered) - 1, int(round(percentile * (len(ordered) - 1))))
+        return ordered[index]
+
+
+class ProviderRegistry:
+    """Registry of search provider adapters ordered by observed health.
+
+    Every call outcome updates EWMA latency, success rate and empty-result
+    rate. Repeated failures open a circuit breaker that keeps the provider out
+    of rotation until a cool-down passes, after which a single trial call is
+    allowed (half-open). Providers that report they are not configured are
+    taken out of rotation immediately. Healthy providers are ordered by
+    expected cost per useful result, so the fastest reliable one goes first;
+    a provider whose recent calls all came back empty is demoted behind every
+    provider still returning results, however fast it answers.
+    """
+
+    def __init__(
+        self,
+        alpha: float = 0.3,
+        failure_threshold: int = 3,
+        reset_timeout: float = 60.0,
+        unavailable_timeout: float = 600.0,
+        min_timeout: float = 2.0,
+        max_timeout: float = 10.0,
+        timeout_percentile: float = 0.95,
+        timeout_multiplier: float = 1.5,
+        min_samples: int = 5,
+        empty_threshold: int = 3
+    ):
+        """Initialize the registry.
+
+        Args:
+            alpha: EWMA smoothing factor
+            failure_threshold: Consecutive failures that open the circuit
+            reset_timeout: Seconds an opened circuit stays open
+            unavailable_timeout: Seconds an unconfigured provider stays open
+            min_timeout: Lower bound for derived per-provider timeouts
+            max_timeout: Upper bound, also used until enough samples exist
+            timeout_percentile: Latency percentile the timeout is derived from
+            timeout_multiplier: Headroom applied to that percentile
+            min_samples: Samples needed before timeouts are derived
+            empty_threshold: Consecutive empty result sets that demote a provider
+        """
+        self.alpha = alpha
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.unavailable_timeout = unavailable_timeout
+        self.min_timeout = min_timeout
+        self.max_timeout = max_timeout
+        self.timeout_percentile = timeout_percentile
+        self.timeout_multiplier = timeout_multiplier
+        self.min_samples = min_samples
+        self.empty_threshold = empty_threshold
+        self._adapters: Dict[str, Callable[..., Any]] = {}
+        self._health: Dict[str, ProviderHealth] = {}
+        self._lock = threading.Lock()
+
+    def register(self, adapter: Callable[..., Any]) -> None:
+        """Register an adapter; registration order is the static preference."""
+        name = adapter.__name__
+        with self._lock:
+            priority = len(self._adapters)
+            self._adapters[name] = adapter
+            # Priors preserve the static order until real observations arrive
+            self._health[name] = ProviderHealth(name, priority, prior_latency=1.0 + 0.1 * priority)
+
+    def _is_available(self, health: ProviderHealth, now: float) -> bool:
+        """Check the circuit breaker, moving open circuits to half-open when due."""
+        if health.state == "closed":
+            return True
+        if health.state == "open" and now - health.opened_at >= health.open_for:
+            health.state = "half_open"
+            health.trial_in_progress = False
+        return health.state == "half_open" and not health.trial_in_progress
+
+    def _rank(self, health: ProviderHealth) -> tuple:
+        """Sort key: demoted providers last, then expected cost, then static preference."""
+        demoted = self.empty_threshold > 0 and health.consecutive_empty >= self.empty_threshold
+        return (demoted, health.expected_cost(), health.priority)
+
+    def ordered(self) -> List[Callable[..., Any]]:
+        """Return available adapters, healthiest first."""
+        now = time.monotonic()
+        with self._lock:
+            available = [health for health in self._health.values() if self._is_available(health, now)]
+            available.sort(key=self._rank)
+            return [self._adapters[health.name] for health in available]
+
+    def begin_call(self, name: str) -> bool:
+        """Ask the circuit breaker whether a call may start.
+
+        A half-open provider admits exactly one trial call at a time.
+
+        Returns:
+            bool: False when the provider's circuit is open
+        """
+        with self._lock:
+            health = self._health.get(name)
+            if health is None:
+                return True
+            if not self._is_available(health, time.monotonic()):
+                return False
+            if health.state == "half_open":
+                health.trial_in_progress = True
+            return True
+
+    def cancel_call(self, name: str, latency: float | None = None) -> None:
+        """Record that a started call was cancelled without an outcome.
+
+        The call would have taken at least `latency` seconds, so when that
+        exceeds the provider's EWMA latency it is counted as a (censored)
+        slow sample: a provider that keeps hanging until a hedge wins moves
+        down the order instead of keeping its old fast latency.
+        """
+        with self._lock:
+            health = self._health.get(name)
+            if health is None:
+                return
+            health.trial_in_progress = False
+            if latency is not None and latency > health.ewma_latency:
+                health.latencies.append(latency)
+                health.ewma_latency += self.alpha * (latency - health.ewma_latency)
+
+    def timeout_for(self, name: str) -> float:
+        """Derive a call timeout from the provider's observed latency percentile."""
+        with self._lock:
+            health = self._health.get(name)
+            if health is None or len(health.latencies) < self.min_samples:
+                return self.max_timeout
+            latency = health.latency_percentile(self.timeout_percentile) or self.max_timeout
+        return min(self.max_timeout, max(self.min_timeout, latency * self.timeout_multiplier))
+
+    def record_success(self, name: str, latency: float, result_count: int) -> None:
+        """Record a completed call."""
+        with self._lock:
+            health = self._health.get(name)
+            if health is None:
+                return
+            health.calls += 1
+            health.latencies.append(latency)
+            health.ewma_latency += self.alpha * (latency - health.ewma_latency)
+            health.success_rate += self.alpha * (1.0 - health.success_rate)
+            health.empty_rate += self.alpha * ((0.0 if result_count else 1.0) - health.empty_rate)
+            health.consecutive_failures = 0
+            health.consecutive_empty = 0 if result_count else health.consecutive_empty + 1
+            if health.state != "closed":
+                logger.info(f"Search provider {name} recovered, closing circuit")
+            health.state = "closed"
+            health.trial_in_progress = False
+
+    def record_failure(self, name: str, latency: float, error: Exception) -> None:
+        """Record a failed call, opening the circuit when warranted."""
+        with self._lock:
+            health = self._health.get(name)
+            if health is None:
+                return
+            health.calls += 1
+            health.failures += 1
+            health.consecutive_failures += 1
+            health.last_error = str(error)[:200]
+            health.trial_in_progress = False
+
+            if isinstance(error, ProviderUnavailableError):
+                self._open(health, self.unavailable_timeout)
+                return
+
+            health.latencies.append(latency)
+            health.ewma_latency += self.alpha * (latency - health.ewma_latency)
+            health.success_rate += self.alpha * (0.0 - health.success_rate)
+            if health.state == "half_open" or health.consecutive_failures >= self.failure_threshold:
+                self._open(health, self.reset_timeout)
+
+    def _open(self, health: ProviderHealth, open_for: float) -> None:
+        """Open a provider's circuit."""
+        if health.state != "open":
+            logger.warning(f"Opening circuit for search provider {health.name} for {open_for:.0f}s: {health.last_error}")
+        health.state = "open"
+        health.opened_at = time.monotonic()
+        health.open_for = open_for
+
+    def snapshot(self) -> List[Dict[str, Any]]:
+        """Return the health of every provider, in current preference order."""
+        with self._lock:
+            healths = sorted(
+                self._health.values(),
+                key=lambda health: (health.state == "open",) + self._rank(health)
+            )
+            return [
+                {
+                    'provider': health.name,
+                    'state': health.state,
+                    'calls': health.calls,
+                    'failures': health.failures,
+                    'ewma_latency': round(health.ewma_latency, 3),
+                    'success_rate': round(health.success_rate, 3),
+                    'empty_rate': round(health.empty_rate, 3),
+                    'consecutive_empty': health.consecutive_empty,
+                    'p95_latency': health.latency_percentile(0.95),
+                    'last_error': health.last_error
+                }
+                for health in healths
+            ]
+
+
+_registry: ProviderRegistry | None = None
+_registry_lock = threading.Lock()
+
+
+def get_provider_registry(adapters: List[Callable[..., Any]] | None = None) -> ProviderRegistry:
+    """Return the process-wide provider registry.
+
+    On first use the registry is created from the given adapters, in order
+    of preference. Settings are read from SEARCH_CIRCUIT_FAILURE_THRESHOLD,
+    SEARCH_CIRCUIT_RESET_SECONDS, SEARCH_PROVIDER_MIN_TIMEOUT,
+    SEARCH_PROVIDER_MAX_TIMEOUT and SEARCH_PROVIDER_EMPTY_THRESHOLD.
+    """
+    global _registry
+
+    with _registry_lock:
+        if _registry is None:
+            _registry = ProviderRegistry(
+                failure_threshold=int(os.getenv("SEARCH_CIRCUIT_FAILURE_THRESHOLD", "3")),
+                reset_timeout=float(os.getenv("SEARCH_CIRCUIT_RESET_SECONDS", "60")),
+                min_timeout=float(os.getenv("SEARCH_PROVIDER_MIN_TIMEOUT", "2")),
+                max_timeout=float(os.getenv("SEARCH_PROVIDER_MAX_TIMEOUT", "10")),
+                empty_threshold=int(os.getenv("SEARCH_PROVIDER_EMPTY_THRESHOLD", "3"))
+            )
+            for adapter in adapters or []:
+                _registry.register(adapter)
+    return _registry
@@ -0,0 +1,173 @@
+"""Per-session ledger of search queries with MinHash near-duplicate detection."""
+
+import hashlib
+import os
+import random
+import re
+import threading
+from typing import Dict, FrozenSet, List, Tuple
+
+from .search_cache import normalize_query
+from .search_types import SearchResult
+
+# Words that do not change what a query asks for
+_STOPWORDS = frozenset(
+    "a an and are about as at be by does do for from how in is it of on or the to what when where which who why with".split()
+)
+
+# CJK function characters (of, and, is, about, ...) dropped before bigramming
+_CJK_STOP_PATTERN = re.compile(r'[\u7684\u4e86\u548c\u4e0e\u53ca\u662f\u5728\u5173\u4e8e\u5417\u5462]')
+
+_TOKEN_PATTERN = re.compile(r'[a-z0-9]+|[\u3400-\u4dbf\u4e00-\u9fff]+')
+_CJK_PATTERN = re.compile(r'[\u3400-\u4dbf\u4e00-\u9fff]')
+
+# Mersenne prime for the universal hash family
+_PRIME = (1 << 61) - 1
+
+
+def text_terms(text: str) -> List[str]:
+    """Return the terms of a text in order, repeats included.
+
+    Latin words are lowercased, stop words dropped and a plural "s"
+    stripped, so reordered or lightly reworded texts share terms; CJK
+    runs contribute character bigrams since they have no word breaks.
+    """
+    terms: List[str] = []
+    for token in _TOKEN_PATTERN.findall(normalize_query(text)):
+        if _CJK_PATTERN.match(token):
+            token = _CJK_STOP_PATTERN.sub('', token)
+            terms.extend(token[i:i + 2] for i in range(max(1, len(token) - 1)) if token)
+        elif token not in _STOPWORDS:
+            terms.append(token[:-1] if len(token) > 3 and token.endswith('s') and not token.endswith('ss') else token)
+    return terms
+
+
+def query_shingles(query: str) -> FrozenSet[str]:
+    """Return the shingle set of a query: its distinct terms (see text_terms)."""
+    return frozenset(text_terms(query))
+
+
+class MinHasher:
+    """MinHash signatures over a fixed family of universal hash functions."""
+
+    def __init__(self, num_perm: int = 64, seed: int = 1):
+        """Initialize the hash family.
+
+        Args:
+            num_perm: Signature length
+            seed: Seed for the hash coefficients, fixed so signatures are comparable
+        """
+        rng = random.Random(seed)
+        self.num_perm = num_perm
+        self._coefficients = [(rng.randrange(1, _PRIME), rng.randrange(0, _PRIME)) for _ in range(num_perm)]
+
+    def signature(self, shingles: FrozenSet[str]) -> Tuple[int, ...]:
+        """Return the MinHash signature of a shingle set."""
+        if not shingles:
+            return tuple([_PRIME] * self.num_perm)
+        hashes = [
+            int.from_bytes(hashlib.blake2b(shingle.encode('utf-8'), digest_size=8).digest(), 'big')
+            for shingle in shingles
+        ]
+        return tuple(min((a * value + b) % _PRIME for value in hashes) for a, b in self._coefficients)
+
+    @staticmethod
+    def similarity(first: Tuple[int, ...], second: Tuple[int, ...]) -> float:
+        """Estimate the Jaccard similarity of two signatures."""
+        return sum(1 for x, y in zip(first, second) if x == y) / len(first)
+
+
+class LedgerEntry:
+    """A query that was searched, with what it returned."""
+
+    __slots__ = ('query', 'shingles', 'signature', 'results')
+
+    def __init__(self, query: str, shingles: FrozenSet[str], signature: Tuple[int, ...], results: List[SearchResult]):
+        """Initialize an entry.
+
+        Args:
+            query: The searched query
+            shingles: Its shingle set (see query_shingles)
+            signature: MinHash signature of the shingles
+            results: Results the query returned
+        """
+        self.query = query
+        self.shingles = shingles
+        self.signature = signature
+        self.results = results
+
+
+class QueryLedger:
+    """Queries searched during one research session.
+
+    Signatures are indexed with locality-sensitive hashing (bands of
+    signature rows), so looking up near-duplicates only compares against
+    queries that share at least one band. A query only duplicates an
+    earlier one if it adds no term of its own: narrowing a search with a
+    site:, a year or another entity is a new search however similar the
+    rest of the query is.
+    """
+
+    def __init__(self, threshold: float = 0.75, num_perm: int = 64, bands: int = 16):
+        """Initialize an empty ledger.
+
+        Args:
+            threshold: Estimated Jaccard similarity at which queries count as duplicates
+            num_perm: MinHash signature length
+            bands: Number of LSH bands; num_perm must be divisible by it
+        """
+        self.threshold = threshold
+        self.hasher = MinHasher(num_perm)
+        self.rows = num_perm // bands
+        self.bands = bands
+        self.entries: List[LedgerEntry] = []
+        self._buckets: Dict[Tuple[int, Tuple[int, ...]], List[LedgerEntry]] = {}
+        self._lock = threading.Lock()
+
+    def _band_keys(self, signature: Tuple[int, ...]) -> List[Tuple[int, Tuple[int, ...]]]:
+        return [(band, signature[band * self.rows:(band + 1) * self.rows]) for band in range(self.bands)]
+
+    def find_similar(self, query: str) -> Tuple[LedgerEntry, float] | None:
+        """Find the most similar earlier query at or above the threshold.
+
+        Only earlier queries whose terms contain all of the query's terms
+        are candidates.
+
+        Returns:
+            Tuple of (entry, estimated similarity), or None
+        """
+        shingles = query_shingles(query)
+        if not shingles:
+            return None
+        signature = self.hasher.signature(shingles)
+
+        best: Tuple[LedgerEntry, float] | None = None
+        with self._lock:
+            candidates = {id(entry): entry for key in self._band_keys(signature) for entry in self._buckets.get(key, [])}
+        for entry in candidates.values():
+            if not shingles <= entry.shingles:
+                continue
+            score = self.hasher.similarity(signature, entry.signature)
+            if score >= self.threshold and (best is None or score > best[1]):
+                best = (entry, score)
+        return best
+
+    def record(self, query: str, results: List[SearchResult]) -> None:
+        """Add a searched query and the results it returned."""
+        shingles = query_shingles(query)
+        if not shingles:
+            return
+        entry = LedgerEntry(query, shingles, self.hasher.signature(shingles), list(results))
+        with self._lock:
+            self.entries.append(entry)
+            for key in self._band_keys(entry.signature):
+                self._buckets.setdefault(key, []).append(entry)
+
+
+def get_similarity_threshold() -> float | None:
+    """Return the near-duplicate threshold from SEARCH_QUERY_DEDUP_THRESHOLD.
+
+    Returns None when suppression is disabled (threshold 0 or above 1).
+    """
+    threshold = float(os.getenv("SEARCH_QUERY_DEDUP_THRESHOLD", "0.75"))
+    return threshold if 0 < threshold <= 1 else None
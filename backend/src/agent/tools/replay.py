@@ -0,0 +1,299 @@
+"""Offline record/replay of search provider calls and page fetches."""
+
+import asyncio
+import base64
+import hashlib
+import json
+import logging
+import os
+import random
+import threading
+import time
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Union
+
+import httpx
+
+from ..utils.storage import get_data_dir
+from .artifact_store import ArtifactStore
+from .provider_registry import ProviderUnavailableError
+from .search_types import SearchResult
+
+logger = logging.getLogger(__name__)
+
+
+class ReplayMissError(ProviderUnavailableError):
+    """Raised in replay mode when no fixture was recorded for a call."""
+
+
+class InjectedReplayError(Exception):
+    """Synthetic failure injected in replay mode."""
+
+
+class ReplaySettings:
+    """Record/replay configuration.
+
+    mode is "off", "record" or "replay". In replay mode every call sleeps for
+    its recorded latency times latency_scale, or for a fixed latency when one
+    is set, and fails with the configured error rate (per provider rates
+    override the global one).
+    """
+
+    def __init__(
+        self,
+        mode: str = "off",
+        fixture_dir: Union[str, Path] | None = None,
+        latency: float | None = None,
+        latency_scale: float = 1.0,
+        error_rate: float = 0.0,
+        error_rates: Dict[str, float] | None = None,
+        seed: int | None = None
+    ):
+        """Initialize the settings; see the class docstring for the fields."""
+        self.mode = mode if mode in ("off", "record", "replay") else "off"
+        self.fixture_dir = Path(fixture_dir) if fixture_dir else None
+        self.latency = latency
+        self.latency_scale = latency_scale
+        self.error_rate = error_rate
+        self.error_rates = error_rates or {}
+        self.random = random.Random(seed)
+
+    @classmethod
+    def from_env(cls) -> "ReplaySettings":
+        """Build settings from the environment.
+
+        Reads SEARCH_REPLAY_MODE, SEARCH_REPLAY_DIR, SEARCH_REPLAY_LATENCY,
+        SEARCH_REPLAY_LATENCY_SCALE, SEARCH_REPLAY_ERROR_RATE,
+        SEARCH_REPLAY_ERROR_RATES ("_try_tavily_search=1.0,page=0.1") and
+        SEARCH_REPLAY_SEED.
+        """
+        error_rates = {}
+        for item in os.getenv("SEARCH_REPLAY_ERROR_RATES", "").split(','):
+            if '=' in item:
+                name, rate = item.split('=', 1)
+                error_rates[name.strip()] = float(rate)
+
+        latency = os.getenv("SEARCH_REPLAY_LATENCY")
+        seed = os.getenv("SEARCH_REPLAY_SEED")
+        return cls(
+            mode=os.getenv("SEARCH_REPLAY_MODE", "off").lower(),
+            fixture_dir=os.getenv("SEARCH_REPLAY_DIR"),
+            latency=float(latency) if latency else None,
+            latency_scale=float(os.getenv("SEARCH_REPLAY_LATENCY_SCALE", "1.0")),
+            error_rate=float(os.getenv("SEARCH_REPLAY_ERROR_RATE", "0")),
+            error_rates=error_rates,
+            seed=int(seed) if seed else None
+        )
+
+
+class ReplayStore:
+    """Directory of JSON fixtures, one file per recorded call.
+
+    Page bodies are kept in an artifact store under the fixture directory
+    and referenced by digest, so recordings of the same body (other text
+    budgets, conditional requests) share one compressed copy.
+    """
+
+    def __init__(self, fixture_dir: Union[str, Path]):
+        """Initialize the store.
+
+        Args:
+            fixture_dir: Directory holding the fixtures
+        """
+        self.fixture_dir = Path(fixture_dir)
+        self._lock = threading.Lock()
+        self._artifacts: ArtifactStore | None = None
+
+    @property
+    def artifacts(self) -> ArtifactStore:
+        """Return the artifact store of the fixture bodies, opening it on first use."""
+        with self._lock:
+            if self._artifacts is None:
+                # Fixtures are never dropped to make room
+                self._artifacts = ArtifactStore(self.fixture_dir / "artifacts", max_bytes=None)
+            return self._artifacts
+
+    def response_body(self, payload: Dict[str, Any]) -> bytes:
+        """Return the body of a recorded response (inline in fixtures recorded before the artifact store)."""
+        if 'content' in payload:
+            return base64.b64decode(payload['content'])
+        body = self.artifacts.get(payload['content_digest'])
+        if body is None:
+            raise ReplayMissError(f"Body {payload['content_digest']} of a recorded page is missing from {self.fixture_dir}")
+        return body
+
+    @staticmethod
+    def make_key(kind: str, parts: List[Any]) -> str:
+        """Build the fixture key for a call."""
+        raw = json.dumps([kind, *parts], ensure_ascii=False)
+        return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+    def _path(self, kind: str, key: str) -> Path:
+        """Return the fixture file of a call."""
+        return self.fixture_dir / kind / f"{key}.json"
+
+    def load(self, kind: str, key: str) -> Dict[str, Any] | None:
+        """Load a fixture, or None if it was never recorded."""
+        path = self._path(kind, key)
+        if not path.is_file():
+            return None
+        return json.loads(path.read_text(encoding='utf-8'))
+
+    def save(self, kind: str, key: str, fixture: Dict[str, Any]) -> None:
+        """Write a fixture, replacing an earlier recording of the same call."""
+        path = self._path(kind, key)
+        with self._lock:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_suffix('.tmp')
+            tmp_path.write_text(json.dumps(fixture, ensure_ascii=False, indent=1), encoding='utf-8')
+            tmp_path.replace(path)
+
+
+class ReplayLayer:
+    """Record/replay wrapper around provider adapters and page fetches.
+
+    It sits below the cache, single-flight and provider registry layers, so
+    those are exercised unchanged when benchmarking against fixtures.
+    """
+
+    def __init__(self, settings: ReplaySettings):
+        """Initialize the layer.
+
+        Args:
+            settings: Record/replay configuration
+        """
+        self.settings = settings
+        self.store = ReplayStore(settings.fixture_dir or get_data_dir() / "replay_fixtures")
+        self.stats = {'recorded': 0, 'replayed': 0, 'misses': 0, 'injected_errors': 0}
+
+    @property
+    def mode(self) -> str:
+        """Return the active mode."""
+        return self.settings.mode
+
+    async def _simulate(self, name: str, fixture: Dict[str, Any]) -> None:
+        """Sleep for the synthetic latency and inject errors."""
+        settings = self.settings
+        latency = settings.latency if settings.latency is not None else fixture.get('latency', 0.0) * settings.latency_scale
+        if latency > 0:
+            await asyncio.sleep(latency)
+
+        error_rate = settings.error_rates.get(name, settings.error_rate)
+        if error_rate and settings.random.random() < error_rate:
+            self.stats['injected_errors'] += 1
+            raise InjectedReplayError(f"Injected replay error for {name}")
+
+    async def _run(self, kind: str, name: str, key: str, call: Callable[[], Awaitable[Any]], encode: Callable[[Any], Any], decode: Callable[[Any], Any]) -> Any:
+        """Record, replay or pass through one call."""
+        if self.mode == "replay":
+            fixture = self.store.load(kind, key)
+            if fixture is None:
+                self.stats['misses'] += 1
+                raise ReplayMissError(f"No recorded fixture for {name}")
+            self.stats['replayed'] += 1
+            await self._simulate(name, fixture)
+            if fixture['outcome'] == 'error':
+                raise Exception(fixture['error'])
+            return decode(fixture['payload'])
+
+        if self.mode != "record":
+            return await call()
+
+        started = time.monotonic()
+        fixture: Dict[str, Any] = {'kind': kind, 'name': name, 'recorded_at': time.time()}
+        try:
+            result = await call()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            fixture.update(outcome='error', error=str(e), latency=time.monotonic() - started)
+            self.store.save(kind, key, fixture)
+            self.stats['recorded'] += 1
+            raise
+
+        fixture.update(outcome='ok', payload=encode(result), latency=time.monotonic() - started)
+        self.store.save(kind, key, fixture)
+        self.stats['recorded'] += 1
+        return result
+
+    async def call_provider(self, method: Callable[..., Awaitable[Any]], key_parts: List[Any], *args: Any, **kwargs: Any) -> Any:
+        """Run a provider adapter through the replay layer.
+
+        Args:
+            method: The adapter coroutine function
+            key_parts: Values identifying the call (normalized query, ...)
+            *args: Passed to the adapter
+            **kwargs: Passed to the adapter
+        """
+        name = method.__name__
+        key = self.store.make_key('search', [name, *key_parts])
+        return await self._run(
+            'search', name, key, lambda: method(*args, **kwargs),
+            lambda results: [result.to_dict() for result in results],
+            lambda payload: [SearchResult.from_dict(data, name) for data in payload]
+        )
+
+    async def fetch(self, canonical_url: str, fetcher: Callable[[], Awaitable[httpx.Response]], *key_parts: Any) -> httpx.Response:
+        """Run a page fetch through the replay layer.
+
+        Args:
+            canonical_url: Identity of the page
+            fetcher: Performs the real fetch
+            *key_parts: Further values the fetched body depends on (e.g. a text budget)
+        """
+        key = self.store.make_key('page', [canonical_url, *key_parts])
+        return await self._run(
+            'page', 'page', key, fetcher,
+            lambda response: _encode_response(response, self.store),
+            lambda payload: _decode_response(payload, self.store)
+        )
+
+
+def _encode_response(response: httpx.Response, store: ReplayStore) -> Dict[str, Any]:
+    """Serialize a response for a fixture, moving its body to the fixture artifacts."""
+    return {
+        'url': str(response.url),
+        'status_code': response.status_code,
+        'headers': dict(response.headers),
+        'content_digest': store.artifacts.put(response.content)
+    }
+
+
+def _decode_response(payload: Dict[str, Any], store: ReplayStore) -> httpx.Response:
+    """Rebuild a response from a fixture."""
+    headers = {
+        name: value for name, value in payload['headers'].items()
+        # The stored content is already decoded
+        if name.lower() not in ('content-encoding', 'transfer-encoding', 'content-length')
+    }
+    return httpx.Response(
+        payload['status_code'],
+        headers=headers,
+        content=store.response_body(payload),
+        request=httpx.Request('GET', payload['url'])
+    )
+
+
+_layer: ReplayLayer | None = None
+_layer_lock = threading.Lock()
+
+
+def get_replay_layer() -> ReplayLayer:
+    """Return the process-wide replay layer, configured from the environment."""
+    global _layer
+
+    with _layer_lock:
+        if _layer is None:
+            _layer = ReplayLayer(ReplaySettings.from_env())
+            if _layer.mode != "off":
+                logger.info(f"Search replay layer in {_layer.mode} mode, fixtures at {_layer.store.fixture_dir}")
+    return _layer
+
+
+def configure_replay(settings: ReplaySettings) -> ReplayLayer:
+    """Replace the process-wide replay layer, e.g. from a benchmark script."""
+    global _layer
+
+    with _layer_lock:
+        _layer = ReplayLayer(settings)
+    return _layer
@@ -4,7 +4,8 @@ import logging
 from datetime import datetime
 from typing import Dict, Any, List, AsyncGenerator, Optional, Union, Literal, Tuple
 import asyncio
-import re
+
+from .search_session import SearchSession, activate_session, deactivate_session
 
 logger = logging.getLogger(__name__)
 
@@ -200,75 +201,35 @@ class ResearchTools:
         Returns:
             Tuple of (research_findings, search_summaries)
         """
+        # The search tools record every search in the active session
+        search_session = SearchSession(query)
+        session_token = activate_session(search_session)
         try:
             logger.info(f"Conducting research with summary capture on: '{query}'")
 
-            # For now, conduct regular research and generate mock search summaries
-            # This is a simplified implementation that can be enhanced later
             research_findings = researcher_agent(
                 f"Research the following topic comprehensively: '{query}'. "
                 f"Use your tools to gather information from multiple reliable sources."
             )
 
-            # Generate mock search summaries based on the research findings
-            search_summaries = ResearchTools.generate_mock_search_summaries(query, str(research_findings))
-
-            return str(research_findings), search_summaries
+            return str(research_findings), search_session.search_summaries()
 
         except Exception as e:
             logger.error(f"Error during research with summary: {e}")
             raise RuntimeError(f"Research step failed: {str(e)}")
+        finally:
+            deactivate_session(session_token)
 
     @staticmethod
-    def generate_mock_search_summaries(query: str, research_findings: str) -> List[Dict[str, Any]]:
-        """
-        Generate mock search summaries based on research findings.
-        This is a temporary implementation until we can properly capture search results.
-
-        Args:
-            query: The research query
-            research_findings: The research findings text
-
-        Returns:
-            List of mock search summary data
-        """
-        # Analyze the research findings to extract information
-        findings_length = len(research_findings)
-        word_count = len(research_findings.split())
-
-        # Count URLs in findings (rough estimate of sources)
-        urls = re.findall(r'http[s]?://(?:[a-zA-Z]|[0-9]|[$-_@.&+]|[!*\\(\\),]|(?:%[0-9a-fA-F][0-9a-fA-F]))+', research_findings)
-        unique_domains = list(set([url.split('/')[2] if '://' in url else 'unknown' for url in urls]))
-
-        # Generate mock summary
-        mock_summary = {
-            'query': query,
-            'total_results': min(max(word_count // 100, 1), 10),  # Estimate based on content
-            'sources': ['Web Search', 'Academic Sources', 'News Articles'][:min(3, max(1, len(unique_domains)))],
-            'domains': unique_domains[:5] if unique_domains else ['example.com', 'research.org'],
-            'search_method': '_try_tavily_search',
-            'timestamp': datetime.now().isoformat(),
-            'status': 'success',
-            'results_preview': [
-                {
-                    'title': f"Research Result for {query}"[:100],
-                    'domain': unique_domains[0] if unique_domains else 'research.org',
-                    'snippet': research_findings[:150] + '...' if len(research_findings) > 150 else research_findings,
-                    'source': 'Web Search'
-                }
-            ]
-        }
-
-        return [mock_summary]
-
-    @staticmethod
-    def generate_search_summary_output(search_summaries: List[Dict[str, Any]], query: str) -> str:
+    def generate_search_summary_output(search_summaries: List[Dict[str, Any]], query: str, avoided_searches: int = 0, duplicate_pages: int = 0) -> str:
         """
         Generate a formatted output of search summaries for the frontend.
 
         Args:
             search_summaries: List of search summary data
             query: The original query
+            avoided_searches: Number of searches skipped as near-duplicates
+            duplicate_pages: Number of fetched pages suppressed as near-duplicates
 
         Returns:
             str: Formatted search summary output
@@ -297,6 +258,8 @@ class ResearchTools:
 - **Query**: {query}
 - **Total Results Found**: {total_results}
 - **Successful Searches**: {successful_searches}/{len(search_summaries)}
+- **Searches Avoided (near-duplicates)**: {avoided_searches}
+- **Duplicate Pages Suppressed**: {duplicate_pages}
 - **Information Sources**: {len(unique_sources)} different sources
 - **Websites Accessed**: {len(unique_domains)} domains
 
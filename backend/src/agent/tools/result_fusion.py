@@ -0,0 +1,71 @@
+"""Merging of search result sets across providers and research rounds."""
+
+from typing import Dict, List
+
+from .search_types import SearchResult
+
+
+def dedupe_results(results: List[SearchResult]) -> List[SearchResult]:
+    """Drop results whose canonical URL already appeared earlier in the list.
+
+    Results without a link are kept.
+
+    Args:
+        results: Ranked search results
+
+    Returns:
+        List of unique results, in original order
+    """
+    unique = []
+    seen = set()
+    for result in results:
+        key = result.canonical_url
+        if key:
+            if key in seen:
+                continue
+            seen.add(key)
+        unique.append(result)
+    return unique
+
+
+def reciprocal_rank_fusion(
+    result_sets: List[List[SearchResult]],
+    num_results: int | None = None,
+    k: int = 60
+) -> List[SearchResult]:
+    """Fuse ranked result sets with reciprocal rank fusion.
+
+    Each result scores sum(1 / (k + rank)) over every set it appears in,
+    identified by canonical URL, so results several providers agree on rise
+    to the top. The first occurrence is kept as the representative, with the
+    longest snippet seen and the names of all contributing sources.
+
+    Args:
+        result_sets: Ranked result lists, e.g. one per provider
+        num_results: Optional number of fused results to return
+        k: RRF damping constant
+
+    Returns:
+        Fused results, best first
+    """
+    scores: Dict[str, float] = {}
+    fused: Dict[str, SearchResult] = {}
+
+    for results in result_sets:
+        for rank, result in enumerate(dedupe_results(results), 1):
+            key = result.canonical_url or f"nolink:{id(result)}"
+            scores[key] = scores.get(key, 0.0) + 1.0 / (k + rank)
+
+            if key not in fused:
+                # Copy so merging never mutates cached or shared records
+                fused[key] = result.copy()
+                continue
+
+            merged = fused[key]
+            if len(result.snippet) > len(merged.snippet):
+                merged.snippet = result.snippet
+            if result.source and result.source not in merged.source.split(', '):
+                merged.source = f"{merged.source}, {result.source}" if merged.source else result.source
+
+    ranked = sorted(fused, key=lambda key: scores[key], reverse=True)
+    return [fused[key] for key in ranked][:num_results]
@@ -0,0 +1,176 @@
+"""Token-budget-aware packing of search results for the agent's context."""
+
+import os
+import re
+from typing import Callable, Dict, List
+
+from .search_types import SearchResult, unique_values
+
+# Approximate token budgets for one search tool response, per model provider.
+# DeepSeek deployments have rejected long tool results, so they get less.
+DEFAULT_TOKEN_BUDGETS: Dict[str, int] = {
+    'deepseek': 700,
+    'bedrock': 2000,
+}
+
+# Characters that tokenizers typically encode as about one token each
+_WIDE_CHAR_PATTERN = re.compile(r'[\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uac00-\ud7af\uf900-\ufaff\u3000-\u303f\uff00-\uffef]')
+
+# Sentence ends: Latin punctuation followed by a space, or CJK full stops
+_SENTENCE_END_PATTERN = re.compile(r'[.!?;](?=\s)|[。！？；]')
+
+# Longest title and snippet kept even when the budget would allow more
+MAX_TITLE_CHARS = 200
+MAX_SNIPPET_CHARS = 600
+# Smallest useful snippet; results that cannot get this much are dropped
+MIN_SNIPPET_TOKENS = 20
+
+
+def estimate_tokens(text: str) -> int:
+    """Estimate the number of tokens of a text without a tokenizer.
+
+    Counts about four characters per token for alphabetic scripts and one
+    token per CJK character, which is close enough for budgeting.
+    """
+    if not text:
+        return 0
+    wide = len(_WIDE_CHAR_PATTERN.findall(text))
+    return wide + (len(text) - wide + 3) // 4
+
+
+def get_token_budget(model_type: str | None = None) -> int:
+    """Return the token budget for one formatted search response.
+
+    SEARCH_RESULT_TOKEN_BUDGET overrides the per-model default, which is
+    chosen by model_type or the MODEL_TYPE environment variable.
+    """
+    override = os.getenv("SEARCH_RESULT_TOKEN_BUDGET")
+    if override:
+        return max(100, int(override))
+    model_type = (model_type or os.getenv("MODEL_TYPE", "bedrock")).lower()
+    return DEFAULT_TOKEN_BUDGETS.get(model_type, DEFAULT_TOKEN_BUDGETS['bedrock'])
+
+
+def shorten_text(text: str, max_tokens: int) -> str:
+    """Shorten text to at most max_tokens, preferring whole sentences.
+
+    Falls back to a word boundary with an ellipsis when even the first
+    sentence is too long.
+    """
+    if estimate_tokens(text) <= max_tokens:
+        return text
+    if max_tokens <= 1:
+        return ""
+
+    cut = 0
+    for match in _SENTENCE_END_PATTERN.finditer(text):
+        if estimate_tokens(text[:match.end()]) > max_tokens:
+            break
+        cut = match.end()
+    if cut:
+        return text[:cut]
+
+    # Longest prefix that fits with the ellipsis, backed off to a word boundary
+    low, high = 0, len(text)
+    while low < high:
+        middle = (low + high + 1) // 2
+        if estimate_tokens(text[:middle]) < max_tokens:
+            low = middle
+        else:
+            high = middle - 1
+    prefix = text[:low]
+    space = prefix.rfind(' ')
+    if space > len(prefix) // 2:
+        prefix = prefix[:space]
+    prefix = prefix.rstrip(' ,;:')
+    return f"{prefix}…" if prefix else ""
+
+
+class _Entry:
+    """A result prepared for packing: fixed head lines plus a shrinkable snippet."""
+
+    __slots__ = ('result', 'head', 'head_tokens', 'snippet', 'snippet_tokens', 'allowance')
+
+    def __init__(self, result: SearchResult, rank: int, clean: Callable[[str], str]):
+        self.result = result
+        title = clean(result.title)[:MAX_TITLE_CHARS] or "Untitled"
+        source = clean(result.source) or result.domain
+        self.head = f"[{rank}] {title} ({source})\n{result.link}" if source else f"[{rank}] {title}\n{result.link}"
+        # Blank separator line counted with the head
+        self.head_tokens = estimate_tokens(self.head) + 1
+        snippet = clean(result.snippet)
+        self.snippet = shorten_text(snippet, estimate_tokens(snippet[:MAX_SNIPPET_CHARS]))
+        self.snippet_tokens = estimate_tokens(self.snippet)
+        self.allowance = min(self.snippet_tokens, MIN_SNIPPET_TOKENS)
+
+    def render(self) -> str:
+        snippet = shorten_text(self.snippet, self.allowance)
+        return f"{self.head}\n{snippet}" if snippet else self.head
+
+
+def pack_results(
+    results: List[SearchResult],
+    query: str,
+    token_budget: int | None = None,
+    clean: Callable[[str], str] = lambda text: text
+) -> str:
+    """Render ranked results into a compact listing that fits a token budget.
+
+    Results are kept in rank order. When everything does not fit, snippets
+    are shortened (to whole sentences where possible) with higher-ranked
+    results keeping more of theirs, and only results that cannot get even a
+    minimal snippet are dropped, from the bottom of the ranking.
+
+    Args:
+        results: Ranked search results
+        query: The query the results answer
+        token_budget: Approximate token budget (default: get_token_budget())
+        clean: Sanitizer applied to every text field
+
+    Returns:
+        str: The packed listing
+    """
+    sources = ", ".join(unique_values(clean(result.source) for result in results)) or "unknown"
+    header = f'Search results for "{clean(query)}" ({len(results)} results, sources: {sources})'
+    # Reserve room for the header and a possible omission note
+    budget = (token_budget or get_token_budget()) - estimate_tokens(header) - 30
+
+    entries = [_Entry(result, rank, clean) for rank, result in enumerate(results, 1)]
+
+    # Keep the longest prefix of the ranking that fits with minimal snippets
+    kept: List[_Entry] = []
+    used = 0
+    for entry in entries:
+        if kept and used + entry.head_tokens + entry.allowance > budget:
+            break
+        kept.append(entry)
+        used += entry.head_tokens + entry.allowance
+
+    # Share the rest among the snippets, weighted towards higher ranks. A
+    # snippet that needs less than its share passes the surplus on.
+    spare = budget - used
+    pending = [entry for entry in kept if entry.allowance < entry.snippet_tokens]
+    while pending and spare > 0:
+        weights = [1.0 / rank for rank in range(1, len(pending) + 1)]
+        total_weight = sum(weights)
+        shares = [spare * weight / total_weight for weight in weights]
+        satisfied = [
+            entry for entry, share in zip(pending, shares)
+            if entry.snippet_tokens - entry.allowance <= share
+        ]
+        if not satisfied:
+            for entry, share in zip(pending, shares):
+                entry.allowance += int(share)
+            break
+        for entry in satisfied:
+            spare -= entry.snippet_tokens - entry.allowance
+            entry.allowance = entry.snippet_tokens
+        pending = [entry for entry in pending if entry.allowance < entry.snippet_tokens]
+
+    packed = f"{header}\n\n" + "\n\n".join(entry.render() for entry in kept)
+
+    omitted = entries[len(kept):]
+    if omitted:
+        domains = unique_values(entry.result.domain for entry in omitted)[:5]
+        packed += f"\n\n[{len(omitted)} lower-ranked results omitted to fit the context budget: {', '.join(domains)}]"
+    return packed
@@ -0,0 +1,250 @@
+"""Persistent TTL-based cache for search provider results."""
+
+import hashlib
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from pathlib import Path
+from typing import Any, Dict, List, Tuple, Union
+
+from ..utils.storage import get_data_dir
+from .search_types import SearchResult
+
+logger = logging.getLogger(__name__)
+
+# Queries matching these patterns go stale quickly and get the short "news" TTL
+NEWS_QUERY_PATTERN = re.compile(
+    r'\b(news|latest|today|tonight|yesterday|this (week|month)|breaking|recent|current|update[sd]?|live|now|price|stock|score)\b'
+    r'|最新|新闻|今天|今日|近期|最近|实时|快讯',
+    re.IGNORECASE
+)
+
+_WHITESPACE_PATTERN = re.compile(r'\s+')
+
+
+def normalize_query(query: str) -> str:
+    """Normalize query text so that trivially different spellings share a key.
+
+    Applies Unicode NFKC normalization, case folding, whitespace collapsing
+    and strips surrounding quotes and trailing sentence punctuation.
+
+    Args:
+        query: The raw query text
+
+    Returns:
+        str: The normalized query
+    """
+    query = unicodedata.normalize('NFKC', str(query)).casefold()
+    query = _WHITESPACE_PATTERN.sub(' ', query).strip()
+    return query.strip('"\'').rstrip('?!.。？！').strip()
+
+
+def classify_query(query: str) -> str:
+    """Classify a query as "news" or "evergreen" for TTL selection.
+
+    Args:
+        query: The query text
+
+    Returns:
+        str: "news" or "evergreen"
+    """
+    return "news" if NEWS_QUERY_PATTERN.search(query) else "evergreen"
+
+
+class SearchCache:
+    """On-disk cache of provider result sets backed by SQLite.
+
+    Entries are keyed by normalized query, provider, num_results and
+    search_depth. Each entry expires according to the TTL of its query class,
+    and the least recently used entries are evicted once the cache grows past
+    max_entries.
+    """
+
+    def __init__(
+        self,
+        path: Union[str, Path],
+        ttls: Dict[str, int] | None = None,
+        max_entries: int = 5000
+    ):
+        """Initialize the cache and create its table if needed.
+
+        Args:
+            path: SQLite database file
+            ttls: Seconds to live per query class ("news", "evergreen")
+            max_entries: Maximum number of cached result sets
+        """
+        self.path = str(path)
+        self.ttls = {'news': 1800, 'evergreen': 3 * 86400}
+        self.ttls.update(ttls or {})
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS search_cache (
+                key TEXT PRIMARY KEY,
+                provider TEXT NOT NULL,
+                query TEXT NOT NULL,
+                results TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                expires_at REAL NOT NULL,
+                last_accessed REAL NOT NULL
+            )"""
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_search_cache_accessed ON search_cache (last_accessed)")
+        self._conn.commit()
+
+    @staticmethod
+    def make_key(query: str, provider: str, num_results: int, search_depth: str = "") -> str:
+        """Build the cache key for a provider call."""
+        raw = json.dumps([normalize_query(query), provider, int(num_results), search_depth or ""], ensure_ascii=False)
+        return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+    def get(self, query: str, provider: str, num_results: int, search_depth: str = "") -> List[SearchResult] | None:
+        """Look up a cached result set.
+
+        Returns:
+            The cached results, or None on a miss or an expired entry
+        """
+        key = self.make_key(query, provider, num_results, search_depth)
+        now = time.time()
+
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT results, expires_at FROM search_cache WHERE key = ?", (key,)
+            ).fetchone()
+
+            if row is None or row[1] <= now:
+                self.misses += 1
+                return None
+
+            self._conn.execute("UPDATE search_cache SET last_accessed = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+            self.hits += 1
+
+        return _decode_results(row[0], provider)
+
+    def get_first(self, query: str, providers: List[Tuple[str, str]], num_results: int) -> Tuple[str, List[SearchResult]] | None:
+        """Look up the first cached result set among several providers.
+
+        Counts as a single hit or miss regardless of how many providers are
+        checked.
+
+        Args:
+            query: The query text
+            providers: (provider, search_depth) pairs in order of preference
+            num_results: Number of requested results
+
+        Returns:
+            Tuple of (provider, results) for the most preferred fresh entry, or None
+        """
+        keys = [self.make_key(query, provider, num_results, search_depth) for provider, search_depth in providers]
+        if not keys:
+            return None
+        now = time.time()
+
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT key, provider, results FROM search_cache WHERE expires_at > ? AND key IN ({','.join('?' * len(keys))})",
+                (now, *keys)
+            ).fetchall()
+
+            if not rows:
+                self.misses += 1
+                return None
+
+            key, provider, results = min(rows, key=lambda row: keys.index(row[0]))
+            self._conn.execute("UPDATE search_cache SET last_accessed = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+            self.hits += 1
+
+        return provider, _decode_results(results, provider)
+
+    def set(self, query: str, provider: str, num_results: int, results: List[SearchResult], search_depth: str = "") -> None:
+        """Store a result set with the TTL of its query class."""
+        key = self.make_key(query, provider, num_results, search_depth)
+        now = time.time()
+        ttl = self.ttls.get(classify_query(query), self.ttls['evergreen'])
+
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO search_cache VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, provider, normalize_query(query), json.dumps([result.to_dict() for result in results], ensure_ascii=False), now, now + ttl, now)
+            )
+            self._evict(now)
+            self._conn.commit()
+
+    def _evict(self, now: float) -> None:
+        """Drop expired entries, then least recently used ones above max_entries."""
+        self._conn.execute("DELETE FROM search_cache WHERE expires_at <= ?", (now,))
+        overflow = self._conn.execute("SELECT COUNT(*) FROM search_cache").fetchone()[0] - self.max_entries
+        if overflow > 0:
+            self._conn.execute(
+                "DELETE FROM search_cache WHERE key IN "
+                "(SELECT key FROM search_cache ORDER BY last_accessed ASC LIMIT ?)",
+                (overflow,)
+            )
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss counters and the number of stored entries."""
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM search_cache").fetchone()[0]
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / lookups, 3) if lookups else 0.0,
+            'entries': entries
+        }
+
+    def clear(self) -> None:
+        """Remove every cached entry."""
+        with self._lock:
+            self._conn.execute("DELETE FROM search_cache")
+            self._conn.commit()
+
+
+def _decode_results(payload: str, provider: str) -> List[SearchResult]:
+    """Rebuild the result records of a cache entry."""
+    return [SearchResult.from_dict(data, provider) for data in json.loads(payload)]
+
+
+_cache: SearchCache | None = None
+_cache_lock = threading.Lock()
+
+
+def get_search_cache() -> SearchCache | None:
+    """Return the process-wide search cache, or None when caching is disabled.
+
+    Settings are read from SEARCH_CACHE_ENABLED, SEARCH_CACHE_PATH,
+    SEARCH_CACHE_TTL_NEWS, SEARCH_CACHE_TTL_EVERGREEN and
+    SEARCH_CACHE_MAX_ENTRIES.
+    """
+    global _cache
+
+    if os.getenv("SEARCH_CACHE_ENABLED", "true").lower() != "true":
+        return None
+
+    with _cache_lock:
+        if _cache is None:
+            try:
+                _cache = SearchCache(
+                    os.getenv("SEARCH_CACHE_PATH") or get_data_dir() / "search_cache.sqlite3",
+                    ttls={
+                        'news': int(os.getenv("SEARCH_CACHE_TTL_NEWS", "1800")),
+                        'evergreen': int(os.getenv("SEARCH_CACHE_TTL_EVERGREEN", str(3 * 86400)))
+                    },
+                    max_entries=int(os.getenv("SEARCH_CACHE_MAX_ENTRIES", "5000"))
+                )
+                logger.info(f"Search cache opened at {_cache.path}")
+            except Exception as e:
+                logger.error(f"Failed to open search cache, continuing without it: {e}")
+                return None
+    return _cache
@@ -0,0 +1,79 @@
+"""Speculative prefetch of the searches a research session is expected to make."""
+
+import logging
+import os
+from concurrent.futures import Future
+from typing import List
+
+from .enhanced_search import _run_search_methods_async
+from .http_client import submit
+from .search_cache import get_search_cache
+from .web_search import build_base_queries
+
+logger = logging.getLogger(__name__)
+
+# num_results the researcher's first searches use: enhanced_multi_search runs
+# the generated queries with 5 results each, enhanced_web_search defaults to 10
+MULTI_SEARCH_RESULTS = 5
+WEB_SEARCH_RESULTS = 10
+
+
+class SearchPrefetch:
+    """Background searches started for a research session."""
+
+    def __init__(self, queries: List[str], futures: List["Future[None]"]):
+        """Initialize the handle.
+
+        Args:
+            queries: The prefetched queries
+            futures: One future per background search
+        """
+        self.queries = queries
+        self.futures = futures
+
+    def cancel(self) -> None:
+        """Cancel the searches that have not finished yet."""
+        for future in self.futures:
+            future.cancel()
+
+
+async def _prefetch(query: str, num_results: int) -> None:
+    """Run one search for its side effect of filling the search cache."""
+    try:
+        results, method, from_cache = await _run_search_methods_async(query, num_results)
+        if results and not from_cache:
+            logger.info(f"Prefetched {len(results)} results for '{query}' from {method}")
+    except Exception as e:
+        logger.warning(f"Search prefetch failed for '{query}': {e}")
+
+
+def start_search_prefetch(topic: str, num_queries: int = 3) -> SearchPrefetch:
+    """Start the researcher's predictable first searches in the background.
+
+    The researcher begins by turning the topic into queries with
+    generate_search_queries and running them with enhanced_multi_search, so
+    those queries, and the topic itself at enhanced_web_search's default
+    size, are searched while the session is still starting up. Results land
+    in the search cache, where the agent's first search finds them; searches
+    still in flight are joined through single-flight.
+
+    Disabled with SEARCH_PREFETCH_ENABLED=false or when the search cache is
+    disabled. SEARCH_PREFETCH_QUERIES overrides num_queries.
+
+    Args:
+        topic: The user's research question
+        num_queries: Number of generated queries to prefetch
+
+    Returns:
+        SearchPrefetch: Handle for cancelling the background searches
+    """
+    if os.getenv("SEARCH_PREFETCH_ENABLED", "true").lower() != "true" or get_search_cache() is None:
+        return SearchPrefetch([], [])
+
+    num_queries = int(os.getenv("SEARCH_PREFETCH_QUERIES", str(num_queries)))
+    queries = build_base_queries(topic)[:max(0, num_queries)]
+    futures = [submit(_prefetch(query, MULTI_SEARCH_RESULTS)) for query in queries]
+    futures.append(submit(_prefetch(topic, WEB_SEARCH_RESULTS)))
+
+    logger.info(f"Prefetching searches for: {queries}")
+    return SearchPrefetch(queries, futures)
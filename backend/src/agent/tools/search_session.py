@@ -0,0 +1,279 @@
+"""Per-research-session search state shared by the search tools."""
+
+import contextvars
+import logging
+import threading
+import time
+import uuid
+from typing import Any, Dict, List, Optional, Tuple
+
+from ..utils.urls import canonicalize_url
+from .artifact_store import get_artifact_store
+from .page_fingerprints import (
+    PageFingerprint,
+    PageFingerprintIndex,
+    get_dedup_distance,
+    get_fingerprint_store,
+    simhash,
+)
+from .query_ledger import LedgerEntry, QueryLedger, get_similarity_threshold
+from .search_types import SearchRecord, SearchResult, unique_values
+
+logger = logging.getLogger(__name__)
+
+_current_session: contextvars.ContextVar[Optional["SearchSession"]] = contextvars.ContextVar(
+    "search_session", default=None
+)
+
+
+class SearchSession:
+    """State of one research run that the search tools consult and update.
+
+    The tools are module-level functions shared by every session, so the
+    session is found through a context variable that ResearchAgentSystem
+    sets for the duration of a research run (Strands copies the context into
+    the threads that execute tools).
+    """
+
+    def __init__(self, query: str = ""):
+        """Initialize an empty session.
+
+        Args:
+            query: The user's research question
+        """
+        self.session_id = uuid.uuid4().hex[:12]
+        self.query = query
+        # canonical URL -> query that first returned it
+        self.seen_urls: Dict[str, str] = {}
+        self.repeated_results = 0
+        # One record per search tool call, in call order
+        self.records: List[SearchRecord] = []
+        # Queries already searched, for near-duplicate suppression (None if disabled)
+        threshold = get_similarity_threshold()
+        self.query_ledger = QueryLedger(threshold) if threshold else None
+        # (skipped query, earlier query it duplicates)
+        self.avoided_searches: List[Tuple[str, str]] = []
+        # Fingerprints of fetched pages, for near-duplicate suppression (None if disabled)
+        distance = get_dedup_distance()
+        self.page_index = PageFingerprintIndex(distance) if distance is not None else None
+        # (URL, title) of every page fetched, in fetch order
+        self.fetched_pages: List[Tuple[str, str]] = []
+        # stage name -> artifact digest of its full output
+        self.stage_outputs: Dict[str, str] = {}
+        # Digest of the session manifest once written ("" while writing or after a failure)
+        self.manifest: str | None = None
+        self.started_at = time.time()
+        self._lock = threading.Lock()
+
+    def claim_results(self, results: List[SearchResult], query: str) -> Tuple[List[SearchResult], int]:
+        """Keep only results not yet returned earlier in this session.
+
+        Args:
+            results: Ranked, already deduplicated results
+            query: The query the results answer
+
+        Returns:
+            Tuple of (new results, number of results dropped as repeats)
+        """
+        fresh = []
+        with self._lock:
+            for result in results:
+                key = result.canonical_url
+                if key and key in self.seen_urls:
+                    continue
+                if key:
+                    self.seen_urls[key] = query
+                fresh.append(result)
+            repeated = len(results) - len(fresh)
+            self.repeated_results += repeated
+        return fresh, repeated
+
+    def find_prior_query(self, query: str) -> Tuple[LedgerEntry, float] | None:
+        """Find an earlier query of this session that the query nearly duplicates.
+
+        Returns:
+            Tuple of (ledger entry, estimated similarity), or None
+        """
+        if self.query_ledger is None:
+            return None
+        return self.query_ledger.find_similar(query)
+
+    def record_query(self, query: str, results: List[SearchResult]) -> None:
+        """Add a query that returned results to the ledger."""
+        if self.query_ledger is not None and results:
+            self.query_ledger.record(query, results)
+
+    def note_avoided_search(self, query: str, prior_query: str) -> None:
+        """Count a search that was skipped as a near-duplicate of prior_query."""
+        with self._lock:
+            self.avoided_searches.append((query, prior_query))
+
+    def record_search(self, record: SearchRecord) -> None:
+        """Keep the outcome of a search tool call for telemetry."""
+        with self._lock:
+            self.records.append(record)
+
+    def known_duplicate(self, url: str) -> PageFingerprint | None:
+        """Return the session page a URL is known to mirror, before fetching it.
+
+        Only pages fingerprinted in earlier sessions are known (see
+        PAGE_DEDUP_ACROSS_SESSIONS); the URL is recorded as corroborating.
+        """
+        store = get_fingerprint_store()
+        if self.page_index is None or store is None:
+            return None
+        fingerprint = store.get(url)
+        if fingerprint is None:
+            return None
+        return self.page_index.check(url, "", fingerprint, add=False)
+
+    def register_page(self, url: str, title: str, text: str) -> PageFingerprint | None:
+        """Fingerprint a fetched page and check it against the pages fetched so far.
+
+        Returns:
+            The earlier page this one nearly duplicates (the URL is recorded
+            as corroborating it), or None if the page is new
+        """
+        with self._lock:
+            self.fetched_pages.append((url, title))
+        if self.page_index is None:
+            return None
+        fingerprint = simhash(text)
+        if fingerprint is None:
+            return None
+        store = get_fingerprint_store()
+        if store is not None:
+            store.set(url, fingerprint)
+        return self.page_index.check(url, title, fingerprint)
+
+    def save_stage(self, stage: str, output: str) -> None:
+        """Keep the full output of a research stage in the artifact store."""
+        store = get_artifact_store()
+        if store is None or not output:
+            return
+        try:
+            digest = store.put(output)
+        except Exception as e:
+            logger.warning(f"Failed to store {stage} output of session {self.session_id}: {e}")
+            return
+        with self._lock:
+            self.stage_outputs[stage] = digest
+
+    def save_manifest(self, outcome: str) -> str | None:
+        """Write the session manifest to the artifact store, once per session.
+
+        The manifest is a JSON blob with the query, outcome, stage output
+        digests, searches, sources and the fetched pages with the digests
+        of their stored body and text. It is named by the session id in the
+        "session" ref namespace.
+
+        Args:
+            outcome: How the research ended ("complete" or "incomplete")
+
+        Returns:
+            The manifest digest, or None if the store is disabled or the
+            manifest was already written
+        """
+        store = get_artifact_store()
+        with self._lock:
+            if store is None or self.manifest is not None:
+                return None
+            self.manifest = ""
+            fetched_pages = list(self.fetched_pages)
+            stage_outputs = dict(self.stage_outputs)
+
+        pages = []
+        seen = set()
+        for url, title in fetched_pages:
+            canonical_url = canonicalize_url(url)
+            if canonical_url in seen:
+                continue
+            seen.add(canonical_url)
+            pages.append({
+                'url': url,
+                'title': title,
+                'body': store.resolve('page', canonical_url),
+                'text': store.resolve('text', canonical_url)
+            })
+        manifest = {
+            'session_id': self.session_id,
+            'query': self.query,
+            'outcome': outcome,
+            'started_at': self.started_at,
+            'finished_at': time.time(),
+            'stages': stage_outputs,
+            'searches': self.search_summaries(),
+            'sources': self.sources(),
+            'pages': pages,
+            'corroborated_sources': self.corroborated_sources()
+        }
+        try:
+            digest = store.put_json(manifest)
+            store.link('session', self.session_id, digest)
+        except Exception as e:
+            logger.warning(f"Failed to store manifest of session {self.session_id}: {e}")
+            return None
+        self.manifest = digest
+        return digest
+
+    def corroborated_sources(self) -> List[Dict[str, Any]]:
+        """Return the fetched pages that other URLs repeated, with those URLs."""
+        if self.page_index is None:
+            return []
+        return [
+            {'url': entry.url, 'title': entry.title, 'corroborated_by': list(entry.corroborating)}
+            for entry in self.page_index.entries if entry.corroborating
+        ]
+
+    def duplicate_pages(self) -> int:
+        """Return how many fetched pages were suppressed as near-duplicates."""
+        return sum(len(source['corroborated_by']) for source in self.corroborated_sources())
+
+    def focus_queries(self) -> List[str]:
+        """Return the research question and the latest search query, for ranking page passages."""
+        with self._lock:
+            latest = self.records[-1].query if self.records else ""
+        return [query for query in unique_values([self.query, latest]) if query.strip()]
+
+    def search_summaries(self) -> List[Dict[str, Any]]:
+        """Return one summary per search made so far, oldest first."""
+        with self._lock:
+            records = list(self.records)
+        return [record.to_summary() for record in records]
+
+    def sources(self) -> List[Dict[str, str]]:
+        """Return every distinct result handed to the agent, in the order it was first returned."""
+        with self._lock:
+            records = list(self.records)
+        sources: Dict[str, Dict[str, str]] = {}
+        for record in records:
+            for result in record.results:
+                key = result.canonical_url or result.title
+                if key and key not in sources:
+                    sources[key] = {
+                        'title': result.title,
+                        'link': result.link,
+                        'domain': result.domain,
+                        'source': result.source
+                    }
+        return list(sources.values())
+
+
+def get_current_session() -> SearchSession | None:
+    """Return the search session of the running research, if any."""
+    return _current_session.get()
+
+
+def activate_session(session: SearchSession) -> contextvars.Token:
+    """Make a session current in this context and return the reset token."""
+    return _current_session.set(session)
+
+
+def deactivate_session(token: contextvars.Token) -> None:
+    """Restore the session that was current before activate_session."""
+    try:
+        _current_session.reset(token)
+    except ValueError:
+        # The token was created in another context (e.g. a generator closed
+        # from a different task); that context is discarded anyway.
+        pass
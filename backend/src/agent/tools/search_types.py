@@ -0,0 +1,153 @@
+"""Compact record types for search results and per-search telemetry."""
+
+import time
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Tuple
+from urllib.parse import urlsplit
+
+from ..utils.urls import canonicalize_url
+
+
+class SearchResult:
+    """One search result, from the provider adapter to the session telemetry.
+
+    Results are carried unchanged through fusion and formatting. The
+    canonical URL and domain are computed once on construction, so
+    deduplication, fusion and source lists never re-parse the link.
+    """
+
+    __slots__ = ('title', 'link', 'snippet', 'source', 'provider', 'canonical_url', 'domain')
+
+    def __init__(self, title: str = "", link: str = "", snippet: str = "", source: str = "", provider: str = ""):
+        """Initialize a result.
+
+        Args:
+            title: Result title
+            link: Result URL as returned by the provider
+            snippet: Result summary text
+            source: Display name of the source (site or search engine)
+            provider: Adapter that produced the result, e.g. "_try_tavily_search"
+        """
+        self.title = title or ""
+        self.link = link or ""
+        self.snippet = snippet or ""
+        self.source = source or ""
+        self.provider = provider
+        self.canonical_url = canonicalize_url(self.link) if self.link else ""
+        self.domain = _domain_of(self.canonical_url)
+
+    def copy(self) -> "SearchResult":
+        """Return a shallow copy, e.g. before merging another result into it."""
+        clone = SearchResult.__new__(SearchResult)
+        for name in SearchResult.__slots__:
+            setattr(clone, name, getattr(self, name))
+        return clone
+
+    def to_dict(self) -> Dict[str, str]:
+        """Serialize to a plain dict (cache entries, replay fixtures, API payloads)."""
+        return {
+            'title': self.title,
+            'link': self.link,
+            'snippet': self.snippet,
+            'source': self.source,
+            'provider': self.provider
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any], provider: str = "") -> "SearchResult":
+        """Rebuild a result from to_dict output or a legacy result dict."""
+        return cls(
+            title=data.get('title', ''),
+            link=data.get('link', ''),
+            snippet=data.get('snippet', ''),
+            source=data.get('source', ''),
+            provider=data.get('provider') or provider
+        )
+
+    def __repr__(self) -> str:
+        """Return a short description for logs and debugging."""
+        return f"SearchResult(title={self.title[:40]!r}, link={self.link!r}, provider={self.provider!r})"
+
+
+class SearchRecord:
+    """Outcome of one search tool call, kept by the search session for telemetry."""
+
+    __slots__ = ('query', 'provider', 'results', 'repeated', 'from_cache', 'error', 'timestamp')
+
+    def __init__(
+        self,
+        query: str,
+        provider: str | None,
+        results: Iterable[SearchResult],
+        repeated: int = 0,
+        from_cache: bool = False,
+        error: str | None = None
+    ):
+        """Initialize a record.
+
+        Args:
+            query: The query (or " | "-joined queries) that was searched
+            provider: Adapter(s) that answered, None when every provider failed
+            results: The results handed to the agent
+            repeated: Results dropped because earlier searches returned them
+            from_cache: Whether the results came from the search cache
+            error: Failure description, if the search failed
+        """
+        self.query = query
+        self.provider = provider
+        self.results: Tuple[SearchResult, ...] = tuple(results)
+        self.repeated = repeated
+        self.from_cache = from_cache
+        self.error = error
+        self.timestamp = time.time()
+
+    @property
+    def succeeded(self) -> bool:
+        """Whether any provider answered."""
+        return self.provider is not None
+
+    def to_summary(self, preview: int = 3) -> Dict[str, Any]:
+        """Build the search summary shown by the frontend.
+
+        The summary is also consumed by ResearchTools.generate_search_summary_output.
+
+        Args:
+            preview: Number of top results to include as a preview
+        """
+        summary: Dict[str, Any] = {
+            'query': self.query,
+            'total_results': len(self.results),
+            'sources': unique_values(result.source for result in self.results),
+            'domains': unique_values(result.domain for result in self.results)[:5],
+            'search_method': self.provider or 'failed',
+            'timestamp': datetime.fromtimestamp(self.timestamp).isoformat(),
+            'status': 'success' if self.succeeded else 'failed',
+            'from_cache': self.from_cache,
+            'repeated_results': self.repeated,
+            'results_preview': [
+                {
+                    'title': result.title[:100],
+                    'domain': result.domain or 'Unknown',
+                    'snippet': result.snippet[:150],
+                    'source': result.source or 'Unknown',
+                    'link': result.link
+                }
+                for result in self.results[:preview]
+            ]
+        }
+        if self.error:
+            summary['error'] = self.error
+        return summary
+
+
+def unique_values(values: Iterable[str]) -> List[str]:
+    """Return the non-empty values in first-seen order without duplicates."""
+    return list(dict.fromkeys(value for value in values if value))
+
+
+def _domain_of(canonical_url: str) -> str:
+    """Return the host of a canonical URL, or "" if it has none."""
+    try:
+        return urlsplit(canonical_url).netloc
+    except ValueError:
+        return ""
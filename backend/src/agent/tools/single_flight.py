@@ -0,0 +1,76 @@
+"""Single-flight deduplication of identical in-flight async calls."""
+
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable, TypeVar
+
+T = TypeVar("T")
+
+
+class _Flight:
+    """An in-flight call and the number of callers waiting on it."""
+
+    __slots__ = ('task', 'waiters')
+
+    def __init__(self, task: "asyncio.Future[Any]"):
+        self.task = task
+        self.waiters = 0
+
+
+class SingleFlight:
+    """Collapse concurrent calls for the same key into one in-flight call.
+
+    The first caller for a key starts the call; callers that arrive while it
+    is still running attach to it and receive the same result or exception.
+    The call is only cancelled once every attached caller has been cancelled,
+    so a hedged search giving up on a provider does not break another
+    session that is waiting on the same request.
+
+    All methods must be used from a single event loop.
+    """
+
+    def __init__(self):
+        """Initialize an empty in-flight table."""
+        self._flights: Dict[Hashable, _Flight] = {}
+        self.calls = 0
+        self.shared = 0
+
+    async def do(self, key: Hashable, func: Callable[[], Awaitable[T]]) -> T:
+        """Run func() for key, or join the call already in flight for key.
+
+        Args:
+            key: Identity of the call
+            func: Zero-argument callable returning the awaitable to run
+
+        Returns:
+            The result of the (possibly shared) call
+        """
+        self.calls += 1
+        flight = self._flights.get(key)
+
+        if flight is None:
+            flight = _Flight(asyncio.ensure_future(func()))
+            self._flights[key] = flight
+            flight.task.add_done_callback(lambda _: self._forget(key, flight))
+        else:
+            self.shared += 1
+
+        flight.waiters += 1
+        try:
+            return await asyncio.shield(flight.task)
+        finally:
+            flight.waiters -= 1
+            if flight.waiters == 0 and not flight.task.done():
+                flight.task.cancel()
+
+    def _forget(self, key: Hashable, flight: _Flight) -> None:
+        """Remove a finished call from the in-flight table."""
+        if self._flights.get(key) is flight:
+            del self._flights[key]
+
+    def stats(self) -> Dict[str, int]:
+        """Return call counters and the number of calls currently in flight."""
+        return {
+            'calls': self.calls,
+            'shared': self.shared,
+            'in_flight': len(self._flights)
+        }
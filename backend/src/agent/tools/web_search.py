@@ -1,12 +1,14 @@
 """Web search tools for Strands Agent."""
 
 import os
-import requests
 from typing import List, Dict, Any
 from urllib.parse import quote_plus
-from bs4 import BeautifulSoup
 from strands import tool
 
+from .http_client import run_sync
+from .page_fetch import fetch_and_extract
+from .search_session import get_current_session
+
 
 @tool
 def get_page_content(url: str, max_chars: int = 6000) -> str:
@@ -21,33 +23,32 @@ def get_page_content(url: str, max_chars: int = 6000) -> str:
         Extracted text content from the web page
     """
     try:
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-        }
-        
-        response = requests.get(url, headers=headers, timeout=10)
-        response.raise_for_status()
-        
-        soup = BeautifulSoup(response.content, 'html.parser')
-        
-        # Remove script and style elements
-        for script in soup(["script", "style"]):
-            script.decompose()
-        
-        # Get text content
-        text = soup.get_text()
-        
-        # Clean up text
-        lines = (line.strip() for line in text.splitlines())
-        chunks = (phrase.strip() for line in lines for phrase in line.split("  "))
-        text = ' '.join(chunk for chunk in chunks if chunk)
-        
+        # Plain text, cleaned and whitespace-collapsed by the extraction engine
+        _, page = run_sync(fetch_and_extract(url, max_chars, markdown=False))
+        text = page.text
+
         return text[:max_chars] if len(text) > max_chars else text
         
     except Exception as e:
         return f"Error fetching page content from {url}: {str(e)}"
 
 
+def build_base_queries(research_topic: str) -> List[str]:
+    """Return the candidate search queries for a research topic, most relevant first.
+
+    Also used to prefetch the searches the researcher is expected to make.
+    """
+    # This is a simple implementation - in practice, you might want to use
+    # an LLM to generate more sophisticated queries
+    return [
+        research_topic,
+        f"{research_topic} latest news",
+        f"{research_topic} research studies",
+        f"{research_topic} expert analysis",
+        f"{research_topic} facts statistics"
+    ]
+
+
 @tool
 def generate_search_queries(research_topic: str, num_queries: int = 3) -> str:
     """
@@ -60,21 +61,30 @@ def generate_search_queries(research_topic: str, num_queries: int = 3) -> str:
     Returns:
         List of optimized search queries formatted as a string
     """
-    # This is a simple implementation - in practice, you might want to use
-    # an LLM to generate more sophisticated queries
-    base_queries = [
-        research_topic,
-        f"{research_topic} latest news",
-        f"{research_topic} research studies",
-        f"{research_topic} expert analysis",
-        f"{research_topic} facts statistics"
-    ]
-    
-    # Select the most relevant queries
-    selected_queries = base_queries[:num_queries]
+    base_queries = build_base_queries(research_topic)
     
+    # Select the most relevant queries, leaving out near-duplicates of
+    # queries already searched in this research session
+    selected_queries = []
+    skipped_queries = []
+    session = get_current_session()
+    for query in base_queries:
+        if len(selected_queries) >= num_queries:
+            break
+        match = session.find_prior_query(query) if session is not None else None
+        if match is None:
+            selected_queries.append(query)
+        else:
+            session.note_avoided_search(query, match[0].query)
+            skipped_queries.append(query)
+
+    if not selected_queries:
+        return f"All candidate queries for '{research_topic}' were already searched in this session. Use the results you have or research a different angle."
+
     formatted = f"Generated search queries for '{research_topic}':\n\n"
     for i, query in enumerate(selected_queries, 1):
         formatted += f"{i}. {query}\n"
+    if skipped_queries:
+        formatted += f"\n(Already searched, left out: {', '.join(skipped_queries)})\n"
     
     return formatted
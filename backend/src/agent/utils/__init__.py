@@ -2,10 +2,18 @@
 
 from .language_detector import LanguageDetector, detect_query_language
 from .aws_credentials import validate_aws_credentials, print_aws_credential_status
+from .storage import get_data_dir
+from .urls import canonicalize_url
+from .text_sanitizer import TextSanitizer, get_sanitizer, sanitize_text
 
 __all__ = [
     'LanguageDetector',
     'detect_query_language',
     'validate_aws_credentials',
-    'print_aws_credential_status'
+    'print_aws_credential_status',
+    'get_data_dir',
+    'canonicalize_url',
+    'TextSanitizer',
+    'get_sanitizer',
+    'sanitize_text'
 ]
@@ -0,0 +1,19 @@
+"""Local storage location for caches and other on-disk state."""
+
+import os
+from pathlib import Path
+
+
+def get_data_dir() -> Path:
+    """Return the directory used for local caches and ledgers.
+
+    Defaults to ~/.cache/strands-deepsearch-agent and can be overridden with
+    the AGENT_DATA_DIR environment variable. The directory is created if it
+    does not exist yet.
+
+    Returns:
+        Path: The data directory
+    """
+    data_dir = Path(os.getenv("AGENT_DATA_DIR", Path.home() / ".cache" / "strands-deepsearch-agent")).expanduser()
+    data_dir.mkdir(parents=True, exist_ok=True)
+    return data_dir
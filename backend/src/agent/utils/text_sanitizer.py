@@ -0,0 +1,93 @@
+"""Single-pass text sanitizing for content sent to the models."""
+
+import os
+import re
+from typing import Dict, List
+
+# Characters DeepSeek endpoints reliably accept: printable ASCII and the CJK
+# ranges. Whitespace is excluded here because str.split collapses it.
+_DEEPSEEK_DISALLOWED = r'[^\s\x21-\x7E\u3001-\u303f\u3400-\u4dbf\u4e00-\u9fff\uff00-\uffef]'
+
+# Characters stripped for Bedrock, which accepts any printable Unicode:
+# non-whitespace control characters, zero-width and bidi formatting
+# characters, lone surrogates, the BOM and specials.
+_BEDROCK_DISALLOWED = (
+    r'[\x00-\x08\x0e-\x1b\x7f-\x84\x86-\x9f\u180e\u200b-\u200f\u202a-\u202e'
+    r'\u2060-\u2064\ud800-\udfff\ufeff\ufff0-\uffff]'
+)
+
+
+class TextSanitizer:
+    """Precompiled sanitizer for one model's character policy.
+
+    One regex pass with a literal replacement (no Python callback) turns
+    runs of disallowed characters into spaces; str.split then collapses
+    whitespace, per line when line breaks are kept. Both run in C, so the
+    cost stays small on large page bodies.
+    """
+
+    def __init__(self, name: str, disallowed_class: str):
+        """Initialize the sanitizer.
+
+        Args:
+            name: Policy name, e.g. "deepseek"
+            disallowed_class: Regex character class of non-whitespace characters to replace
+        """
+        self.name = name
+        self._disallowed = re.compile(f'{disallowed_class}+')
+
+    def clean(self, text: str | None, keep_newlines: bool = False) -> str:
+        """Sanitize text for the model.
+
+        Args:
+            text: Text to clean; None and non-strings are converted
+            keep_newlines: Keep line breaks, and one blank line where the
+                text had one or more (e.g. for markdown)
+
+        Returns:
+            str: The cleaned, stripped text
+        """
+        if not text:
+            return ""
+        if not isinstance(text, str):
+            text = str(text)
+        if '\x00' in text:
+            text = text.replace('\x00', '')
+        text = self._disallowed.sub(' ', text)
+        if not keep_newlines:
+            return ' '.join(text.split())
+
+        parts: List[str] = []
+        blank = False
+        for line in text.split('\n'):
+            line = ' '.join(line.split())
+            if not line:
+                blank = True
+                continue
+            if parts:
+                parts.append('\n\n' if blank else '\n')
+            parts.append(line)
+            blank = False
+        return ''.join(parts)
+
+
+SANITIZERS: Dict[str, TextSanitizer] = {
+    'deepseek': TextSanitizer('deepseek', _DEEPSEEK_DISALLOWED),
+    'bedrock': TextSanitizer('bedrock', _BEDROCK_DISALLOWED),
+}
+
+
+def get_sanitizer(model_type: str | None = None) -> TextSanitizer:
+    """Return the sanitizer for a model provider.
+
+    Args:
+        model_type: "deepseek" or "bedrock"; defaults to the MODEL_TYPE
+            environment variable. Unknown types get the strict DeepSeek policy.
+    """
+    model_type = (model_type or os.getenv("MODEL_TYPE", "bedrock")).lower()
+    return SANITIZERS.get(model_type, SANITIZERS['deepseek'])
+
+
+def sanitize_text(text: str | None, model_type: str | None = None, keep_newlines: bool = False) -> str:
+    """Sanitize text with the policy of the given (or configured) model provider."""
+    return get_sanitizer(model_type).clean(text, keep_newlines)
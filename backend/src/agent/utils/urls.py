@@ -0,0 +1,57 @@
+"""URL normalization helpers."""
+
+import re
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+_DEFAULT_PORTS = {'http': 80, 'https': 443}
+
+# Host prefixes that serve the same content as the bare domain. They are only
+# stripped when at least two labels remain, so amp.dev or m.me stay intact.
+_HOST_PREFIX_PATTERN = re.compile(r'^(www\d?|m|mobile|amp)\.(?=[^.]+\.[^.])')
+
+# Query parameters of known analytics and ad platforms, which only track the
+# visitor. Generic names such as ref, source or feature are kept: some sites
+# select content with them.
+_TRACKING_PARAM_PATTERN = re.compile(
+    r'^(utm_\w+|gclid|dclid|gbraid|wbraid|fbclid|msclkid|yclid|igshid|mc_cid|mc_eid|_ga|_gl|_hsenc|_hsmi|'
+    r'ref_src|spm|cmpid|ncid|ocid|sr_share|s_cid|trk)$',
+    re.IGNORECASE
+)
+
+
+def canonicalize_url(url: str) -> str:
+    """Return a canonical form of a URL for use as an identity key.
+
+    Treats http and https alike, lowercases the host and drops default ports,
+    www/m./amp. prefixes, tracking query parameters, the fragment and a
+    trailing slash, and sorts the remaining query parameters. The result is
+    only meant for comparing URLs, not for fetching them.
+
+    Args:
+        url: The URL to canonicalize
+
+    Returns:
+        str: The canonical URL, or the stripped input if it cannot be parsed
+    """
+    url = (url or "").strip()
+    try:
+        parts = urlsplit(url)
+        port = parts.port
+    except ValueError:
+        return url
+
+    scheme = parts.scheme.lower()
+    if scheme == 'http':
+        scheme = 'https'
+
+    host = _HOST_PREFIX_PATTERN.sub('', (parts.hostname or "").lower())
+    if port and port != _DEFAULT_PORTS.get(parts.scheme.lower()):
+        host = f"{host}:{port}"
+
+    path = parts.path.rstrip('/') or "/"
+    query = urlencode(sorted(
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not _TRACKING_PARAM_PATTERN.match(key)
+    ))
+
+    return urlunsplit((scheme, host, path, query, ""))
@@ -0,0 +1,101 @@
+import hashlib
+import os
+
+import pytest
+
+from agent.tools import artifact_store
+from agent.tools.artifact_store import (
+    CODEC_ZLIB,
+    CODEC_ZSTD,
+    ZSTD_AVAILABLE,
+    ArtifactStore,
+    artifact_digest,
+)
+
+PAGE = ("<p>Battery recycling recovers lithium, cobalt and nickel from spent cells.</p>\n" * 200).encode('utf-8')
+
+
+def _codec(store, digest):
+    return store._index.get(bytes.fromhex(digest)).codec
+
+
+@pytest.mark.skipif(not ZSTD_AVAILABLE, reason="zstandard is not installed")
+def test_zstd_round_trip(tmp_path):
+    store = ArtifactStore(tmp_path)
+    digest = store.put(PAGE)
+
+    assert digest == artifact_digest(PAGE) == hashlib.sha256(PAGE).hexdigest()
+    assert _codec(store, digest) == CODEC_ZSTD
+    assert store.get(digest) == PAGE
+    assert store.stats()['stored_bytes'] < len(PAGE) // 5
+
+
+def test_zlib_blobs_stay_readable(tmp_path, monkeypatch):
+    monkeypatch.setattr(artifact_store, "ZSTD_AVAILABLE", False)
+    store = ArtifactStore(tmp_path)
+    digest = store.put(PAGE)
+    assert _codec(store, digest) == CODEC_ZLIB
+    store.close()
+
+    monkeypatch.undo()
+    assert ArtifactStore(tmp_path).get(digest) == PAGE
+
+
+def test_duplicate_blobs_are_stored_once(tmp_path):
+    store = ArtifactStore(tmp_path)
+    assert store.put(PAGE) == store.put(PAGE)
+    assert store.put_json({'b': 1, 'a': "é"}) == store.put('{"a": "é", "b": 1}')
+    stats = store.stats()
+    assert stats['blobs'] == 2
+    assert stats['deduplicated'] == 2
+
+
+@pytest.mark.parametrize("damage", ["reopen", "delete", "truncate", "garbage"])
+def test_index_survives_reopening(tmp_path, damage):
+    store = ArtifactStore(tmp_path)
+    digests = [store.put(PAGE + str(number).encode()) for number in range(20)]
+    store.link('page', "https://example.com/a", digests[0])
+    store.close()
+
+    index = tmp_path / 'index.bin'
+    if damage == "delete":
+        index.unlink()
+    elif damage == "truncate":
+        index.write_bytes(index.read_bytes()[:10])
+    elif damage == "garbage":
+        index.write_bytes(os.urandom(4096))
+
+    reopened = ArtifactStore(tmp_path)
+    assert all(reopened.get(digest) == PAGE + str(number).encode() for number, digest in enumerate(digests))
+    assert reopened.stats()['blobs'] == 20
+    assert reopened.resolve('page', "https://example.com/a") == digests[0]
+
+
+def test_index_grows_past_its_initial_capacity(tmp_path):
+    store = ArtifactStore(tmp_path)
+    digests = [store.put(f"blob {number}") for number in range(3000)]
+    assert store._index.capacity > 4096
+    assert all(store.get_text(digest) == f"blob {number}" for number, digest in enumerate(digests))
+
+
+def test_oldest_packs_are_evicted_with_their_refs(tmp_path):
+    store = ArtifactStore(tmp_path, max_bytes=4096, pack_bytes=1024)
+    # Random blobs do not compress, so every pack fills up predictably
+    blobs = [os.urandom(900) for _ in range(12)]
+    digests = [store.put(blob) for blob in blobs]
+    for number, digest in enumerate(digests):
+        store.link('page', f"https://example.com/{number}", digest)
+
+    stats = store.stats()
+    assert stats['dropped_packs'] > 0
+    assert sum(path.stat().st_size for path in (tmp_path / 'packs').glob('*.pack')) <= 4096 + 1024
+
+    assert store.get(digests[0]) is None
+    assert store.resolve('page', "https://example.com/0") is None
+    assert store.get(digests[-1]) == blobs[-1]
+    assert store.resolve('page', "https://example.com/11") == digests[-1]
+
+    kept = [digest for digest in digests if store.contains(digest)]
+    assert stats['blobs'] == len(kept)
+    store.close()
+    assert ArtifactStore(tmp_path, max_bytes=4096, pack_bytes=1024).get(digests[-1]) == blobs[-1]
@@ -0,0 +1,103 @@
+import asyncio
+from email.utils import formatdate
+
+import pytest
+
+from agent.tools import fetch_scheduler
+from agent.tools.fetch_scheduler import (
+    DomainThrottledError,
+    FetchScheduler,
+    parse_retry_after,
+)
+
+_real_sleep = asyncio.sleep
+
+
+class FakeClock:
+    """Replaces time.monotonic, time.time and asyncio.sleep; sleeping advances the clock instantly."""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+    def time(self):
+        return 1_700_000_000.0 + self.now
+
+    async def sleep(self, delay):
+        self.now += max(0.0, delay)
+        await _real_sleep(0)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(fetch_scheduler.time, "monotonic", clock.monotonic)
+    monkeypatch.setattr(fetch_scheduler.time, "time", clock.time)
+    monkeypatch.setattr(fetch_scheduler.asyncio, "sleep", clock.sleep)
+    return clock
+
+
+def _start_times(scheduler, clock, urls):
+    """Run one fetch per URL through the scheduler and return when each started."""
+    async def fetch(url):
+        async with scheduler.slot(url):
+            return clock.now
+
+    async def run():
+        return await asyncio.gather(*(fetch(url) for url in urls))
+    return asyncio.run(run())
+
+
+def test_parse_retry_after(clock):
+    assert parse_retry_after("120") == 120.0
+    assert parse_retry_after(formatdate(clock.time() + 30, usegmt=True)) == pytest.approx(30, abs=1)
+    assert parse_retry_after(formatdate(clock.time() - 30, usegmt=True)) == 0.0
+    assert parse_retry_after("soon") is None
+    assert parse_retry_after(None) is None
+
+
+def test_starts_are_spaced_per_domain(clock):
+    scheduler = FetchScheduler(max_concurrency=2, min_interval=0.5)
+    starts = _start_times(scheduler, clock, [
+        "https://example.com/1", "https://www.example.com/2", "https://example.com/3", "https://other.org/1"
+    ])
+
+    assert [round(start - 1000.0, 3) for start in starts[:3]] == [0.0, 0.5, 1.0]
+    # Only the two later example.com fetches waited; other.org did not queue behind them
+    assert scheduler.stats['delayed'] == 2
+
+
+@pytest.mark.parametrize("retry_after", ["10", "date"])
+def test_retry_after_blocks_the_domain(clock, retry_after):
+    scheduler = FetchScheduler(min_interval=0.0, max_wait=15.0)
+    if retry_after == "date":
+        retry_after = formatdate(clock.time() + 10, usegmt=True)
+    scheduler.observe("https://example.com/a", 429, {'retry-after': retry_after})
+
+    other, start = _start_times(scheduler, clock, ["https://other.org/b", "https://example.com/b"])
+    assert other == 1000.0
+    assert start - 1000.0 == pytest.approx(10, abs=1)
+    assert scheduler.stats['delayed'] == 1
+
+
+def test_long_retry_after_fails_fast(clock):
+    scheduler = FetchScheduler(max_wait=15.0)
+    scheduler.observe("https://example.com/a", 503, {'retry-after': '120'})
+    with pytest.raises(DomainThrottledError):
+        _start_times(scheduler, clock, ["https://example.com/b"])
+    assert scheduler.stats['rejected'] == 1
+
+
+def test_backoff_without_retry_after_doubles_and_resets(clock):
+    scheduler = FetchScheduler(backoff=5.0, max_backoff=300.0)
+    state = scheduler._state("example.com")
+
+    scheduler.observe("https://example.com/a", 429, {})
+    assert state.blocked_until - clock.now == 5.0
+    scheduler.observe("https://example.com/a", 429, {})
+    assert state.blocked_until - clock.now == 10.0
+
+    scheduler.observe("https://example.com/a", 200, {})
+    assert state.strikes == 0
@@ -0,0 +1,117 @@
+import asyncio
+import time
+
+import httpx
+import pytest
+
+from agent.tools import page_fetch
+from agent.tools.page_cache import PageCache, content_hash
+from agent.tools.page_extract import LXML_AVAILABLE, ExtractedPage
+from agent.utils.text_sanitizer import get_sanitizer
+
+URL = "https://example.com/article"
+
+
+def _html(text):
+    return f"<html><head><title>Article</title></head><body><p>{text}</p></body></html>".encode('utf-8')
+
+
+class _Server:
+    """Stands in for fetch_page: answers with queued responses and records the validators sent."""
+
+    def __init__(self):
+        self.responses = []
+        self.validators = []
+
+    async def __call__(self, url, max_chars=None, validators=None):
+        self.validators.append(validators)
+        status, body, headers = self.responses.pop(0)
+        return httpx.Response(status, content=body, headers=headers, request=httpx.Request("GET", url))
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    cache = PageCache(tmp_path / "pages.sqlite3", ttl=0)
+    monkeypatch.setattr(page_fetch, "get_page_cache", lambda: cache)
+    monkeypatch.setattr(page_fetch, "get_artifact_store", lambda: None)
+    return cache
+
+
+@pytest.fixture
+def server(monkeypatch):
+    server = _Server()
+    monkeypatch.setattr(page_fetch, "fetch_page", server)
+    return server
+
+
+def _store(cache, text, headers):
+    policy = get_sanitizer().name
+    body = _html(text)
+    cache.set(URL, True, policy, ExtractedPage("Article", text, "lxml", False), headers, content_hash(body))
+    return body
+
+
+def test_fresh_entry_is_served_without_a_request(tmp_path, monkeypatch, server):
+    cache = PageCache(tmp_path / "pages.sqlite3", ttl=600)
+    monkeypatch.setattr(page_fetch, "get_page_cache", lambda: cache)
+    _store(cache, "Stored text", {'cache-control': 'max-age=300'})
+
+    response, page = asyncio.run(page_fetch.fetch_and_extract(URL))
+    assert page.text == "Stored text"
+    assert response.extensions['page_fetch']['cache'] == 'hit'
+    assert server.validators == []
+
+
+def test_not_modified_refreshes_the_entry(cache, server):
+    _store(cache, "Stored text", {'etag': '"v1"', 'last-modified': 'Wed, 01 Jan 2025 00:00:00 GMT'})
+    cache.ttl = 600
+    server.responses.append((304, b"", {'etag': '"v2"'}))
+
+    response, page = asyncio.run(page_fetch.fetch_and_extract(URL))
+    assert server.validators == [{'If-None-Match': '"v1"', 'If-Modified-Since': 'Wed, 01 Jan 2025 00:00:00 GMT'}]
+    assert page.text == "Stored text"
+    assert response.extensions['page_fetch']['cache'] == 'revalidated'
+
+    entry = cache.get(URL, True, get_sanitizer().name)
+    assert entry.fresh
+    assert entry.etag == '"v2"'
+    assert cache.stats()['revalidated'] == 1
+
+
+def test_unchanged_body_skips_extraction(cache, server):
+    body = _store(cache, "Stored text", {})
+    server.responses.append((200, body, {'content-type': 'text/html'}))
+
+    _, page = asyncio.run(page_fetch.fetch_and_extract(URL))
+    assert server.validators == [None]
+    assert page.text == "Stored text"
+    assert cache.stats()['unchanged'] == 1
+
+
+@pytest.mark.skipif(not LXML_AVAILABLE, reason="lxml is not installed")
+def test_changed_page_replaces_the_entry(cache, server):
+    _store(cache, "Stored text", {'etag': '"v1"'})
+    server.responses.append((200, _html("Updated article text"), {'content-type': 'text/html; charset=utf-8', 'etag': '"v2"'}))
+
+    _, page = asyncio.run(page_fetch.fetch_and_extract(URL))
+    assert "Updated article text" in page.text
+
+    entry = cache.get(URL, True, get_sanitizer().name)
+    assert "Updated article text" in entry.page.text
+    assert entry.etag == '"v2"'
+    assert entry.content_hash == content_hash(_html("Updated article text"))
+    assert cache.stats()['changed'] == 1
+
+
+def test_entries_expire(tmp_path):
+    cache = PageCache(tmp_path / "pages.sqlite3", ttl=600)
+    policy = get_sanitizer().name
+    page = ExtractedPage("Article", "Stored text", "lxml", False)
+
+    assert cache.set(URL, True, policy, page, {}, "hash").expires_at > time.time() + 500
+    assert cache.set(URL, True, policy, page, {'cache-control': 'max-age=60'}, "hash").expires_at <= time.time() + 60
+    assert not cache.set(URL, True, policy, page, {'cache-control': 'no-cache'}, "hash").fresh
+    assert cache.set(URL, True, policy, page, {'cache-control': 'no-store'}, "hash") is None
+
+    cache.max_age = 0
+    assert cache.get(URL, True, policy) is None
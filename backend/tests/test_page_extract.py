@@ -0,0 +1,57 @@
+import pytest
+
+from agent.tools.page_extract import LXML_AVAILABLE, detect_encoding, extract_page
+from agent.utils.text_sanitizer import get_sanitizer
+
+CJK_PAGE = (
+    "<html><head><title>测试页面</title></head><body><article>"
+    + "<p>电动汽车电池回收是一个快速发展的行业，许多公司正在投资新的回收技术。</p>" * 10
+    + "</article></body></html>"
+)
+
+FRENCH_TEXT = (
+    "Le gouvernement a annoncé mercredi une série de mesures destinées à réduire la consommation "
+    "d'énergie des bâtiments publics. Selon le ministère, ces décisions permettront d'économiser près "
+    "de dix pour cent de l'électricité d'ici à l'été prochain. Les élus locaux se sont félicités de "
+    "cette initiative, tout en regrettant le manque de moyens financiers accordés aux communes."
+)
+
+
+@pytest.mark.skipif(not LXML_AVAILABLE, reason="lxml is not installed")
+def test_utf8_cjk_page_without_charset():
+    page = extract_page(CJK_PAGE.encode('utf-8'), None, engine='lxml', sanitizer=get_sanitizer("bedrock"))
+    assert page.engine == 'lxml'
+    assert page.title == "测试页面"
+    assert "电动汽车电池回收" in page.text
+
+
+def test_detect_encoding():
+    assert detect_encoding(CJK_PAGE.encode('utf-8')) == 'utf-8'
+    assert detect_encoding(CJK_PAGE.encode('utf-8'), 'gbk') == 'gbk'
+    assert detect_encoding(b'\xef\xbb\xbf' + CJK_PAGE.encode('utf-8'), 'latin-1') == 'utf-8'
+    meta = CJK_PAGE.replace("<head>", '<head><meta http-equiv="Content-Type" content="text/html; charset=gbk">')
+    assert detect_encoding(meta.encode('gbk')) == 'gbk'
+    french = f"<html><body><p>{FRENCH_TEXT}</p></body></html>".encode('cp1252')
+    assert detect_encoding(french) == 'cp1252'
+
+
+@pytest.mark.skipif(not LXML_AVAILABLE, reason="lxml is not installed")
+def test_undeclared_legacy_page():
+    french = f"<html><title>Actualités</title><body><p>{FRENCH_TEXT}</p></body></html>".encode('cp1252')
+    page = extract_page(french, None, engine='lxml', sanitizer=get_sanitizer("bedrock"))
+    assert page.title == "Actualités"
+    assert "électricité" in page.text
+
+
+@pytest.mark.skipif(not LXML_AVAILABLE, reason="lxml is not installed")
+def test_rejected_main_content_leaves_the_page_intact():
+    # Too little article text to select, with a link list inside the best candidate
+    html = (
+        "<html><body><div class='content'>"
+        "<p>A short note, with a comma, that is not long enough to be an article on its own.</p>"
+        "<ul>" + "<li><a href='/a'>Archive link number one</a></li>" * 3 + "</ul>"
+        "</div></body></html>"
+    ).encode('utf-8')
+    page = extract_page(html, 'utf-8', markdown=False, main_content=True)
+    assert not page.main_content
+    assert "Archive link number one" in page.text
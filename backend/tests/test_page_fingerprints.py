@@ -0,0 +1,82 @@
+import random
+
+from agent.tools.page_fingerprints import (
+    PageFingerprintIndex,
+    hamming_distance,
+    simhash,
+)
+
+ARTICLE = (
+    "Researchers at the national laboratory have developed a recycling process that recovers more than "
+    "ninety percent of the lithium, cobalt and nickel in spent electric vehicle batteries. The method "
+    "dissolves shredded cells in a mild organic acid instead of the strong mineral acids used today, "
+    "which cuts the energy needed for recovery by about a third and avoids toxic waste streams. "
+    "Pilot plants in Nevada and Ontario are expected to process several thousand tonnes of batteries "
+    "next year, and two carmakers have signed agreements to buy the recovered metals for new cells. "
+    "Analysts say the economics depend on cobalt prices, which have fallen sharply since last spring."
+)
+
+OTHER_ARTICLE = (
+    "The city council approved a plan on Tuesday to convert three downtown parking garages into housing, "
+    "adding roughly four hundred apartments within walking distance of the central train station. "
+    "Developers will receive tax credits in exchange for setting aside a fifth of the units for lower "
+    "income residents, and construction on the first garage is scheduled to begin in the autumn. "
+    "Opponents argued that shops in the area depend on the parking spaces, but the transport department "
+    "said occupancy has stayed below half since the new tram line opened two years ago."
+)
+
+
+def _flip(fingerprint, bands):
+    """Flip one bit in each of the given 8-bit bands."""
+    for band in bands:
+        fingerprint ^= 1 << (band * 8 + 3)
+    return fingerprint
+
+
+def _long_page(rng, vocabulary, words=1500):
+    return ' '.join(rng.choice(vocabulary) for _ in range(words))
+
+
+def test_mirrored_page_is_a_near_duplicate():
+    # Pages of realistic length; a few hundred characters leave SimHash too few features to be stable
+    rng = random.Random(0)
+    vocabulary = [''.join(rng.choice("abcdefghijklmnopqrstuvwxyz") for _ in range(rng.randint(3, 9))) for _ in range(800)]
+    article = _long_page(rng, vocabulary)
+    mirror = "Home News Contact Subscribe\n\n" + article.replace(article[3000:3040], "a few edited words ") + "\n\nShare this article"
+    other = _long_page(rng, vocabulary)
+
+    assert hamming_distance(simhash(article), simhash(mirror)) <= 5
+    assert hamming_distance(simhash(article), simhash(other)) > 10
+    assert hamming_distance(simhash(ARTICLE), simhash(OTHER_ARTICLE)) > 10
+    assert simhash("Too short to fingerprint.") is None
+
+
+def test_threshold_boundary():
+    fingerprint = random.Random(7).getrandbits(64)
+    index = PageFingerprintIndex(max_distance=5)
+    index.add("https://example.com/original", "Original", fingerprint)
+
+    at_threshold = _flip(fingerprint, range(5))
+    past_threshold = _flip(fingerprint, range(6))
+    assert hamming_distance(fingerprint, at_threshold) == 5
+    assert hamming_distance(fingerprint, past_threshold) == 6
+
+    assert index.find(at_threshold).url == "https://example.com/original"
+    assert index.find(past_threshold) is None
+
+
+def test_duplicates_are_recorded_as_corroborating():
+    index = PageFingerprintIndex(max_distance=5)
+    fingerprint = simhash(ARTICLE)
+
+    assert index.check("https://example.com/battery-recycling", "Recycling", fingerprint) is None
+    # The same page fetched again is not a duplicate of itself
+    assert index.check("https://www.example.com/battery-recycling/", "Recycling", fingerprint) is None
+
+    original = index.check("https://mirror.example.net/story", "Recycling", _flip(fingerprint, [1, 4]))
+    assert original.url == "https://example.com/battery-recycling"
+    index.check("https://mirror.example.net/story?utm_source=feed", "Recycling", fingerprint)
+    assert original.corroborating == ["https://mirror.example.net/story"]
+
+    assert index.check("https://example.org/housing", "Housing", simhash(OTHER_ARTICLE)) is None
+    assert len(index.entries) == 2
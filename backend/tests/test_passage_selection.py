@@ -0,0 +1,67 @@
+from agent.tools.passage_selection import GAP_MARKER, select_passages
+
+LEAD = "Grid storage overview: how utilities store energy for later use."
+
+FILLER = [
+    "Pumped hydro moves water uphill when power is cheap and lets it run through turbines when demand peaks, "
+    "and it still holds most of the world's installed storage capacity by a wide margin.",
+    "Compressed air systems store energy in underground caverns, although round-trip efficiency remains low "
+    "unless the heat of compression is captured and reused when the air is released.",
+    "Flywheels spin up a heavy rotor in a vacuum enclosure and deliver short bursts of power, which makes them "
+    "useful for frequency regulation rather than for shifting energy across hours.",
+    "Thermal storage keeps heat in molten salt or hot rocks, and concentrated solar plants use it to keep "
+    "generating for several hours after sunset on clear days.",
+]
+
+RELEVANT = [
+    "Sodium-ion batteries avoid lithium entirely, and sodium is cheap and abundant, so several manufacturers "
+    "now ship sodium-ion cells for stationary storage where weight matters less than cost.",
+    "The main drawback of sodium-ion cells is lower energy density, but their cycle life and cold-weather "
+    "performance make sodium-ion packs attractive for grid batteries.",
+]
+
+
+def _page():
+    paragraphs = [LEAD]
+    for number in range(6):
+        paragraphs.extend(FILLER)
+        if number in (2, 4):
+            paragraphs.append(RELEVANT[number == 4])
+    return "\n\n".join(paragraphs)
+
+
+def test_selects_matching_passages_in_page_order():
+    selected = select_passages(_page(), ["energy", "sodium-ion batteries"], 1200, target_chars=50)
+
+    assert selected is not None
+    parts = selected.split("\n\n")
+    assert parts[0] == LEAD
+    assert parts[1] == GAP_MARKER
+    assert parts[-1] == GAP_MARKER
+    assert selected.index(RELEVANT[0]) < selected.index(RELEVANT[1])
+    # No two gap markers in a row, and no gap between adjacent passages
+    assert all(not (first == second == GAP_MARKER) for first, second in zip(parts, parts[1:]))
+
+
+def test_result_stays_within_budget():
+    page = _page()
+    for max_chars in range(200, len(page), 7):
+        selected = select_passages(page, ["sodium-ion batteries", "grid storage cost"], max_chars, target_chars=150)
+        if selected is not None:
+            assert len(selected) <= max_chars, max_chars
+
+
+def test_lead_is_dropped_when_it_would_take_most_of_the_budget():
+    selected = select_passages(_page(), ["sodium-ion"], 300, target_chars=150)
+    assert selected is not None
+    assert LEAD not in selected
+    assert selected.startswith(GAP_MARKER)
+
+
+def test_nothing_is_selected_without_a_match():
+    assert select_passages(_page(), ["quantum chromodynamics"], 1200, target_chars=150) is None
+    assert select_passages(_page(), [], 1200, target_chars=150) is None
+
+
+def test_short_page_is_left_alone():
+    assert select_passages(LEAD, ["grid storage"], 1000) is None
@@ -0,0 +1,34 @@
+import asyncio
+import logging
+
+from agent.tools.provider_quota import (
+    ProviderQuotaManager,
+    QuotaExceededError,
+    QuotaLedger,
+)
+
+
+def test_quotas_default_to_unlimited(tmp_path):
+    manager = ProviderQuotaManager(QuotaLedger(tmp_path / "ledger.sqlite3"))
+    for provider in ("TAVILY", "SERPAPI", "GOOGLE"):
+        limits = manager.limits(provider)
+        assert limits['daily'] == 0 and limits['monthly'] == 0
+
+
+def test_provider_past_its_quota_is_skipped_and_logged(tmp_path, monkeypatch, caplog):
+    monkeypatch.setenv("SEARCH_QUOTA_SERPAPI_DAILY", "10")
+    manager = ProviderQuotaManager(QuotaLedger(tmp_path / "ledger.sqlite3"), soft_limit=0.5)
+
+    async def run():
+        for _ in range(5):
+            await manager.record_call("_try_serpapi_search")
+        assert await manager.near_quota("_try_serpapi_search")
+        try:
+            await manager.acquire("_try_serpapi_search")
+        except QuotaExceededError:
+            return True
+        return False
+
+    with caplog.at_level(logging.WARNING, logger="agent.tools.provider_quota"):
+        assert asyncio.run(run())
+    assert sum("Skipping search provider _try_serpapi_search" in record.message for record in caplog.records) == 1
@@ -0,0 +1,70 @@
+from agent.tools.provider_registry import ProviderRegistry
+
+
+async def news(query, num_results):
+    return []
+
+
+async def duckduckgo(query, num_results):
+    return []
+
+
+async def tavily(query, num_results):
+    return []
+
+
+def _names(registry):
+    return [adapter.__name__ for adapter in registry.ordered()]
+
+
+def test_fast_provider_that_always_returns_nothing_ranks_last():
+    registry = ProviderRegistry()
+    for adapter in (news, duckduckgo, tavily):
+        registry.register(adapter)
+
+    for _ in range(10):
+        registry.record_success("news", 0.01, 0)
+        registry.record_success("duckduckgo", 1.5, 8)
+        registry.record_success("tavily", 2.5, 10)
+
+    assert _names(registry) == ["duckduckgo", "tavily", "news"]
+
+
+def test_demoted_provider_recovers_once_it_returns_results():
+    registry = ProviderRegistry(empty_threshold=3)
+    for adapter in (news, duckduckgo):
+        registry.register(adapter)
+
+    for _ in range(3):
+        registry.record_success("news", 0.2, 0)
+    registry.record_success("duckduckgo", 1.0, 5)
+    assert _names(registry) == ["duckduckgo", "news"]
+
+    registry.record_success("news", 0.2, 5)
+    assert _names(registry)[0] == "news"
+
+
+def test_provider_that_keeps_getting_cancelled_is_demoted():
+    registry = ProviderRegistry()
+    for adapter in (news, duckduckgo):
+        registry.register(adapter)
+
+    for _ in range(5):
+        registry.record_success("news", 0.1, 5)
+        registry.record_success("duckduckgo", 1.0, 5)
+    assert _names(registry)[0] == "news"
+
+    # Hangs until the hedge answers and the call is cancelled
+    for _ in range(5):
+        registry.cancel_call("news", 3.0)
+    assert _names(registry) == ["duckduckgo", "news"]
+    assert registry.timeout_for("news") > registry.timeout_for("duckduckgo")
+
+
+def test_early_cancellation_does_not_improve_latency():
+    registry = ProviderRegistry()
+    registry.register(news)
+    registry.record_success("news", 1.0, 5)
+    before = registry.snapshot()[0]['ewma_latency']
+    registry.cancel_call("news", 0.05)
+    assert registry.snapshot()[0]['ewma_latency'] == before
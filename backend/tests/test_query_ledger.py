@@ -0,0 +1,49 @@
+from agent.tools.enhanced_search import _skip_near_duplicates
+from agent.tools.query_ledger import QueryLedger
+from agent.tools.search_session import (
+    SearchSession,
+    activate_session,
+    deactivate_session,
+)
+from agent.tools.search_types import SearchResult
+
+
+def test_reworded_query_is_a_duplicate():
+    ledger = QueryLedger(0.75)
+    ledger.record("solid state battery manufacturing advances", [])
+    match = ledger.find_similar("advances in solid-state battery manufacturing")
+    assert match is not None
+
+
+def test_query_adding_terms_is_never_a_duplicate():
+    ledger = QueryLedger(0.75)
+    ledger.record("solid state battery manufacturing advances", [])
+    assert ledger.find_similar("solid state battery manufacturing advances 2024") is None
+    assert ledger.find_similar("solid state battery manufacturing advances site:nature.com") is None
+    assert ledger.find_similar("toyota solid state battery manufacturing advances") is None
+
+
+def test_cjk_variants_are_not_duplicates():
+    ledger = QueryLedger(0.75)
+    ledger.record("电动汽车电池回收的最新进展", [])
+    assert ledger.find_similar("电动汽车电池回收的最新进展 研究报告") is None
+
+
+def test_batch_variants_are_all_searched():
+    session = SearchSession("electric vehicle battery recycling")
+    token = activate_session(session)
+    try:
+        queries = [
+            "电动汽车电池回收的最新进展是什么",
+            "电动汽车电池回收的最新进展是什么 latest news",
+            "电动汽车电池回收的最新进展是什么 research studies",
+        ]
+        to_search, skipped = _skip_near_duplicates(queries)
+        assert to_search == queries and not skipped
+
+        session.record_query(queries[0], [SearchResult("Battery recycling", "https://example.com/recycling")])
+        to_search, skipped = _skip_near_duplicates([queries[0], queries[1]])
+        assert to_search == [queries[1]]
+        assert [query for query, _, _ in skipped] == [queries[0]]
+    finally:
+        deactivate_session(token)
@@ -0,0 +1,88 @@
+import asyncio
+
+import pytest
+
+from agent.tools import enhanced_search
+from agent.tools.provider_quota import ProviderQuotaManager, QuotaLedger
+from agent.tools.provider_registry import ProviderRegistry
+from agent.tools.search_types import SearchResult
+
+cancelled = set()
+
+
+def _provider(name, delay, results=None, error=None):
+    async def adapter(query, num_results):
+        try:
+            await asyncio.sleep(delay)
+        except asyncio.CancelledError:
+            cancelled.add(name)
+            raise
+        if error is not None:
+            raise error
+        return [SearchResult(f"{name} result", f"https://{name}.example.com/{index}") for index in range(results or 0)]
+    adapter.__name__ = name
+    return adapter
+
+
+@pytest.fixture
+def providers(monkeypatch, tmp_path):
+    """Install fake providers, in the given order, behind a fresh registry and quota ledger."""
+    monkeypatch.setenv("SEARCH_CACHE_ENABLED", "false")
+    monkeypatch.setenv("SEARCH_STRATEGY", "hedged")
+    monkeypatch.setattr(enhanced_search, "get_quota_manager", lambda: ProviderQuotaManager(QuotaLedger(tmp_path / "ledger.sqlite3")))
+    cancelled.clear()
+
+    def install(*adapters, fanout=2, latency_budget=2.0):
+        monkeypatch.setenv("SEARCH_HEDGE_FANOUT", str(fanout))
+        monkeypatch.setenv("SEARCH_HEDGE_LATENCY_BUDGET", str(latency_budget))
+        registry = ProviderRegistry()
+        for adapter in adapters:
+            registry.register(adapter)
+        monkeypatch.setattr(enhanced_search, "_get_registry", lambda: registry)
+    return install
+
+
+def _search(query):
+    """Run a search, then report which providers were cancelled before the loop shuts down."""
+    async def run():
+        outcome = await enhanced_search._run_search_methods_async(query, 5)
+        await asyncio.sleep(0.05)
+        return outcome, set(cancelled)
+    return asyncio.run(run())
+
+
+def test_fastest_provider_wins_and_loser_is_cancelled(providers):
+    providers(_provider("slow_provider", 1.0, results=3), _provider("fast_provider", 0.05, results=2))
+    (results, method, from_cache), cancelled_now = _search("hedge winner")
+
+    assert method == "fast_provider"
+    assert [result.provider for result in results] == ["fast_provider", "fast_provider"]
+    assert not from_cache
+    assert "slow_provider" in cancelled_now
+
+
+def test_slow_provider_is_hedged_after_the_latency_budget(providers):
+    providers(_provider("hanging_provider", 5.0, results=3), _provider("backup_provider", 0.01, results=1), fanout=1, latency_budget=0.1)
+    (results, method, _), cancelled_now = _search("hedge after budget")
+
+    assert method == "backup_provider"
+    assert len(results) == 1
+    assert "hanging_provider" in cancelled_now
+
+
+def test_failed_and_empty_providers_fall_through(providers):
+    providers(
+        _provider("broken_provider", 0.01, error=RuntimeError("boom")),
+        _provider("empty_provider", 0.01, results=0),
+        _provider("last_provider", 0.01, results=1)
+    )
+    (_, method, _), _ = _search("fall through")
+    assert method == "last_provider"
+
+
+def test_every_provider_failing_returns_nothing(providers):
+    providers(
+        _provider("first_broken", 0.01, error=RuntimeError("boom")),
+        _provider("second_broken", 0.01, error=TimeoutError("slow"))
+    )
+    assert _search("all fail")[0] == ([], None, False)
@@ -0,0 +1,69 @@
+import asyncio
+
+from agent.tools.single_flight import SingleFlight
+
+
+class _Call:
+    """A slow call that records how often it started and whether it was cancelled."""
+
+    def __init__(self):
+        self.started = 0
+        self.cancelled = False
+        self.release = asyncio.Event()
+
+    async def __call__(self):
+        self.started += 1
+        try:
+            await self.release.wait()
+        except asyncio.CancelledError:
+            self.cancelled = True
+            raise
+        return "result"
+
+
+def test_cancelled_waiter_does_not_cancel_the_call_for_others():
+    async def run():
+        flights = SingleFlight()
+        call = _Call()
+        first = asyncio.ensure_future(flights.do("key", call))
+        second = asyncio.ensure_future(flights.do("key", call))
+        await asyncio.sleep(0)
+
+        first.cancel()
+        await asyncio.sleep(0)
+        assert first.cancelled()
+        assert not call.cancelled
+
+        call.release.set()
+        assert await second == "result"
+        assert call.started == 1
+        assert flights.stats() == {'calls': 2, 'shared': 1, 'in_flight': 0}
+
+    asyncio.run(run())
+
+
+def test_call_is_cancelled_once_every_waiter_left():
+    async def run():
+        flights = SingleFlight()
+        call = _Call()
+        waiters = [asyncio.ensure_future(flights.do("key", call)) for _ in range(3)]
+        await asyncio.sleep(0)
+
+        for waiter in waiters[:2]:
+            waiter.cancel()
+            await asyncio.sleep(0)
+            assert not call.cancelled
+
+        waiters[2].cancel()
+        await asyncio.sleep(0)
+        await asyncio.sleep(0)
+        assert call.cancelled
+        await asyncio.sleep(0)
+        assert flights.stats()['in_flight'] == 0
+
+        # A later caller starts a fresh call instead of joining the cancelled one
+        call.release.set()
+        assert await flights.do("key", call) == "result"
+        assert call.started == 2
+
+    asyncio.run(run())
@@ -0,0 +1,17 @@
+from agent.utils.urls import canonicalize_url
+
+
+def test_tracking_parameters_are_dropped():
+    assert canonicalize_url("https://www.example.com/a/?utm_source=x&gclid=1&fbclid=2&id=7") == "https://example.com/a?id=7"
+
+
+def test_generic_parameters_are_kept():
+    for query in ("source=rss", "ref=main", "share=1", "feature=search"):
+        assert canonicalize_url(f"https://example.com/a?{query}") == f"https://example.com/a?{query}"
+
+
+def test_host_prefix_is_kept_on_bare_domains():
+    assert canonicalize_url("https://amp.dev/documentation") == "https://amp.dev/documentation"
+    assert canonicalize_url("https://m.me/page") == "https://m.me/page"
+    assert canonicalize_url("https://m.example.com/page") == "https://example.com/page"
+    assert canonicalize_url("https://amp.theguardian.com/a") == "https://theguardian.com/a"